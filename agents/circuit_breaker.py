@@ -0,0 +1,135 @@
+"""Circuit breaker for calls to an LLM provider.
+
+The breaker watches the outcome and latency of recent calls in a sliding
+window.  Once enough calls have been seen and either the error rate or the
+share of slow calls crosses its threshold, the breaker *opens*: callers check
+:meth:`CircuitBreaker.allow` and answer from local data instead of queueing
+behind a provider that is down or crawling.  While open, a background thread
+sends a tiny probe request every ``probe_interval`` seconds and closes the
+breaker again after the first fast, successful probe.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+CLOSED, OPEN = "closed", "open"
+
+
+class CircuitBreaker:
+    """Latency- and error-rate-driven breaker with out-of-band recovery probes."""
+
+    def __init__(self, name: str, *, window_seconds: float = 60.0, min_calls: int = 5,
+                 error_rate: float = 0.5, slow_call_seconds: float = 8.0, slow_rate: float = 0.5,
+                 probe_interval: float = 15.0, probe: Optional[Callable[[], Any]] = None):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_rate = slow_rate
+        self.probe_interval = probe_interval
+        self.probe = probe
+        self._calls: Deque[Tuple[float, float, bool]] = deque()
+        self._state = CLOSED
+        self._opened_at: Optional[float] = None
+        self._trips = 0
+        self._lock = threading.Lock()
+        self._prober: Optional[threading.Thread] = None
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def allow(self) -> bool:
+        """True when calls may go to the provider."""
+
+        return self._state == CLOSED
+
+    def record(self, latency: float, ok: bool) -> None:
+        """Record one finished call (``ok=False`` for errors and timeouts)."""
+
+        now = time.monotonic()
+        with self._lock:
+            self._calls.append((now, latency, ok))
+            self._prune(now)
+            if self._state == CLOSED:
+                reason = self._trip_reason()
+                if reason:
+                    self._open(reason)
+
+    def _prune(self, now: float) -> None:
+        horizon = now - self.window_seconds
+        while self._calls and self._calls[0][0] < horizon:
+            self._calls.popleft()
+
+    def _rates(self) -> Tuple[int, float, float]:
+        total = len(self._calls)
+        if not total:
+            return 0, 0.0, 0.0
+        errors = sum(1 for _, _, ok in self._calls if not ok)
+        slow = sum(1 for _, latency, ok in self._calls if ok and latency > self.slow_call_seconds)
+        return total, errors / total, slow / total
+
+    def _trip_reason(self) -> Optional[str]:
+        total, error_rate, slow_rate = self._rates()
+        if total < self.min_calls:
+            return None
+        if error_rate >= self.error_rate:
+            return f"{error_rate:.0%} of the last {total} calls failed"
+        if slow_rate >= self.slow_rate:
+            return f"{slow_rate:.0%} of the last {total} calls took over {self.slow_call_seconds:g}s"
+        return None
+
+    def _open(self, reason: str) -> None:
+        self._state = OPEN
+        self._opened_at = time.time()
+        self._trips += 1
+        print(f"[LLM] Circuit for {self.name} opened: {reason}; serving local answers")
+        if self.probe is not None and (self._prober is None or not self._prober.is_alive()):
+            self._prober = threading.Thread(target=self._probe_until_closed, name=f"breaker-probe-{self.name}",
+                                            daemon=True)
+            self._prober.start()
+
+    def _probe_until_closed(self) -> None:
+        while self._state == OPEN:
+            time.sleep(self.probe_interval)
+            started = time.monotonic()
+            try:
+                self.probe()
+            except Exception as exc:
+                print(f"[LLM] Probe of {self.name} failed: {exc}")
+                continue
+            latency = time.monotonic() - started
+            if latency <= self.slow_call_seconds:
+                self.close()
+            else:
+                print(f"[LLM] Probe of {self.name} succeeded but took {latency:.1f}s; staying open")
+
+    def close(self) -> None:
+        """Close the breaker and forget the calls that opened it."""
+
+        with self._lock:
+            was_open = self._state == OPEN
+            self._state = CLOSED
+            self._opened_at = None
+            self._calls.clear()
+        if was_open:
+            print(f"[LLM] Circuit for {self.name} closed; provider is responding again")
+
+    def force_open(self, reason: str = "opened manually") -> None:
+        with self._lock:
+            if self._state == CLOSED:
+                self._open(reason)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._prune(time.monotonic())
+            total, error_rate, slow_rate = self._rates()
+            return {
+                "state": self._state, "calls": total, "error_rate": round(error_rate, 3),
+                "slow_rate": round(slow_rate, 3), "opened_at": self._opened_at, "trips": self._trips,
+            }
@@ -0,0 +1,151 @@
+"""Local-only answers for when the LLM provider is down or too slow.
+
+While a model's circuit breaker is open (see :mod:`agents.llm_gateway`), the
+router and the voice servers answer from the data the hotel already has --
+FAQ index, policy table, menu index, shuttle timetable, spa menu and local
+guide -- with fixed templates instead of waiting on a completion that would
+fail anyway.  Questions none of those sources covers get a short apology that
+points the guest to what can still be answered.  The indexes are imported on
+first use, so importing the router stays cheap.
+"""
+
+from __future__ import annotations
+
+import csv
+import os
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+from agents.knowledge_base import get_section
+from agents.llm_gateway import MODEL_NAME, is_available
+
+SHUTTLE_TIMETABLE_PATH = "data/shuttle_service.csv"
+# Looser than the FAQ agent's direct-answer threshold: a near miss beats no answer here.
+DEGRADED_FAQ_THRESHOLD = float(os.getenv("DEGRADED_FAQ_THRESHOLD", "0.45"))
+
+COMPLAINT_REPLY = (
+    "I'm very sorry about that. Please contact the front desk and they will sort it out for you "
+    "right away."
+)
+UNAVAILABLE_REPLY = (
+    "I'm sorry, I can't look that up right now. I can still help with our policies, "
+    "restaurant menu, shuttle times, spa services and places nearby, or the front desk "
+    "will be happy to assist you."
+)
+
+
+def llm_available(model: Optional[str] = None) -> bool:
+    """False while the circuit breaker of ``model`` (default :data:`MODEL_NAME`) is open."""
+
+    return is_available(model or MODEL_NAME)
+
+
+def _faq(user_query: str) -> Optional[str]:
+    from agents.faq_index import confident_match, get_faq_index
+
+    matches = [m for m in get_faq_index().search(user_query, k=2) if m.score >= DEGRADED_FAQ_THRESHOLD]
+    match = confident_match(matches, threshold=DEGRADED_FAQ_THRESHOLD)
+    if match is not None:
+        return match.entry.answer
+    # Too close to call ("parking" vs "valet parking"): give both rather than guess
+    return " ".join(m.entry.answer for m in matches) or None
+
+
+def _policy(user_query: str) -> Optional[str]:
+    from agents.policy_index import get_policy_index
+
+    match = get_policy_index().lookup(user_query)
+    if not match.entries:
+        return None
+    return " ".join(entry.answer() for entry in match.entries[:2])
+
+
+def _menu(user_query: str) -> Optional[str]:
+    from agents.menu_index import dietary_caveat, get_menu_index
+
+    menu_query, items = get_menu_index().search(user_query)
+    if menu_query.is_empty():
+        return None
+    if not items:
+        return f"I'm sorry, our current menu has no {menu_query.describe()}."
+    lines = "\n".join(f"- {item.describe()}" for item in items)
+    caveat = dietary_caveat(menu_query, items)
+    return f"Here are our {menu_query.describe()}:\n{lines}" + (f"\n{caveat}" if caveat else "")
+
+
+@lru_cache(maxsize=1)
+def _shuttle_timetable() -> Tuple[Dict[str, str], ...]:
+    if not os.path.exists(SHUTTLE_TIMETABLE_PATH):
+        return ()
+    with open(SHUTTLE_TIMETABLE_PATH, newline="", encoding="utf-8") as handle:
+        return tuple(csv.DictReader(handle))
+
+
+def _shuttle(user_query: str) -> Optional[str]:
+    rows = _shuttle_timetable()
+    if not rows:
+        return None
+    lowered = user_query.lower()
+    matching = [row for row in rows if (row.get("route") or "").lower() in lowered] or list(rows)
+    lines = "\n".join(
+        f"- {row.get('service_name', 'Shuttle')} at {row.get('time', '?')}: {row.get('route', '')} (${row.get('price', '?')})"
+        for row in matching
+    )
+    return f"Here is our shuttle timetable:\n{lines}"
+
+
+def _spa(user_query: str) -> Optional[str]:
+    for service in get_section("upselling_services", []) or []:
+        if "spa" in str(service.get("service_name", "")).lower() and service.get("details"):
+            lines = "\n".join(f"- {detail}" for detail in service["details"])
+            return f"Here is our spa menu:\n{lines}"
+    return None
+
+
+def _local_guide(user_query: str) -> Optional[str]:
+    from agents.local_guide_agent import local_guide_response
+
+    return local_guide_response(user_query)
+
+
+# Router category -> local sources to try, most specific first.
+_SOURCES: Dict[str, Tuple[Callable[[str], Optional[str]], ...]] = {
+    "restaurant": (_menu, _faq),
+    "spa": (_spa, _faq),
+    "shuttle": (_shuttle, _faq),
+    "policy": (_policy, _faq),
+    "localguide": (_local_guide,),
+    "faq": (_faq, _policy),
+}
+
+
+def local_answer(user_query: str, category: Optional[str] = None) -> str:
+    """Best answer for ``user_query`` from local data alone (never calls the LLM).
+
+    ``category`` is a router category such as ``"spa"``; without one it is
+    guessed from keywords.
+    """
+
+    from agents.policy_index import is_complaint
+
+    # A grievance must never get a canned policy or FAQ answer.
+    if is_complaint(user_query):
+        return COMPLAINT_REPLY
+    if category is None:
+        from agents.router_agent import predict_category
+
+        category = predict_category(user_query) or "faq"
+    category = category.lower().replace(" ", "").replace("_", "")
+    sources: List[Callable[[str], Optional[str]]] = list(_SOURCES.get(category, _SOURCES["faq"]))
+    for fallback in _SOURCES["faq"]:
+        if fallback not in sources:
+            sources.append(fallback)
+    for source in sources:
+        try:
+            answer = source(user_query)
+        except Exception as exc:
+            print(f"[Degraded] {source.__name__} failed: {exc}")
+            continue
+        if answer:
+            return answer
+    return UNAVAILABLE_REPLY
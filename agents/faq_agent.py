@@ -1,35 +1,24 @@
-from openai import OpenAI
-from dotenv import load_dotenv
-import os
-import json
-
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-MODEL_NAME = os.getenv("MODEL_NAME", "gpt-4o-mini")
+from agents.faq_index import confident_match, get_faq_index
+from agents.llm_gateway import MODEL_NAME, LLMUnavailable, chat_completion
 
 def faq_answer(user_query: str):
-    """Answers hotel FAQs using local FAQ data and OpenAI for fallback."""
+    """Answers hotel FAQs from the local FAQ index and uses OpenAI for fallback."""
     try:
-        # Load FAQ data
-        faq_path = "rag_data/hotel_faq.json"
-        if os.path.exists(faq_path):
-            with open(faq_path, "r", encoding="utf-8") as f:
-                faq_data = json.load(f)
-        else:
-            faq_data = []
+        # Look the question up in the precomputed n-gram index
+        matches = get_faq_index().search(user_query, k=3)
 
-        # Check for a match
-        match = next(
-            (faq for faq in faq_data if user_query.lower() in faq["question"].lower()), 
-            None
-        )
+        # A close, unambiguous match is answered directly from the stored FAQ
+        match = confident_match(matches)
+        if match is not None:
+            return match.entry.answer
 
-        if match:
-            prompt = f"The guest asked: '{user_query}'.\nUse this info:\nQ: {match['question']}\nA: {match['answer']}\nReply politely."
+        if matches:
+            context = "\n".join(f"Q: {m.entry.question}\nA: {m.entry.answer}" for m in matches)
+            prompt = f"The guest asked: '{user_query}'.\nThese FAQs may be relevant:\n{context}\nReply politely, using them only if they apply."
         else:
             prompt = f"The guest asked: '{user_query}'. Please provide a helpful hotel-style FAQ response."
 
-        completion = client.chat.completions.create(
+        return chat_completion(
             model=MODEL_NAME,
             messages=[
                 {"role": "system", "content": "You are a polite hotel concierge answering guest FAQs clearly and warmly."},
@@ -37,6 +26,8 @@ def faq_answer(user_query: str):
             ],
             temperature=0.6,
         )
-        return completion.choices[0].message.content.strip()
+    except LLMUnavailable:
+        # Let the router answer from local data instead of apologizing
+        raise
     except Exception as e:
         return f"⚠️ Sorry, I couldn’t fetch the FAQ response. (Error: {str(e)})"
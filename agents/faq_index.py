@@ -0,0 +1,180 @@
+"""Fuzzy FAQ matching with precomputed character n-gram signatures.
+
+Every question from ``rag_data/hotel_faq.json`` and the ``faq`` section of
+``data/rag_database.json`` is normalized once and turned into a set of
+character trigrams, and so is each of its alternative phrasings (``alts``).
+An inverted index from trigram to phrasing lets a guest query touch only the
+phrasings it shares n-grams with; the Dice overlap of the two signatures gives
+a score between 0 and 1, and a question scores as its best phrasing.
+
+Trigram overlap cannot tell "check-in" from "check-out", or "parking" from
+"valet parking", so a match is only answered directly when it also leads the
+runner-up by :data:`DIRECT_ANSWER_MARGIN` (see :func:`confident_match`).
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+from agents.knowledge_base import get_section
+
+FAQ_JSON_PATH = "rag_data/hotel_faq.json"
+NGRAM_SIZE = 3
+DIRECT_ANSWER_THRESHOLD = float(os.getenv("FAQ_DIRECT_ANSWER_THRESHOLD", "0.7"))
+# Lead over the runner-up a direct answer needs, unless the questions match exactly.
+DIRECT_ANSWER_MARGIN = float(os.getenv("FAQ_DIRECT_ANSWER_MARGIN", "0.15"))
+
+# Function words carry no signal for matching and would inflate every signature.
+_STOPWORDS = frozenset(
+    "a an and are at be can could do does for from have how i in is it me my of on or our "
+    "please the there to what when where which who will with would you your".split()
+)
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_question(text: str) -> List[str]:
+    """Lowercase, strip punctuation (so 'check-in' == 'check in') and drop stopwords."""
+
+    tokens = _NON_WORD_RE.sub(" ", (text or "").lower()).split()
+    return [tok for tok in tokens if tok not in _STOPWORDS]
+
+
+def ngram_signature(text: str, n: int = NGRAM_SIZE) -> FrozenSet[str]:
+    """Return the set of boundary-padded character n-grams of each content word."""
+
+    grams = set()
+    for token in normalize_question(text):
+        padded = f"#{token}#"
+        if len(padded) <= n:
+            grams.add(padded)
+            continue
+        grams.update(padded[i:i + n] for i in range(len(padded) - n + 1))
+    return frozenset(grams)
+
+
+@dataclass(frozen=True)
+class FAQEntry:
+    question: str
+    answer: str
+    alts: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class FAQMatch:
+    entry: FAQEntry
+    score: float
+
+
+class FAQIndex:
+    """Inverted n-gram index over FAQ questions and their alternative phrasings."""
+
+    def __init__(self, entries: Sequence[FAQEntry], max_posting_fraction: float = 0.5):
+        self.entries: List[FAQEntry] = list(entries)
+        # One document per phrasing; ``_owners`` maps it back to its entry.
+        self._owners: List[int] = []
+        self._sizes: List[int] = []
+        self._postings: Dict[str, Set[int]] = {}
+        for entry_id, entry in enumerate(self.entries):
+            for phrasing in (entry.question, *entry.alts):
+                signature = ngram_signature(phrasing)
+                if not signature:
+                    continue
+                doc_id = len(self._owners)
+                self._owners.append(entry_id)
+                self._sizes.append(len(signature))
+                for gram in signature:
+                    self._postings.setdefault(gram, set()).add(doc_id)
+        # Grams shared by a large share of phrasings do not discriminate; skipping
+        # them keeps each lookup proportional to the few postings that matter.
+        limit = max(2, int(len(self._owners) * max_posting_fraction))
+        self._skip = frozenset(g for g, docs in self._postings.items() if len(docs) > limit)
+
+    @classmethod
+    def from_sources(cls, faq_path: str = FAQ_JSON_PATH,
+                     extra: Optional[Iterable[dict]] = None) -> "FAQIndex":
+        """Build the index from the FAQ JSON file plus the knowledge base FAQ section."""
+
+        records: List[dict] = []
+        if os.path.exists(faq_path):
+            with open(faq_path, "r", encoding="utf-8") as f:
+                records.extend(json.load(f))
+        records.extend(extra if extra is not None else (get_section("faq", []) or []))
+
+        entries: List[FAQEntry] = []
+        seen = set()
+        for record in records:
+            question = str(record.get("question", "")).strip()
+            answer = str(record.get("answer", "")).strip()
+            key = " ".join(normalize_question(question))
+            if not question or not answer or key in seen:
+                continue
+            seen.add(key)
+            alts = tuple(str(alt).strip() for alt in record.get("alts", []) or [] if str(alt).strip())
+            entries.append(FAQEntry(question, answer, alts))
+        return cls(entries)
+
+    def search(self, user_query: str, k: int = 3) -> List[FAQMatch]:
+        """Return the top ``k`` questions by Dice similarity of their best phrasing, best first."""
+
+        signature = ngram_signature(user_query)
+        if not signature:
+            return []
+
+        overlap: Dict[int, int] = {}
+        for gram in signature:
+            if gram in self._skip:
+                continue
+            for doc_id in self._postings.get(gram, ()):
+                overlap[doc_id] = overlap.get(doc_id, 0) + 1
+        if not overlap:
+            return []
+
+        # Skipped grams still count towards the true overlap of the candidates.
+        common = signature & self._skip
+        if common:
+            for doc_id in overlap:
+                overlap[doc_id] += sum(1 for gram in common if doc_id in self._postings[gram])
+
+        size = len(signature)
+        best: Dict[int, float] = {}
+        for doc_id, shared in overlap.items():
+            score = 2.0 * shared / (size + self._sizes[doc_id])
+            entry_id = self._owners[doc_id]
+            if score > best.get(entry_id, 0.0):
+                best[entry_id] = score
+        scored: Iterable[Tuple[float, int]] = ((score, entry_id) for entry_id, score in best.items())
+        return [FAQMatch(self.entries[entry_id], score) for score, entry_id in heapq.nlargest(k, scored)]
+
+    def best(self, user_query: str, threshold: float = DIRECT_ANSWER_THRESHOLD,
+             margin: float = DIRECT_ANSWER_MARGIN) -> Optional[FAQMatch]:
+        """Return the top match if it is confident enough to answer directly."""
+
+        return confident_match(self.search(user_query, k=2), threshold, margin)
+
+
+def confident_match(matches: Sequence[FAQMatch], threshold: float = DIRECT_ANSWER_THRESHOLD,
+                    margin: float = DIRECT_ANSWER_MARGIN) -> Optional[FAQMatch]:
+    """The first of ``matches`` (best first) if it clears ``threshold`` and leads the next by ``margin``.
+
+    An exact match (score 1.0) needs no margin.
+    """
+
+    if not matches or matches[0].score < threshold:
+        return None
+    top = matches[0]
+    if top.score < 1.0 and len(matches) > 1 and top.score - matches[1].score < margin:
+        return None
+    return top
+
+
+@lru_cache(maxsize=1)
+def get_faq_index() -> FAQIndex:
+    """Return the process-wide FAQ index, built on first use."""
+
+    return FAQIndex.from_sources()
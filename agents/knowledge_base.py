@@ -0,0 +1,68 @@
+"""Shared loader for the structured hotel knowledge base (``data/rag_database.json``)."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from functools import lru_cache
+from typing import Any, Dict, Tuple
+
+RAG_DATABASE_PATH = "data/rag_database.json"
+# Every data file an agent answers from; a change to any of them is a new knowledge version.
+KNOWLEDGE_PATHS: Tuple[str, ...] = (
+    RAG_DATABASE_PATH,
+    "data/hotel_policies.csv",
+    "data/restaurant.csv",
+    "data/room_availability.csv",
+    "data/shuttle_service.csv",
+    "data/spa.csv",
+)
+
+
+@lru_cache(maxsize=None)
+def load_rag_database(path: str = RAG_DATABASE_PATH) -> Dict[str, Any]:
+    """Return the parsed knowledge base, or an empty dict if the file is missing."""
+
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data if isinstance(data, dict) else {}
+
+
+def get_section(name: str, default: Any = None) -> Any:
+    """Return one top-level section of the knowledge base (e.g. ``"menus"``)."""
+
+    return load_rag_database().get(name, default)
+
+
+_version: Tuple[Tuple[Tuple[str, int, int], ...], str] = ((), "")
+
+
+def knowledge_version() -> str:
+    """Content hash of the data files in :data:`KNOWLEDGE_PATHS`.
+
+    Stable across processes and deploys; the files are only re-hashed when
+    their size or mtime changes, so calling this per request costs a few stats.
+    """
+
+    global _version
+    stats = []
+    for path in KNOWLEDGE_PATHS:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        stats.append((path, stat.st_size, stat.st_mtime_ns))
+    fingerprint = tuple(stats)
+    cached_fingerprint, version = _version
+    if fingerprint != cached_fingerprint:
+        digest = hashlib.sha256()
+        for path, _, _ in fingerprint:
+            digest.update(path.encode("utf-8"))
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        version = digest.hexdigest()[:12]
+        _version = (fingerprint, version)
+    return version
@@ -0,0 +1,240 @@
+"""Single, lazily created OpenAI client shared by every agent.
+
+Agents used to build their own client (and import the OpenAI SDK) at import
+time.  Routing every chat completion through :func:`chat_completion` means the
+SDK is only imported, and the client only built, on the first real call.
+Calls go through :func:`utils.call_log.invoke` so they can be recorded and
+replayed offline.
+
+Each model has a :class:`~agents.circuit_breaker.CircuitBreaker`.  When recent
+calls to a model are mostly failing or slow, :func:`guarded_call` fails fast
+with :class:`LLMUnavailable` and :func:`is_available` turns false, so the
+router can answer from local data (see :mod:`agents.degraded`) until a
+background probe sees the provider recover.
+
+Inside a :func:`stream_reply` block the first chat completion is requested
+with ``stream=True`` and its text is handed to a callback as it is generated
+(see :func:`stream_chat_completion`), so a voice reply can be synthesized
+sentence by sentence while the model is still writing the rest.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import functools
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+from dotenv import load_dotenv
+
+from agents.circuit_breaker import CircuitBreaker
+from utils import call_log
+from utils.tracing import span
+from utils.usage import record_completion
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+load_dotenv()
+MODEL_NAME = os.getenv("MODEL_NAME", "gpt-4o-mini")
+# Per-request timeout; the SDK default (10 minutes) lets slow calls pile up workers.
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+
+BREAKER_ENABLED = os.getenv("LLM_BREAKER_ENABLED", "1") == "1"
+BREAKER_WINDOW_SECONDS = float(os.getenv("LLM_BREAKER_WINDOW", "60"))
+BREAKER_MIN_CALLS = int(os.getenv("LLM_BREAKER_MIN_CALLS", "5"))
+BREAKER_ERROR_RATE = float(os.getenv("LLM_BREAKER_ERROR_RATE", "0.5"))
+BREAKER_SLOW_SECONDS = float(os.getenv("LLM_BREAKER_SLOW_SECONDS", "8"))
+BREAKER_SLOW_RATE = float(os.getenv("LLM_BREAKER_SLOW_RATE", "0.5"))
+BREAKER_PROBE_SECONDS = float(os.getenv("LLM_BREAKER_PROBE_SECONDS", "15"))
+
+T = TypeVar("T")
+
+_client: Optional["OpenAI"] = None
+_client_lock = threading.Lock()
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+_reply_stream: contextvars.ContextVar[Optional["_ReplyStream"]] = contextvars.ContextVar(
+    "llm_reply_stream", default=None
+)
+
+
+class LLMUnavailable(RuntimeError):
+    """The model's circuit breaker is open; answer from local data instead."""
+
+
+class _ReplyStream:
+    """Callback for the streamed reply; only the first completion that claims it streams."""
+
+    def __init__(self, on_delta: Callable[[str], None]):
+        self.on_delta = on_delta
+        self._claimed = False
+        self._lock = threading.Lock()
+
+    def claim(self) -> bool:
+        with self._lock:
+            if self._claimed:
+                return False
+            self._claimed = True
+            return True
+
+
+def get_client() -> "OpenAI":
+    """Return the process-wide OpenAI client, creating it on first use."""
+
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from openai import OpenAI
+
+                _client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), timeout=LLM_TIMEOUT_SECONDS)
+    return _client
+
+
+def _probe(model: str) -> None:
+    get_client().chat.completions.create(
+        model=model,
+        messages=[{"role": "user", "content": "ping"}],
+        max_tokens=1,
+        timeout=BREAKER_SLOW_SECONDS,
+    )
+
+
+def get_breaker(model: str) -> CircuitBreaker:
+    """Return the circuit breaker for ``model``, creating it on first use."""
+
+    breaker = _breakers.get(model)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(model)
+            if breaker is None:
+                breaker = _breakers[model] = CircuitBreaker(
+                    model,
+                    window_seconds=BREAKER_WINDOW_SECONDS,
+                    min_calls=BREAKER_MIN_CALLS,
+                    error_rate=BREAKER_ERROR_RATE,
+                    slow_call_seconds=BREAKER_SLOW_SECONDS,
+                    slow_rate=BREAKER_SLOW_RATE,
+                    probe_interval=BREAKER_PROBE_SECONDS,
+                    probe=functools.partial(_probe, model),
+                )
+    return breaker
+
+
+def is_available(model: Optional[str] = None) -> bool:
+    """False while the breaker for ``model`` (default :data:`MODEL_NAME`) is open."""
+
+    return not BREAKER_ENABLED or get_breaker(model or MODEL_NAME).allow()
+
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    """State, recent error / slow-call rates and trip count of every model's breaker."""
+
+    return {model: breaker.snapshot() for model, breaker in list(_breakers.items())}
+
+
+def guarded_call(model: str, call: Callable[[], T]) -> T:
+    """Run ``call`` under ``model``'s breaker: fail fast while open, record the outcome otherwise."""
+
+    if not BREAKER_ENABLED:
+        return call()
+    breaker = get_breaker(model)
+    if not breaker.allow():
+        raise LLMUnavailable(f"{model} is unavailable (circuit open)")
+    started = time.monotonic()
+    try:
+        result = call()
+    except Exception:
+        breaker.record(time.monotonic() - started, ok=False)
+        raise
+    breaker.record(time.monotonic() - started, ok=True)
+    return result
+
+
+def chat_completion(messages: List[Dict[str, str]], *, model: Optional[str] = None,
+                    temperature: float = 0.6, **kwargs: Any) -> str:
+    """Run a chat completion and return the stripped text of the first choice."""
+
+    model = model or MODEL_NAME
+    stream = _reply_stream.get()
+    if stream is not None and stream.claim():
+        return _streamed_completion(stream, messages, model=model, temperature=temperature, **kwargs)
+    request = {"model": model, "messages": messages, "temperature": temperature, **kwargs}
+    with span("llm", model=model):
+        completion = guarded_call(
+            model, lambda: call_log.invoke("chat", request, lambda: get_client().chat.completions.create(**request))
+        )
+    record_completion(model, completion)
+    if not completion.choices:
+        return ""
+    return (completion.choices[0].message.content or "").strip()
+
+
+def _streamed_completion(stream: _ReplyStream, messages: List[Dict[str, str]], *, model: str,
+                         **kwargs: Any) -> str:
+    if call_log.get_call_log().mode != call_log.OFF:
+        # Recorded calls are whole completions; keep them replayable.  The
+        # stream is already claimed, so this call does not stream again.
+        text = chat_completion(messages, model=model, **kwargs)
+        stream.on_delta(text)
+        return text
+    pieces: List[str] = []
+    with span("llm", model=model, stream="1"):
+        for piece in stream_chat_completion(messages, model=model, **kwargs):
+            pieces.append(piece)
+            stream.on_delta(piece)
+    return "".join(pieces).strip()
+
+
+@contextlib.contextmanager
+def stream_reply(on_delta: Callable[[str], None]) -> Iterator[None]:
+    """Stream the first chat completion made in this block to ``on_delta``.
+
+    Wrap only the agent call that produces the guest's reply (not
+    classification).  Exactly one completion streams -- whichever starts
+    first, fan-out threads included -- and the rest run normally, so the
+    streamed text can be a prefix of the final reply or, when an agent
+    rewrites its answer, differ from it.  While calls are being recorded or
+    replayed the completion is not streamed; its whole text is passed to
+    ``on_delta`` once it is done.
+    """
+
+    token = _reply_stream.set(_ReplyStream(on_delta))
+    try:
+        yield
+    finally:
+        _reply_stream.reset(token)
+
+
+def stream_chat_completion(messages: List[Dict[str, str]], *, model: Optional[str] = None,
+                           temperature: float = 0.6, **kwargs: Any) -> Iterator[str]:
+    """Yield the text of a chat completion piece by piece as the model generates it.
+
+    Runs under the model's breaker like :func:`chat_completion`; the call is
+    recorded once the stream ends, so its duration includes the consumer's
+    time between pieces.
+    """
+
+    model = model or MODEL_NAME
+    request = {"model": model, "messages": messages, "temperature": temperature, "stream": True,
+               "stream_options": {"include_usage": True}, **kwargs}
+    breaker = get_breaker(model) if BREAKER_ENABLED else None
+    if breaker is not None and not breaker.allow():
+        raise LLMUnavailable(f"{model} is unavailable (circuit open)")
+    started = time.monotonic()
+    try:
+        for chunk in get_client().chat.completions.create(**request):
+            if getattr(chunk, "usage", None) is not None:
+                record_completion(model, chunk)
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    except Exception:
+        if breaker is not None:
+            breaker.record(time.monotonic() - started, ok=False)
+        raise
+    if breaker is not None:
+        breaker.record(time.monotonic() - started, ok=True)
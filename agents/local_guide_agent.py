@@ -0,0 +1,237 @@
+"""Local guide agent backed by a precomputed index of nearby places.
+
+The ``local_guide`` entries in ``data/rag_database.json`` are parsed once at
+load time into numeric distances, opening intervals (minutes after midnight)
+and category buckets pre-sorted by distance, so "what's open nearby right now"
+is answered with a short scan instead of an LLM call.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from agents.knowledge_base import get_section
+
+MINUTES_PER_DAY = 24 * 60
+
+# Guest words that point to a category even when the category name differs.
+CATEGORY_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "nature": ("park", "parks", "garden", "gardens", "outdoor", "outdoors", "walk", "hike", "picnic", "nature"),
+    "culture": ("museum", "museums", "gallery", "galleries", "art", "arts", "history", "culture", "exhibit", "exhibits"),
+    "food": ("restaurant", "restaurants", "food", "eat", "dining", "cafe", "coffee", "drink", "drinks"),
+    "shopping": ("shop", "shops", "shopping", "mall", "market", "store", "stores", "boutique"),
+    "nightlife": ("bar", "bars", "club", "clubs", "nightlife", "pub", "pubs"),
+}
+
+_DISTANCE_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(km|kilometers?|kilometres?|m|meters?|metres?|mi|miles?)\b", re.I)
+_TIME_RE = re.compile(r"(\d{1,2})(?::(\d{2}))?\s*([ap]\.?m\.?)?", re.I)
+_WITHIN_RE = re.compile(r"within\s+(\d+(?:\.\d+)?)\s*(km|kilometers?|kilometres?|m|meters?|metres?|mi|miles?)\b", re.I)
+_OPEN_NOW_RE = re.compile(r"\b(open now|right now|currently open|open at the moment|still open|open)\b", re.I)
+_HOURS_QUESTION_RE = re.compile(r"\b(when|what time|hours)\b", re.I)
+_WORD_RE = re.compile(r"[a-z]+")
+
+
+def parse_distance_km(text: str) -> float:
+    """Convert strings such as ``"1.2 km"``, ``"800 m"`` or ``"0.5 miles"`` to kilometres."""
+
+    match = _DISTANCE_RE.search(text or "")
+    if not match:
+        return float("inf")
+    value, unit = float(match.group(1)), match.group(2).lower()
+    if unit.startswith("mi"):
+        return value * 1.609344
+    if unit.startswith("k"):
+        return value
+    return value / 1000.0
+
+
+def _parse_clock(text: str) -> Optional[int]:
+    match = _TIME_RE.fullmatch(text.strip())
+    if not match:
+        return None
+    hour, minute = int(match.group(1)), int(match.group(2) or 0)
+    meridiem = (match.group(3) or "").lower().replace(".", "")
+    if meridiem == "pm" and hour != 12:
+        hour += 12
+    elif meridiem == "am" and hour == 12:
+        hour = 0
+    total = hour * 60 + minute
+    if minute > 59 or total > MINUTES_PER_DAY:
+        return None
+    return total
+
+
+def parse_opening_hours(text: str) -> Tuple[Tuple[int, int], ...]:
+    """Parse ``"6:00 AM - 9:00 PM"`` style hours into ``(open, close)`` minute intervals.
+
+    Several intervals may be separated by commas or semicolons.  Intervals that
+    run past midnight are split in two; ``"24 hours"`` covers the whole day and
+    unparseable or ``"closed"`` values yield no intervals.
+    """
+
+    lowered = (text or "").strip().lower()
+    if not lowered or "closed" in lowered:
+        return ()
+    if "24/7" in lowered or ("24" in lowered and ("hour" in lowered or "hrs" in lowered)):
+        return ((0, MINUTES_PER_DAY),)
+
+    intervals: List[Tuple[int, int]] = []
+    for part in re.split(r"[,;]", lowered):
+        bounds = re.split(r"\s*(?:-|–|—|to)\s*", part.strip(), maxsplit=1)
+        if len(bounds) != 2:
+            continue
+        start, end = _parse_clock(bounds[0]), _parse_clock(bounds[1])
+        if start is None or end is None:
+            continue
+        if end <= start:
+            intervals.append((start, MINUTES_PER_DAY))
+            if end:
+                intervals.append((0, end))
+        else:
+            intervals.append((start, end))
+    return tuple(sorted(intervals))
+
+
+def _category_key(category: str) -> str:
+    """Map a free-form category name onto one of the alias buckets (or itself)."""
+
+    words = set(_WORD_RE.findall(category.lower()))
+    for key, aliases in CATEGORY_ALIASES.items():
+        if words & set(aliases):
+            return key
+    return category.strip().lower()
+
+
+@dataclass(frozen=True)
+class Place:
+    """A parsed ``local_guide`` entry."""
+
+    name: str
+    description: str
+    category: str
+    distance_km: float
+    opening_hours: str
+    intervals: Tuple[Tuple[int, int], ...]
+
+    def is_open(self, minute_of_day: int) -> bool:
+        return any(start <= minute_of_day < end for start, end in self.intervals)
+
+    def describe(self) -> str:
+        distance = f"{self.distance_km:.1f} km" if self.distance_km != float("inf") else "nearby"
+        hours = f", open {self.opening_hours}" if self.opening_hours else ""
+        return f"{self.name} ({self.category}, {distance}{hours}): {self.description}"
+
+
+class LocalGuideIndex:
+    """Places pre-sorted by distance and bucketed by category."""
+
+    def __init__(self, places: Sequence[Place]):
+        self.places: List[Place] = sorted(places, key=lambda p: (p.distance_km, p.name))
+        self.buckets: Dict[str, List[Place]] = {}
+        for place in self.places:
+            self.buckets.setdefault(_category_key(place.category), []).append(place)
+
+        self._word_to_bucket: Dict[str, str] = {}
+        for key in self.buckets:
+            for word in _WORD_RE.findall(key):
+                self._word_to_bucket[word] = key
+            for alias in CATEGORY_ALIASES.get(key, ()):
+                self._word_to_bucket[alias] = key
+
+    @classmethod
+    def from_entries(cls, entries: Optional[Sequence[dict]] = None) -> "LocalGuideIndex":
+        """Build the index from raw ``local_guide`` entries."""
+
+        if entries is None:
+            entries = get_section("local_guide", []) or []
+        places = [
+            Place(
+                name=str(entry.get("place_name", "")).strip(),
+                description=str(entry.get("description", "")).strip(),
+                category=str(entry.get("category", "")).strip(),
+                distance_km=parse_distance_km(str(entry.get("distance_from_hotel", ""))),
+                opening_hours=str(entry.get("opening_hours", "")).strip(),
+                intervals=parse_opening_hours(str(entry.get("opening_hours", ""))),
+            )
+            for entry in entries
+            if entry.get("place_name")
+        ]
+        return cls(places)
+
+    def category_for(self, text: str) -> Optional[str]:
+        """Return the category bucket mentioned in ``text``, if any."""
+
+        words = _WORD_RE.findall((text or "").lower())
+        for word in words:
+            bucket = self._word_to_bucket.get(word)
+            if bucket:
+                return bucket
+        for word in words:
+            for key, aliases in CATEGORY_ALIASES.items():
+                if word in aliases:
+                    return key
+        return None
+
+    def nearest(self, category: Optional[str] = None, *, open_at: Optional[datetime] = None,
+                max_km: Optional[float] = None, limit: int = 3) -> List[Place]:
+        """Return up to ``limit`` places, nearest first.
+
+        ``category`` is a bucket key (see :meth:`category_for`); ``open_at``
+        keeps only places open at that time.
+        """
+
+        candidates = self.buckets.get(category, []) if category else self.places
+        minute = open_at.hour * 60 + open_at.minute if open_at is not None else None
+        results: List[Place] = []
+        for place in candidates:
+            if max_km is not None and place.distance_km > max_km:
+                break
+            if minute is not None and not place.is_open(minute):
+                continue
+            results.append(place)
+            if len(results) >= limit:
+                break
+        return results
+
+
+@lru_cache(maxsize=1)
+def get_local_guide_index() -> LocalGuideIndex:
+    """Return the process-wide local guide index, built on first use."""
+
+    return LocalGuideIndex.from_entries()
+
+
+def local_guide_response(user_query: str, now: Optional[datetime] = None) -> str:
+    """Answer "what's nearby / open now" questions from the local guide index."""
+
+    index = get_local_guide_index()
+    if not index.places:
+        return "I'm sorry, I don't have local area recommendations available right now."
+
+    text = user_query or ""
+    category = index.category_for(text)
+    open_now = bool(_OPEN_NOW_RE.search(text)) and not _HOURS_QUESTION_RE.search(text)
+    max_km = None
+    within = _WITHIN_RE.search(text)
+    if within:
+        max_km = parse_distance_km(within.group(0))
+
+    now = now or datetime.now()
+    places = index.nearest(category, open_at=now if open_now else None, max_km=max_km)
+    scope = f"{category} spots" if category else "places"
+
+    if not places:
+        if open_now:
+            closed = index.nearest(category, max_km=max_km)
+            if closed:
+                hours = "; ".join(f"{p.name} ({p.opening_hours})" for p in closed)
+                return f"I'm afraid none of the nearby {scope} are open right now. Opening hours: {hours}."
+        return f"I'm sorry, I couldn't find any nearby {scope} matching your request."
+
+    header = f"Here are the nearest {scope}{' open right now' if open_now else ''}:"
+    lines = "\n".join(f"- {place.describe()}" for place in places)
+    return f"{header}\n{lines}"
@@ -0,0 +1,344 @@
+"""Structured menu query engine for the restaurant agent.
+
+The menus in ``data/rag_database.json`` and ``data/restaurant.csv`` are loaded
+once into a columnar view (one NumPy array per attribute).  Guest questions are
+parsed into simple constraints -- meal period, dietary tags, a price ceiling and
+ingredient keywords -- which run as vectorized filters over those columns, so
+every dish returned is guaranteed to exist on the real menu.
+
+Dietary tags come from the data (the CSV's ``dietary_tags`` column or a dish's
+``dietary_tags`` list) when it has them.  Otherwise they are inferred from the
+ingredients a description names -- which cannot prove a dish is free of an
+allergen -- so such items are marked unverified and answers built on them say
+so (:func:`dietary_caveat`).
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from agents.knowledge_base import get_section
+
+RESTAURANT_CSV_PATH = "data/restaurant.csv"
+
+MEAL_PERIODS: Tuple[str, ...] = ("breakfast", "brunch", "lunch", "dinner")
+_MEAL_ALIASES: Dict[str, str] = {
+    "breakfast": "breakfast",
+    "morning": "breakfast",
+    "brunch": "brunch",
+    "lunch": "lunch",
+    "midday": "lunch",
+    "dinner": "dinner",
+    "supper": "dinner",
+    "evening": "dinner",
+    "tonight": "dinner",
+}
+
+DIETARY_TAGS: Tuple[str, ...] = ("vegetarian", "vegan", "pescatarian", "gluten_free", "dairy_free")
+_DIETARY_PHRASES: Tuple[Tuple[str, str], ...] = (
+    ("gluten free", "gluten_free"),
+    ("without gluten", "gluten_free"),
+    ("no gluten", "gluten_free"),
+    ("celiac", "gluten_free"),
+    ("dairy free", "dairy_free"),
+    ("lactose free", "dairy_free"),
+    ("without dairy", "dairy_free"),
+    ("no dairy", "dairy_free"),
+    ("vegetarian", "vegetarian"),
+    ("veggie", "vegetarian"),
+    ("meatless", "vegetarian"),
+    ("no meat", "vegetarian"),
+    ("vegan", "vegan"),
+    ("plant based", "vegan"),
+    ("pescatarian", "pescatarian"),
+)
+
+# Ingredient families used to derive dietary tags from the menu descriptions.
+_MEAT = {
+    "chicken", "beef", "steak", "sirloin", "pork", "bacon", "ham", "sausage", "lamb",
+    "turkey", "duck", "veal", "prosciutto", "salami", "pepperoni", "chorizo",
+    "meatball", "burger", "brisket", "rib",
+}
+_SEAFOOD = {
+    "salmon", "tuna", "fish", "shrimp", "prawn", "cod", "crab", "lobster", "anchovy",
+    "oyster", "mussel", "scallop", "clam", "calamari", "halibut", "trout", "seafood",
+}
+_DAIRY = {
+    "butter", "cheese", "parmesan", "mozzarella", "cheddar", "feta", "yogurt",
+    "yoghurt", "cream", "milk", "ricotta", "brie", "gouda", "mascarpone", "ghee",
+}
+_EGG = {"egg", "mayonnaise", "mayo", "aioli", "hollandaise", "omelette", "omelet", "meringue"}
+_OTHER_ANIMAL = {"honey", "gelatin"}
+_GLUTEN = {
+    "bread", "toast", "pasta", "pastry", "crouton", "waffle", "sourdough", "bun",
+    "bagel", "croissant", "pancake", "flour", "noodle", "pizza", "tortilla", "wrap",
+    "baguette", "brioche", "couscous", "cracker", "cake", "muffin", "biscuit",
+    "barley", "wheat", "rye",
+}
+
+# Words that appear in descriptions but never narrow down a guest question.
+_GENERIC_TERMS = {
+    "a", "an", "and", "or", "the", "of", "with", "in", "on", "to", "for", "our", "your",
+    "served", "topped", "tossed", "fresh", "seasonal", "style", "choice", "house",
+    "menu", "dish", "option", "item", "food", "meal", "something", "anything",
+}
+
+_TOKEN_RE = re.compile(r"[a-z]+")
+_PRICE_CEILING_RE = re.compile(
+    r"(?:under|below|less than|cheaper than|at most|up to|no more than|max(?:imum)?|within)"
+    r"\s*\$?\s*(\d+(?:\.\d{1,2})?)"
+)
+_PRICE_SUFFIX_RE = re.compile(r"\$\s*(\d+(?:\.\d{1,2})?)\s*(?:or less|or under|or below|max)")
+
+
+def _stem(token: str) -> str:
+    """Reduce simple English plurals so 'eggs' and 'egg' share one column."""
+
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 4 and token.endswith("oes"):
+        return token[:-2]
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def _terms(text: str) -> List[str]:
+    return [_stem(tok) for tok in _TOKEN_RE.findall(text.lower())]
+
+
+def _derive_tags(terms: Iterable[str]) -> Tuple[str, ...]:
+    """Infer likely dietary tags from the ingredients named in an item.
+
+    An ingredient missing from a description is not evidence that the dish is
+    free of it; items tagged this way have ``tags_verified=False``.
+    """
+
+    present = set(terms)
+    has_meat = bool(present & _MEAT)
+    has_seafood = bool(present & _SEAFOOD)
+    has_dairy = bool(present & _DAIRY)
+    tags = []
+    if not has_meat and not has_seafood:
+        tags.append("vegetarian")
+        if not has_dairy and not present & _EGG and not present & _OTHER_ANIMAL:
+            tags.append("vegan")
+    if not has_meat:
+        tags.append("pescatarian")
+    if not present & _GLUTEN:
+        tags.append("gluten_free")
+    if not has_dairy:
+        tags.append("dairy_free")
+    return tuple(tags)
+
+
+def _parse_tags(raw: object) -> Optional[Tuple[str, ...]]:
+    """Explicit dietary tags from the data ("vegan; gluten-free" or a list), or ``None``."""
+
+    if isinstance(raw, str):
+        raw = re.split(r"[;,|]", raw)
+    if not isinstance(raw, (list, tuple)):
+        return None
+    tags = tuple(str(t).strip().lower().replace("-", "_").replace(" ", "_") for t in raw if str(t).strip())
+    return tags or None
+
+
+def dietary_caveat(query: "MenuQuery", items: Sequence["MenuItem"]) -> str:
+    """Warning to add when a dietary answer rests on inferred tags; empty otherwise."""
+
+    if not query.dietary or all(item.tags_verified for item in items):
+        return ""
+    return ("These are based on the ingredients in our menu descriptions; we don't have verified allergen "
+            "information for them, so please confirm with our staff before ordering.")
+
+
+@dataclass(frozen=True)
+class MenuItem:
+    """A single dish as shown to guests."""
+
+    name: str
+    meal_type: str
+    description: str
+    price: float
+    tags: Tuple[str, ...] = ()
+    # False when the tags were inferred from the description, not given by the data.
+    tags_verified: bool = True
+
+    def describe(self) -> str:
+        price = f"{self.price:g}" if self.price == int(self.price) else f"{self.price:.2f}"
+        return f"{self.name} ({self.meal_type}): {self.description.rstrip('.')}, priced at ${price}"
+
+
+@dataclass(frozen=True)
+class MenuQuery:
+    """Constraints parsed from a guest question."""
+
+    meal_types: Tuple[str, ...] = ()
+    dietary: Tuple[str, ...] = ()
+    max_price: Optional[float] = None
+    keywords: Tuple[str, ...] = ()
+
+    def is_empty(self) -> bool:
+        return not (self.meal_types or self.dietary or self.keywords) and self.max_price is None
+
+    def describe(self) -> str:
+        """Human-readable summary, e.g. 'vegetarian dinner options under $25'."""
+
+        parts = [tag.replace("_", "-") for tag in self.dietary]
+        parts.extend(self.meal_types)
+        text = " ".join(parts + ["options"])
+        if self.keywords:
+            text += " with " + " or ".join(self.keywords)
+        if self.max_price is not None:
+            text += f" under ${self.max_price:g}"
+        return text
+
+
+class MenuIndex:
+    """Columnar, vectorized view over every menu item."""
+
+    def __init__(self, items: Sequence[MenuItem]):
+        self.items: List[MenuItem] = list(items)
+        meal_codes = {meal: code for code, meal in enumerate(MEAL_PERIODS)}
+        tag_bits = {tag: 1 << bit for bit, tag in enumerate(DIETARY_TAGS)}
+
+        self._meal_codes = meal_codes
+        self._tag_bits = tag_bits
+        self.meal = np.array([meal_codes.get(item.meal_type, -1) for item in self.items], dtype=np.int8)
+        self.price = np.array([item.price for item in self.items], dtype=np.float64)
+        self.tags = np.array(
+            [sum(tag_bits.get(tag, 0) for tag in item.tags) for item in self.items],
+            dtype=np.uint8,
+        )
+
+        item_terms = [set(_terms(f"{item.name} {item.description}")) - _GENERIC_TERMS for item in self.items]
+        self.vocabulary: Dict[str, int] = {
+            term: col for col, term in enumerate(sorted(set().union(*item_terms)))
+        } if item_terms else {}
+        self.terms = np.zeros((len(self.items), len(self.vocabulary)), dtype=bool)
+        for row, terms in enumerate(item_terms):
+            self.terms[row, [self.vocabulary[t] for t in terms]] = True
+
+    @classmethod
+    def from_sources(cls, menus: Optional[Dict[str, list]] = None,
+                     csv_path: str = RESTAURANT_CSV_PATH) -> "MenuIndex":
+        """Build the index from the knowledge base menus plus the restaurant CSV."""
+
+        if menus is None:
+            menus = get_section("menus", {}) or {}
+
+        items: List[MenuItem] = []
+        seen = set()
+
+        def add(name, meal_type, description, price, tags=None) -> None:
+            name = str(name).strip()
+            meal_type = str(meal_type).strip().lower()
+            key = (name.lower(), meal_type)
+            if not name or key in seen:
+                return
+            try:
+                price = float(price)
+            except (TypeError, ValueError):
+                return
+            seen.add(key)
+            description = "" if description is None else str(description).strip()
+            verified = bool(tags)
+            if not tags:
+                tags = _derive_tags(_terms(f"{name} {description}"))
+            items.append(MenuItem(name, meal_type, description, price, tuple(tags), verified))
+
+        for meal_type, dishes in menus.items():
+            for dish in dishes or []:
+                add(dish.get("name"), meal_type, dish.get("description"), dish.get("price"),
+                    _parse_tags(dish.get("dietary_tags")))
+
+        if os.path.exists(csv_path):
+            import pandas as pd
+
+            df = pd.read_csv(csv_path)
+            if {"item", "meal_type", "price"}.issubset(df.columns):
+                for row in df.to_dict("records"):
+                    add(row["item"], row["meal_type"], row.get("description"), row["price"],
+                        _parse_tags(row.get("dietary_tags")))
+
+        return cls(items)
+
+    def parse(self, user_query: str) -> MenuQuery:
+        """Extract meal period, dietary, price and ingredient constraints."""
+
+        text = (user_query or "").lower().replace("-", " ")
+        tokens = _TOKEN_RE.findall(text)
+
+        meal_types = []
+        for token in tokens:
+            meal = _MEAL_ALIASES.get(token)
+            if meal and meal not in meal_types:
+                meal_types.append(meal)
+
+        dietary = []
+        for phrase, tag in _DIETARY_PHRASES:
+            if re.search(rf"\b{phrase}\b", text) and tag not in dietary:
+                dietary.append(tag)
+
+        max_price = None
+        match = _PRICE_CEILING_RE.search(text) or _PRICE_SUFFIX_RE.search(text)
+        if match:
+            max_price = float(match.group(1))
+
+        ignored = set(_MEAL_ALIASES) | {word for phrase, _ in _DIETARY_PHRASES for word in phrase.split()}
+        keywords = []
+        for token in tokens:
+            if token in ignored:
+                continue
+            term = _stem(token)
+            if term in self.vocabulary and term not in keywords:
+                keywords.append(term)
+
+        return MenuQuery(tuple(meal_types), tuple(dietary), max_price, tuple(keywords))
+
+    def filter(self, query: MenuQuery) -> List[MenuItem]:
+        """Run the constraints as boolean masks and return matches, cheapest first."""
+
+        if not self.items:
+            return []
+
+        mask = np.ones(len(self.items), dtype=bool)
+        if query.meal_types:
+            codes = [self._meal_codes[m] for m in query.meal_types if m in self._meal_codes]
+            mask &= np.isin(self.meal, codes)
+        if query.dietary:
+            required = sum(self._tag_bits.get(tag, 0) for tag in query.dietary)
+            mask &= (self.tags & required) == required
+        if query.max_price is not None:
+            mask &= self.price <= query.max_price
+        if query.keywords:
+            cols = [self.vocabulary[k] for k in query.keywords if k in self.vocabulary]
+            hits = self.terms[:, cols].sum(axis=1)
+            hits[~mask] = 0
+            best = hits.max() if hits.size else 0
+            mask &= (hits == best) & (hits > 0)
+
+        selected = np.flatnonzero(mask)
+        order = selected[np.argsort(self.price[selected], kind="stable")]
+        return [self.items[i] for i in order]
+
+    def search(self, user_query: str) -> Tuple[MenuQuery, List[MenuItem]]:
+        """Parse the guest question and return ``(constraints, matching items)``."""
+
+        query = self.parse(user_query)
+        if query.is_empty():
+            return query, []
+        return query, self.filter(query)
+
+
+@lru_cache(maxsize=1)
+def get_menu_index() -> MenuIndex:
+    """Return the process-wide menu index, built on first use."""
+
+    return MenuIndex.from_sources()
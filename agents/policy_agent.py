@@ -1,43 +1,41 @@
 # agents/policy_agent.py
 
-from openai import OpenAI
-from dotenv import load_dotenv
-import os
-import json
-
-# Load environment variables (OpenAI key)
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-MODEL_NAME = os.getenv("MODEL_NAME", "gpt-4o-mini")
+from agents.llm_gateway import MODEL_NAME, chat_completion
+from agents.policy_index import get_policy_index
 
 def policy_response(user_query: str):
     """
-    Answers questions related to hotel policies using the local JSON file (hotel_policies.csv or JSON).
-    Falls back to OpenAI API if no direct policy match is found.
+    Answers questions related to hotel policies using the policy index built from
+    rag_database.json (hotel_policies) and data/hotel_policies.csv.
+    Known policies are answered directly from a template; the OpenAI API is only
+    used for questions the index cannot answer confidently.
     """
-    # Try to load your local policy data (CSV or JSON)
-    try:
-        with open("data/hotel_policies.csv", "r", encoding="utf-8") as f:
-            lines = f.readlines()
-    except FileNotFoundError:
-        lines = []
-
-    user_query_lower = user_query.lower()
-    matched_line = None
-
-    for line in lines:
-        if user_query_lower in line.lower():
-            matched_line = line.strip()
-            break
-
-    # If a local policy is found, use it directly
-    if matched_line:
-        prompt = f"A guest asked: '{user_query}'. Here is the relevant hotel policy: {matched_line}. Provide a friendly and clear answer."
+    index = get_policy_index()
+    match = index.lookup(user_query)
+
+    # A known policy matched with high confidence: answer straight from the data
+    if match.confident:
+        return match.answer()
+
+    if match.complaint:
+        # A grievance gets an apology and help, never canned policy text
+        policies = "\n".join(f"- {entry.label}: {entry.value}" for entry in match.entries)
+        prompt = (
+            f"A guest complained: '{user_query}'. Apologize sincerely, say the front desk will help right away "
+            "and offer a concrete next step."
+            + (f" Mention these policies only if they help the guest:\n{policies}" if policies else "")
+        )
+    elif match.entries:
+        policies = "\n".join(f"- {entry.label}: {entry.value}" for entry in match.entries)
+        prompt = f"A guest asked: '{user_query}'. Here are the relevant hotel policies:\n{policies}\nProvide a friendly and clear answer."
     else:
-        prompt = f"A guest asked about hotel policy: '{user_query}'. Provide a helpful and professional response based on general hospitality rules."
+        prompt = (
+            f"A guest asked about hotel policy: '{user_query}'. Our hotel policies are:\n{index.describe_all()}\n"
+            "Provide a helpful and professional response based on these policies and general hospitality rules."
+        )
 
     # Generate answer using OpenAI API
-    completion = client.chat.completions.create(
+    return chat_completion(
         model=MODEL_NAME,
         messages=[
             {"role": "system", "content": "You are a helpful hotel policy assistant."},
@@ -45,5 +43,3 @@ def policy_response(user_query: str):
         ],
         temperature=0.6,
     )
-
-    return completion.choices[0].message.content.strip()
@@ -0,0 +1,225 @@
+"""Keyword-indexed hotel policies with templated answers.
+
+Policies come from the ``hotel_policies`` section of ``data/rag_database.json``
+and, when present, ``data/hotel_policies.csv``.  Each policy key carries a set
+of synonyms (e.g. "dog" -> ``pet_policy``) so the common questions -- pets,
+smoking, cancellation, payment, check-in/out -- are answered straight from the
+static data without an LLM call.
+"""
+
+from __future__ import annotations
+
+import csv
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+from agents.knowledge_base import get_section
+
+POLICY_CSV_PATH = "data/hotel_policies.csv"
+
+# Synonyms per policy key.  Multi-word phrases count double when scoring.
+POLICY_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "check_in_time": (
+        "check in", "checkin", "arrival time", "early check in", "early arrival",
+    ),
+    "check_out_time": (
+        "check out", "checkout", "late check out", "late checkout", "leave the room",
+    ),
+    "cancellation_policy": (
+        "cancel", "cancellation", "cancelling", "canceling", "refund", "no show", "change my booking",
+    ),
+    "pet_policy": (
+        "pet", "pets", "dog", "dogs", "cat", "cats", "animal", "animals", "puppy", "service animal",
+    ),
+    "smoking_policy": (
+        "smoke", "smoking", "smoker", "cigarette", "cigarettes", "vape", "vaping", "e cigarette",
+    ),
+    # No bare "card": a key card or a gift card is not a payment question.
+    "payment_methods": (
+        "pay", "payment", "payments", "credit card", "credit cards", "debit card", "debit cards",
+        "pay by card", "pay with card", "card payment", "accept cards", "cash", "visa",
+        "mastercard", "amex", "american express",
+    ),
+}
+
+# Bare words that also turn up in questions about something else ("pay for
+# parking", "cash back", "a cat on site", a travel "visa").  Alone they are
+# still passed to the model as context, but a direct answer needs a score of
+# at least MIN_DIRECT_SCORE: a multi-word phrase or a second keyword.
+AMBIGUOUS_WORDS: FrozenSet[str] = frozenset({"pay", "cash", "cat", "cats", "animal", "animals", "cancel", "visa"})
+MIN_DIRECT_SCORE = 2
+
+ANSWER_TEMPLATES: Dict[str, str] = {
+    "check_in_time": "Check-in time is {value}.",
+    "check_out_time": "Check-out time is {value}.",
+    "cancellation_policy": "Our cancellation policy: {value}",
+    "pet_policy": "Our pet policy: {value}",
+    "smoking_policy": "Our smoking policy: {value}",
+    "payment_methods": "We accept the following payment methods: {value}",
+}
+
+# Phrasing that signals a grievance rather than a policy lookup, matched as
+# whole words after normalization ("doesn't" -> "doesn t").
+_COMPLAINT_CUES = (
+    "complain", "complaint", "complaining", "terrible", "awful", "horrible", "dirty", "filthy",
+    "rude", "unacceptable", "disappointed", "disappointing", "angry", "upset", "worst",
+    "broke", "broken", "not working", "doesn t work", "does not work", "won t work",
+    "stopped working", "doesn t open", "does not open", "won t open", "not open",
+    "leaking", "leak", "noisy", "smells", "stinks", "no hot water", "took forever",
+    "still waiting", "never arrived",
+)
+
+_KEY_COLUMNS = ("policy", "policy_name", "name", "topic", "category", "key")
+_VALUE_COLUMNS = ("details", "description", "policy_text", "text", "value", "rule")
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+
+
+def _normalize(text: str) -> str:
+    return " " + _NON_WORD_RE.sub(" ", (text or "").lower()).strip() + " "
+
+
+def _snake(text: str) -> str:
+    return _NON_WORD_RE.sub("_", text.lower()).strip("_")
+
+
+@dataclass(frozen=True)
+class PolicyEntry:
+    """One policy with the phrases that identify it."""
+
+    key: str
+    value: str
+    phrases: Tuple[str, ...]
+
+    @property
+    def label(self) -> str:
+        return self.key.replace("_", " ").capitalize()
+
+    def answer(self) -> str:
+        template = ANSWER_TEMPLATES.get(self.key, "{label}: {value}")
+        return template.format(label=self.label, value=self.value.strip())
+
+
+def is_complaint(user_query: str) -> bool:
+    """True when the message reads like a grievance (see ``_COMPLAINT_CUES``)."""
+
+    text = _normalize(user_query)
+    return any(f" {cue} " in text for cue in _COMPLAINT_CUES)
+
+
+@dataclass(frozen=True)
+class PolicyMatch:
+    """Result of looking a question up in the index."""
+
+    entries: Tuple[PolicyEntry, ...]
+    confident: bool
+    complaint: bool = False
+
+    def answer(self) -> str:
+        return " ".join(entry.answer() for entry in self.entries)
+
+
+class PolicyIndex:
+    """Phrase -> policy lookup table."""
+
+    def __init__(self, entries: Sequence[PolicyEntry], max_direct: int = 2):
+        self.entries: Dict[str, PolicyEntry] = {entry.key: entry for entry in entries}
+        self.max_direct = max_direct
+        self._phrases: List[Tuple[str, str, int]] = sorted(
+            (
+                (f" {phrase} ", key, 2 if " " in phrase else 1)
+                for key, entry in self.entries.items()
+                for phrase in {_normalize(p).strip() for p in entry.phrases}
+                if phrase
+            ),
+            key=lambda item: -len(item[0]),
+        )
+
+    @staticmethod
+    def _keyword_key(text: str) -> Optional[str]:
+        normalized = _normalize(text)
+        for key, phrases in POLICY_KEYWORDS.items():
+            if any(f" {_normalize(p).strip()} " in normalized for p in phrases):
+                return key
+        return None
+
+    @classmethod
+    def from_sources(cls, policies: Optional[Dict[str, str]] = None,
+                     csv_path: str = POLICY_CSV_PATH) -> "PolicyIndex":
+        """Build the index from the knowledge base section plus the policy CSV."""
+
+        if policies is None:
+            policies = get_section("hotel_policies", {}) or {}
+
+        values: Dict[str, str] = {}
+        for key, value in policies.items():
+            values[_snake(key)] = str(value)
+
+        if os.path.exists(csv_path):
+            with open(csv_path, "r", encoding="utf-8", newline="") as f:
+                rows = list(csv.reader(f))
+            header = [h.strip().lower() for h in rows[0]] if rows else []
+            key_col = next((header.index(c) for c in _KEY_COLUMNS if c in header), None)
+            value_col = next((header.index(c) for c in _VALUE_COLUMNS if c in header), None)
+            if key_col is not None and value_col is not None:
+                for row in rows[1:]:
+                    if len(row) <= max(key_col, value_col) or not row[value_col].strip():
+                        continue
+                    name = row[key_col]
+                    key = cls._keyword_key(name) or _snake(name)
+                    values.setdefault(key, row[value_col].strip())
+            else:
+                # Free-form lines: file each one under the policy it mentions.
+                for row in rows:
+                    line = ", ".join(cell.strip() for cell in row if cell.strip())
+                    key = cls._keyword_key(line)
+                    if key:
+                        values.setdefault(key, line)
+
+        entries = []
+        for key, value in values.items():
+            phrases = POLICY_KEYWORDS.get(key) or (key.replace("_", " "),)
+            entries.append(PolicyEntry(key, value, tuple(phrases)))
+        return cls(entries)
+
+    def lookup(self, user_query: str) -> PolicyMatch:
+        """Score every policy against the question.
+
+        The match is confident when one or two policies are named explicitly
+        -- by a distinctive keyword, or with a score of ``MIN_DIRECT_SCORE``
+        when only ambiguous words matched -- and the question does not read
+        like a complaint.
+        """
+
+        text = _normalize(user_query)
+        scores: Dict[str, int] = {}
+        positions: Dict[str, int] = {}
+        explicit: Set[str] = set()
+        for phrase, key, weight in self._phrases:
+            position = text.find(phrase)
+            if position >= 0:
+                scores[key] = scores.get(key, 0) + weight
+                positions[key] = min(position, positions.get(key, position))
+                if phrase.strip() not in AMBIGUOUS_WORDS:
+                    explicit.add(key)
+                # Blank out the phrase so "late checkout" does not also score "checkout".
+                text = text.replace(phrase, " " * len(phrase))
+
+        ranked = sorted(scores, key=lambda k: (-scores[k], positions[k]))
+        entries = tuple(self.entries[key] for key in ranked)
+        complaint = is_complaint(user_query)
+        named = all(key in explicit or scores[key] >= MIN_DIRECT_SCORE for key in ranked)
+        confident = 0 < len(entries) <= self.max_direct and named and not complaint
+        return PolicyMatch(entries, confident, complaint)
+
+    def describe_all(self) -> str:
+        return "\n".join(f"- {entry.label}: {entry.value}" for entry in self.entries.values())
+
+
+@lru_cache(maxsize=1)
+def get_policy_index() -> PolicyIndex:
+    """Return the process-wide policy index, built on first use."""
+
+    return PolicyIndex.from_sources()
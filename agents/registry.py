@@ -0,0 +1,107 @@
+"""Lazy registry of agent handlers.
+
+Each agent is registered as an import path (``"package.module:attribute"`` or
+just ``"package.module"``) and only imported the first time it is requested,
+so importing the router no longer pulls in pandas, Streamlit, the OpenAI SDK
+or the sentiment model.  Call :meth:`AgentRegistry.warm` at server start to pay
+those costs up front instead of on the first guest request.
+"""
+
+from __future__ import annotations
+
+import functools
+import importlib
+import threading
+import time
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from utils import tracing
+from utils.usage import attribute
+
+
+class AgentRegistry:
+    """Map agent names to lazily imported handlers."""
+
+    def __init__(self, specs: Optional[Dict[str, str]] = None):
+        self._specs: Dict[str, str] = dict(specs or {})
+        self._loaded: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, target: str) -> None:
+        """Register ``target`` (``"module:attr"`` or ``"module"``) under ``name``."""
+
+        with self._lock:
+            self._specs[name] = target
+            self._loaded.pop(name, None)
+
+    def names(self) -> List[str]:
+        return list(self._specs)
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._loaded
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._specs
+
+    def get(self, name: str) -> Any:
+        """Return the handler for ``name``, importing its module on first use.
+
+        Handler functions come back wrapped so their LLM usage is attributed
+        to ``name`` and, with tracing enabled, each call is timed as an
+        ``agent`` span.  Module targets are returned as-is.
+        """
+
+        try:
+            return self._loaded[name]
+        except KeyError:
+            pass
+
+        with self._lock:
+            if name not in self._loaded:
+                target = self._specs[name]
+                module_name, _, attr = target.partition(":")
+                module = importlib.import_module(module_name)
+                handler = getattr(module, attr) if attr else module
+                if callable(handler) and not isinstance(handler, ModuleType):
+                    handler = _instrumented(name, handler)
+                self._loaded[name] = handler
+            return self._loaded[name]
+
+    def warm(self, names: Optional[Iterable[str]] = None) -> Dict[str, float]:
+        """Import the given agents (default: all) now; returns seconds spent per agent.
+
+        Agents whose dependencies are missing are skipped and reported as ``-1``.
+        """
+
+        timings: Dict[str, float] = {}
+        for name in names if names is not None else self.names():
+            started = time.perf_counter()
+            try:
+                self.get(name)
+            except ImportError:
+                timings[name] = -1.0
+                continue
+            timings[name] = time.perf_counter() - started
+        return timings
+
+
+def _instrumented(name: str, handler: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(handler)
+    def run(*args: Any, **kwargs: Any) -> Any:
+        with attribute(agent=name), tracing.span("agent", agent=name):
+            return handler(*args, **kwargs)
+
+    return run
+
+
+AGENTS = AgentRegistry({
+    "faq": "agents.faq_agent:faq_answer",
+    "booking": "agents.booking_agent:booking_agent",
+    "restaurant": "agents.restaurant_agent:restaurant_response",
+    "spa": "agents.spa_agent:spa_response",
+    "shuttle": "agents.shuttle_agent:shuttle_response",
+    "policy": "agents.policy_agent:policy_response",
+    "local_guide": "agents.local_guide_agent:local_guide_response",
+    "sentiment": "agents.sentiment_agent",
+})
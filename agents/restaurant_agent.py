@@ -1,29 +1,50 @@
-from openai import OpenAI
-from dotenv import load_dotenv
-import os, pandas as pd
+from dataclasses import replace
+
+from agents.llm_gateway import MODEL_NAME, LLMUnavailable, chat_completion
+from agents.menu_index import dietary_caveat, get_menu_index
+
+
+def _format_items(items):
+    return "\n".join(f"- {item.describe()}" for item in items)
 
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-MODEL_NAME = os.getenv("MODEL_NAME", "gpt-4o-mini")
 
 def restaurant_response(user_query: str):
-    """Fetches menu info from restaurant.csv or uses OpenAI fallback."""
-    try:
-        df = pd.read_csv("data/restaurant.csv")
-    except FileNotFoundError:
-        df = pd.DataFrame()
+    """Answers menu questions from the structured menu index; the LLM only phrases verified results."""
+    index = get_menu_index()
+    menu_query, items = index.search(user_query)
+    note = ""
 
-    match = df[df['item'].str.contains(user_query, case=False, na=False)] if 'item' in df else None
+    if not menu_query.is_empty() and not items and menu_query.meal_types:
+        # Nothing at the requested meal -- offer the same dishes at other times instead.
+        relaxed = replace(menu_query, meal_types=())
+        if not relaxed.is_empty():
+            items = index.filter(relaxed)
+            if items:
+                note = f"We have no {menu_query.describe()}, but these are available at other times:"
 
-    if match is not None and not match.empty:
-        row = match.iloc[0]
-        info = f"{row['item']} ({row['meal_type']}): {row['description']}, priced at ${row['price']}"
-        prompt = f"Guest asked: {user_query}\nMenu item found: {info}\nRespond warmly like a restaurant server."
+    if not menu_query.is_empty() and not items:
+        return f"I'm sorry, our current menu has no {menu_query.describe()}."
+
+    if items:
+        header = note or f"Here are our {menu_query.describe()}:"
+        verified = f"{header}\n{_format_items(items)}"
+        caveat = dietary_caveat(menu_query, items)
+        if caveat:
+            verified = f"{verified}\n{caveat}"
+        prompt = (
+            f"Guest asked: {user_query}\nVerified menu items:\n{verified}\n"
+            "Respond warmly like a restaurant server. Mention only these dishes and keep their prices unchanged."
+            + (" Repeat the note about allergen information word for word." if caveat else "")
+        )
     else:
-        prompt = f"The guest asked: '{user_query}'. No exact menu match found. Provide a friendly restaurant-style answer."
+        verified = None
+        prompt = (
+            f"The guest asked: '{user_query}'.\nOur full menu:\n{_format_items(index.items)}\n"
+            "Provide a friendly restaurant-style answer using only dishes from this menu."
+        )
 
     try:
-        completion = client.chat.completions.create(
+        return chat_completion(
             model=MODEL_NAME,
             messages=[
                 {"role": "system", "content": "You are a hotel restaurant assistant providing menu information and dining recommendations."},
@@ -31,6 +52,11 @@ def restaurant_response(user_query: str):
             ],
             temperature=0.6,
         )
-        return completion.choices[0].message.content.strip()
+    except LLMUnavailable:
+        if verified:
+            return verified
+        raise
     except Exception as e:
+        if verified:
+            return verified
         return f"⚠️ Sorry, I'm having trouble accessing the restaurant service right now. (Error: {str(e)})"
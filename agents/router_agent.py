@@ -1,37 +1,138 @@
-"""Main router agent that dispatches guest intents to specialized handlers."""
+"""Main router agent that dispatches guest intents to specialized handlers.
+
+Compound questions ("what time is the airport shuttle and can I book a
+massage tonight") are split into clauses, classified in parallel and, when
+they ask for different things, answered by their agents concurrently; the
+answers are merged in the order the guest asked.  The whole turn runs under
+``ROUTER_DEADLINE_SECONDS``, so latency is that of the slowest agent rather
+than the sum of all of them.
+
+While the LLM's circuit breaker is open, questions are answered from local
+data only (:func:`degraded_route`).
+
+Guests asking the same question at the same moment share one classification
+and one agent call (:func:`coalesced`); booking turns, which change the
+guest's own state, are never shared.  The most asked questions are answered
+from the pre-warmed cache (:mod:`utils.response_cache`) without either.
+"""
 
 from __future__ import annotations
 
-from typing import Callable, Dict
-from openai import OpenAI
-from dotenv import load_dotenv
+import contextvars
+import functools
 import os
-
-try:
-    import streamlit as st
-    HAS_STREAMLIT = True
-except ImportError:
-    HAS_STREAMLIT = False
-
-from agents.faq_agent import faq_answer
-from agents.booking_agent import booking_agent
-from agents.restaurant_agent import restaurant_response
-from agents.spa_agent import spa_response
-from agents.policy_agent import policy_response
-from agents.shuttle_agent import shuttle_response
-
-try:
-    from agents import sentiment_agent
-    HAS_SENTIMENT = True
-except ImportError:
-    HAS_SENTIMENT = False
-
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-MODEL_NAME = os.getenv("MODEL_NAME", "gpt-4o-mini")
+import re
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from types import ModuleType
+from typing import Callable, Dict, List, Optional, Tuple
+
+from agents.degraded import llm_available, local_answer
+from agents.knowledge_base import knowledge_version
+from agents.llm_gateway import MODEL_NAME, LLMUnavailable, chat_completion
+from agents.registry import AGENTS
+from utils import call_log
+from utils.response_cache import cached_answer
+from utils.single_flight import get_single_flight
+from utils.text_normalization import normalize_query
+from utils.tracing import span, traced
+from utils.usage import attribute
 
 Handler = Callable[[str], str]
 
+ROUTER_DEADLINE_SECONDS = float(os.getenv("ROUTER_DEADLINE_SECONDS", "12"))
+FANOUT_WORKERS = int(os.getenv("ROUTER_FANOUT_WORKERS", "8"))
+# Clauses shorter than this ("and gym") stay attached to their neighbour.
+MIN_CLAUSE_WORDS = 3
+
+_CLAUSE_BOUNDARY = re.compile(r"((?<=[?;])\s+|\s*[,;]?\s+(?:and|also|plus)\s+)", re.IGNORECASE)
+_LEADING_CONNECTOR = re.compile(r"^(?:(?:and|also|plus)\b[\s,]*)+", re.IGNORECASE)
+# A clause only stands on its own when it opens like a question...
+_QUESTION_START = re.compile(
+    r"^(?:please\s+)?(?:what|when|where|which|who|whose|why|how|is|are|was|were|am|do|does|did|"
+    r"can|could|will|would|should|shall|may|might|have|has)\b",
+    re.IGNORECASE,
+)
+# ...and does not point back at something named in an earlier one.
+_BACK_REFERENCE = re.compile(r"\b(?:it|its|they|them|their)\b", re.IGNORECASE)
+
+# Router category (substring of the classifier's answer) -> (INTENT_DISPATCH key,
+# registry agent), checked in order.
+_CATEGORY_ROUTES: Tuple[Tuple[Tuple[str, ...], str, str], ...] = (
+    (("faq",), "general_question", "faq"),
+    (("booking",), "booking_request", "booking"),
+    (("restaurant",), "restaurant_inquiry", "restaurant"),
+    (("spa",), "spa_request", "spa"),
+    (("shuttle",), "shuttle_request", "shuttle"),
+    (("policy",), "complaint", "policy"),
+    (("local", "guide"), "local_guide_request", "local_guide"),
+)
+
+# Cheap local guess of the category, used to prefetch an agent while the LLM
+# classifies (see route_query_speculative) and to route while it is unavailable.
+# Whole words only ("park" must not match "parking"), and booking needs a
+# room or stay next to the verb -- "book a table" is the restaurant's.
+_LIKELY_CATEGORY: Tuple[Tuple["re.Pattern[str]", str], ...] = tuple(
+    (re.compile(pattern, re.IGNORECASE), category)
+    for pattern, category in (
+        (r"^(?=.*\b(?:book|booking|reserve|reservation)\b)"
+         r"(?=.*\b(?:rooms?|suites?|stay|nights?|beds?|double|twin|king|queen)\b)", "booking"),
+        (r"\b(?:menu|dinner|lunch|breakfast|restaurant|vegan|vegetarian|dish(?:es)?|table)\b", "restaurant"),
+        (r"\b(?:spa|massages?|facials?|sauna)\b", "spa"),
+        (r"\b(?:shuttles?|airport|pick ?up)\b", "shuttle"),
+        (r"\b(?:polic(?:y|ies)|pets?|dogs?|smoking|cancel\w*|refunds?)\b", "policy"),
+        (r"\b(?:nearby|museums?|attractions?|parks?|around here)\b", "localguide"),
+    )
+)
+
+# Intents whose handlers change per-guest state; their calls are never coalesced.
+_STATEFUL_INTENTS = frozenset({"booking_request", "room_upgrade_inquiry"})
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _streamlit() -> Optional[ModuleType]:
+    """Return Streamlit if this process is running the Streamlit app.
+
+    Flask and voice workers never import Streamlit, so checking ``sys.modules``
+    keeps it out of their import path while the Streamlit app still gets
+    session-state backed booking flows.
+    """
+    return sys.modules.get("streamlit")
+
+
+def _agent(name: str) -> Handler:
+    """Return the agent handler registered under ``name``, importing it on first use."""
+    return AGENTS.get(name)
+
+
+def coalesce_key(intent: str, user_query: str) -> Tuple[str, str, str]:
+    """Key under which concurrent identical calls are shared.
+
+    Carrying the knowledge version means a request arriving after a data
+    update never joins a computation made against the old data.
+    """
+    return intent, normalize_query(user_query), knowledge_version()
+
+
+def coalesced(intent: str, user_query: str, fn: Callable[[], str]) -> str:
+    """Run ``fn`` once for all concurrent callers asking ``user_query`` for ``intent``."""
+    return get_single_flight().do(coalesce_key(intent, user_query), fn)
+
+
+def _sentiment_module() -> Optional[ModuleType]:
+    try:
+        module = AGENTS.get("sentiment")
+    except ImportError:
+        return None
+    is_available = getattr(module, "is_available", None)
+    if callable(is_available) and not is_available():
+        return None
+    return module
+
 
 def _ensure_string(response: object) -> str:
     """Convert the agent response to a string."""
@@ -41,7 +142,7 @@ def _ensure_string(response: object) -> str:
 
 
 def _handle_booking_request(user_message: str) -> str:
-    return _ensure_string(booking_agent(user_message))
+    return _ensure_string(_agent("booking")(user_message))
 
 
 def _handle_room_upgrade(user_message: str) -> str:
@@ -49,27 +150,32 @@ def _handle_room_upgrade(user_message: str) -> str:
 
 
 def _handle_complaint(user_message: str) -> str:
-    return _ensure_string(policy_response(user_message))
+    return _ensure_string(_agent("policy")(user_message))
 
 
 def _handle_general_question(user_message: str) -> str:
-    return _ensure_string(faq_answer(user_message))
+    return _ensure_string(_agent("faq")(user_message))
 
 
 def _handle_restaurant(user_message: str) -> str:
-    return _ensure_string(restaurant_response(user_message))
+    return _ensure_string(_agent("restaurant")(user_message))
 
 
 def _handle_spa(user_message: str) -> str:
-    return _ensure_string(spa_response(user_message))
+    return _ensure_string(_agent("spa")(user_message))
 
 
 def _handle_shuttle(user_message: str) -> str:
-    return _ensure_string(shuttle_response(user_message))
+    return _ensure_string(_agent("shuttle")(user_message))
+
+
+def _handle_local_guide(user_message: str) -> str:
+    return _ensure_string(_agent("local_guide")(user_message))
 
 
 def _handle_feedback_review(user_message: str) -> str:
-    if HAS_SENTIMENT:
+    sentiment_agent = _sentiment_module()
+    if sentiment_agent is not None:
         handler = getattr(sentiment_agent, "handle", None)
         if callable(handler):
             return _ensure_string(handler(user_message))
@@ -97,75 +203,364 @@ INTENT_DISPATCH: Dict[str, Handler] = {
     "shuttle_request": _handle_shuttle,
     "feedback_review": _handle_feedback_review,
     "room_upgrade_inquiry": _handle_room_upgrade,
+    "local_guide_request": _handle_local_guide,
 }
 
 
-def route_to_agent(intent: str, user_message: str) -> str:
-    """Route the user message to the agent that can handle the provided intent."""
+def warm_agents() -> Dict[str, float]:
+    """Import every agent now (e.g. at server start) instead of on first request."""
+    return AGENTS.warm()
+
+
+def _normalize_intent(intent: str) -> str:
     normalized_intent = (intent or "").strip().lower()
-    handler = INTENT_DISPATCH.get(normalized_intent, _handle_general_question)
+    if normalized_intent not in INTENT_DISPATCH:
+        normalized_intent = "general_question"
+    return normalized_intent
 
+
+def _run_handler(normalized_intent: str, user_message: str) -> str:
+    handler = INTENT_DISPATCH[normalized_intent]
     try:
-        return handler(user_message)
+        with span("route_to_agent", intent=normalized_intent), attribute(intent=normalized_intent):
+            return handler(user_message)
+    except LLMUnavailable:
+        raise
     except Exception as exc:
         return _handle_general_question(
             f"We encountered an issue while processing your request. Could you rephrase?"
         )
 
 
-def route_query(user_query: str):
+def route_to_agent(intent: str, user_message: str) -> str:
+    """Route the user message to the agent that can handle the provided intent."""
+    normalized_intent = _normalize_intent(intent)
+    if normalized_intent in _STATEFUL_INTENTS:
+        return _run_handler(normalized_intent, user_message)
+    return coalesced(normalized_intent, user_message, lambda: _run_handler(normalized_intent, user_message))
+
+
+async def route_to_agent_async(intent: str, user_message: str) -> str:
+    """:func:`route_to_agent` for async servers; the agent runs in the loop's default executor.
+
+    Shares in-flight calls with sync callers too, so a coroutine and a worker
+    thread asking the same question run one agent call between them.
     """
-    The 'brain' of your concierge system.
-    Decides which specialized agent should handle the guest query.
-    Supports both Streamlit and non-Streamlit environments (Flask, voice calls, SMS).
+    normalized_intent = _normalize_intent(intent)
+    call = functools.partial(_run_handler, normalized_intent, user_message)
+    if normalized_intent in _STATEFUL_INTENTS:
+        import asyncio
+
+        return await asyncio.get_running_loop().run_in_executor(None, contextvars.copy_context().run, call)
+    return await get_single_flight().do_async(coalesce_key(normalized_intent, user_message), call)
+
+
+def _fanout_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=FANOUT_WORKERS, thread_name_prefix="router-fanout")
+    return _pool
+
+
+def _submit(fn: Callable[..., str], *args: str) -> Future:
+    # Each task runs in a copy of the caller's context so usage attribution
+    # and tracing labels follow it onto the worker thread.
+    return _fanout_pool().submit(contextvars.copy_context().run, fn, *args)
+
+
+def split_compound_query(user_query: str) -> List[str]:
+    """Split a guest message into independent questions.
+
+    Candidate boundaries are ``and`` / ``also`` / ``plus`` / ``?`` / ``;``, but
+    a piece only becomes its own clause when it reads as a separate question:
+    it starts with a wh-word or auxiliary and has no pronoun pointing back at
+    an earlier clause.  Anything else ("for me and my two kids", "what time
+    does it start") stays attached to the clause before it, and a message
+    that does not open with a question is kept whole.
     """
-    
-    # Handle session state for Streamlit
-    if HAS_STREAMLIT:
-        if "active_agent" not in st.session_state:
-            st.session_state.active_agent = None
 
-        # --- Context memory: stay in the same flow ---
-        if st.session_state.active_agent == "booking":
-            return booking_agent(user_query)
+    text = user_query or ""
+    pieces = _CLAUSE_BOUNDARY.split(text)
+    raw = [pieces[0]]
+    for separator, piece in zip(pieces[1::2], pieces[2::2]):
+        clause = _LEADING_CONNECTOR.sub("", piece.strip(" ,;."))
+        if (clause and _QUESTION_START.match(clause) and not _BACK_REFERENCE.search(clause)
+                and len(clause.split()) >= MIN_CLAUSE_WORDS):
+            raw.append(piece)
+        else:
+            raw[-1] = f"{raw[-1]}{separator}{piece}"
+    clauses = [_LEADING_CONNECTOR.sub("", piece.strip(" ,;.")) for piece in raw]
+    clauses = [clause for clause in clauses if clause]
+    if len(clauses) < 2 or not _QUESTION_START.match(clauses[0]) or len(clauses[0].split()) < MIN_CLAUSE_WORDS:
+        return [user_query]
+    return clauses
 
-    try:
-        classification_prompt = f"""
+
+def category_intent(category: str) -> str:
+    """Map a router category such as ``"spa"`` to its :data:`INTENT_DISPATCH` key."""
+
+    for keywords, intent, _ in _CATEGORY_ROUTES:
+        if any(keyword in category for keyword in keywords):
+            return intent
+    return "general_question"
+
+
+def category_agent(category: str) -> str:
+    """Map a router category to the registry name of the agent that answers it."""
+
+    for keywords, _, agent in _CATEGORY_ROUTES:
+        if any(keyword in category for keyword in keywords):
+            return agent
+    return "faq"
+
+
+def predict_category(user_query: str) -> Optional[str]:
+    """Keyword guess of the router category, or ``None`` when nothing matches."""
+
+    for pattern, category in _LIKELY_CATEGORY:
+        if pattern.search(user_query or ""):
+            return category
+    return None
+
+
+def _classify(user_query: str) -> str:
+    """Ask the LLM for the one-word router category of ``user_query`` (lowercased)."""
+    return coalesced("classify", user_query, lambda: _ask_classifier(user_query))
+
+
+def _ask_classifier(user_query: str) -> str:
+    classification_prompt = f"""
         Classify the user's intent into one of these categories:
-        [FAQ, Booking, Restaurant, Spa, Shuttle, Policy]
+        [FAQ, Booking, Restaurant, Spa, Shuttle, Policy, LocalGuide]
         Query: "{user_query}"
 
         Respond with ONLY one word (the category name).
         """
 
-        classification = client.chat.completions.create(
+    with span("classify"), attribute(agent="router_classifier"):
+        return chat_completion(
             model=MODEL_NAME,
             messages=[
                 {"role": "system", "content": "You are a classification assistant for hotel queries."},
                 {"role": "user", "content": classification_prompt}
             ],
             temperature=0,
-        )
+        ).lower()
+
+
+def _collect_categories(clauses: List[str], futures: List[Future], deadline: float) -> List[Tuple[str, str]]:
+    """Gather clause classifications into ``(category, text)`` parts.
+
+    Clauses that land on the same intent are merged, in the order asked.
+    """
+
+    wait(futures, timeout=max(deadline - time.monotonic(), 0))
+    grouped: Dict[str, Tuple[str, List[str]]] = {}
+    for clause, future in zip(clauses, futures):
+        # A clause that failed or missed the deadline is answered as a general question.
+        ok = future.done() and future.exception() is None
+        category = future.result() if ok else "faq"
+        grouped.setdefault(category_intent(category), (category, []))[1].append(clause)
+    return [(category, " and ".join(texts)) for category, texts in grouped.values()]
+
+
+def _deadline_reply(user_message: str) -> str:
+    return f"I'm still checking on \"{user_message}\" -- please ask me about it again in a moment."
+
+
+def dispatch_concurrently(parts: List[Tuple[str, str]], deadline: float) -> List[str]:
+    """Answer ``(intent, message)`` parts via :func:`route_to_agent` in parallel, in order.
+
+    Booking keeps its conversation in the caller's (Streamlit) session, so it
+    runs inline on this thread while the other agents work.  Parts still
+    running at ``deadline`` (a ``time.monotonic()`` value) get a short
+    holding reply instead of delaying the rest.
+    """
+
+    futures: Dict[int, Future] = {
+        index: _submit(route_to_agent, intent, message)
+        for index, (intent, message) in enumerate(parts)
+        if intent not in ("booking_request", "room_upgrade_inquiry")
+    }
+    answers: Dict[int, str] = {
+        index: route_to_agent(intent, message)
+        for index, (intent, message) in enumerate(parts)
+        if index not in futures
+    }
+    wait(list(futures.values()), timeout=max(deadline - time.monotonic(), 0))
+    for index, future in futures.items():
+        if not future.done():
+            answers[index] = _deadline_reply(parts[index][1])
+        elif isinstance(future.exception(), LLMUnavailable):
+            answers[index] = local_answer(parts[index][1])
+        elif future.exception() is not None:
+            answers[index] = f"Sorry, I couldn't answer \"{parts[index][1]}\" right now."
+        else:
+            answers[index] = future.result()
+    return [answers[index] for index in range(len(parts))]
+
+
+def _booking_in_progress(st: Optional[ModuleType]) -> bool:
+    if st is None:
+        return False
+    if "active_agent" not in st.session_state:
+        st.session_state.active_agent = None
+    return st.session_state.active_agent == "booking"
+
+
+def classify_query(user_query: str, deadline: float) -> List[Tuple[str, str]]:
+    """Classification phase of :func:`route_query`: ``(category, text)`` parts.
+
+    One part for an ordinary question; several for a compound question whose
+    clauses ask for different things.
+    """
+
+    clauses = split_compound_query(user_query)
+    if len(clauses) > 1:
+        return _collect_categories(clauses, [_submit(_classify, clause) for clause in clauses], deadline)
+    return [(_classify(user_query), user_query)]
+
+
+def dispatch_query(user_query: str, categorized: List[Tuple[str, str]], deadline: float) -> str:
+    """Agent phase of :func:`route_query`; must run on the request thread (booking state)."""
+
+    st = _streamlit()
+    if len(categorized) > 1:
+        parts = [(category_intent(category), text) for category, text in categorized]
+        print(f"[Router] Detected intents → {[intent for intent, _ in parts]}")
+        if st is not None and any(intent == "booking_request" for intent, _ in parts):
+            st.session_state.active_agent = "booking"
+        with span("fanout", parts=str(len(parts))):
+            return "\n\n".join(dispatch_concurrently(parts, deadline))
+
+    intent = categorized[0][0]
+    print(f"[Router] Detected intent → {intent}")
+    agent = category_agent(intent)
+    if agent == "booking" and st is not None:
+        st.session_state.active_agent = "booking"
+    return _answer(agent, intent, user_query)
+
+
+def _answer(agent: str, category: str, user_query: str) -> str:
+    """Call ``agent`` for ``user_query``, sharing the call with identical concurrent ones."""
 
-        intent = classification.choices[0].message.content.strip().lower()
-        print(f"[Router] Detected intent → {intent}")
+    intent = category_intent(category)
 
-        if "faq" in intent:
-            return faq_answer(user_query)
-        elif "booking" in intent:
-            if HAS_STREAMLIT:
+    def call() -> str:
+        # The dispatch key, not the classifier's free text, keeps the label set bounded
+        with attribute(intent=intent):
+            return _agent(agent)(user_query)
+
+    if intent in _STATEFUL_INTENTS:
+        return call()
+    return coalesced(intent, user_query, call)
+
+
+def degraded_route(user_query: str) -> str:
+    """Answer without the LLM: keyword-guessed category per clause, local data only."""
+
+    answers: List[str] = []
+    for clause in split_compound_query(user_query):
+        category = predict_category(clause) or "faq"
+        if category_agent(category) == "booking":
+            # Booking needs no LLM, so the flow keeps working.
+            st = _streamlit()
+            if st is not None:
                 st.session_state.active_agent = "booking"
-            return booking_agent(user_query)
-        elif "restaurant" in intent:
-            return restaurant_response(user_query)
-        elif "spa" in intent:
-            return spa_response(user_query)
-        elif "shuttle" in intent:
-            return shuttle_response(user_query)
-        elif "policy" in intent:
-            return policy_response(user_query)
+            answer = _ensure_string(_agent("booking")(clause))
         else:
-            return faq_answer(user_query)
+            answer = local_answer(clause, category)
+        if answer not in answers:
+            answers.append(answer)
+    print("[Router] LLM unavailable, answered from local data")
+    return "\n\n".join(answers)
+
+
+@traced("route_query")
+def route_query(user_query: str):
+    """
+    The 'brain' of your concierge system.
+    Decides which specialized agent should handle the guest query.
+    Supports both Streamlit and non-Streamlit environments (Flask, voice calls, SMS).
+    """
+    call_log.record_turn("route_query", user_query)
+
+    # --- Context memory: stay in the same flow ---
+    if _booking_in_progress(_streamlit()):
+        return _agent("booking")(user_query)
+    cached = cached_answer("route_query", user_query)
+    if cached is not None:
+        return cached
+    if not llm_available():
+        return degraded_route(user_query)
 
+    try:
+        deadline = time.monotonic() + ROUTER_DEADLINE_SECONDS
+        return dispatch_query(user_query, classify_query(user_query, deadline), deadline)
+    except LLMUnavailable:
+        return degraded_route(user_query)
+    except Exception as e:
+        return f"⚠️ Router Error: {str(e)}"
+
+
+def _cancel(*futures: Optional[Future]) -> None:
+    for future in futures:
+        if future is not None:
+            future.cancel()
+
+
+@traced("route_query")
+def route_query_speculative(user_query: str, retrieve: Callable[[str], Optional[str]]) -> str:
+    """Same answer as ``retrieve(q) or route_query(q)``, with the slow steps overlapped.
+
+    Local retrieval and LLM classification start together, and the agent
+    :func:`predict_category` expects is prefetched meanwhile (never booking,
+    whose turns have side effects).  A retrieval hit still wins and the
+    router's work is dropped; otherwise the prefetched answer is used when
+    the classifier agrees with the guess, and the real agent runs when it
+    does not.  Work already running cannot be interrupted, so a "cancelled"
+    loser just finishes in the background and is discarded.
+    """
+    call_log.record_turn("route_query", user_query)
+    if _booking_in_progress(_streamlit()):
+        return retrieve(user_query) or _agent("booking")(user_query)
+    cached = cached_answer("route_query", user_query)
+    if cached is not None:
+        return retrieve(user_query) or cached
+    if not llm_available():
+        return retrieve(user_query) or degraded_route(user_query)
+
+    deadline = time.monotonic() + ROUTER_DEADLINE_SECONDS
+    retrieval = _submit(retrieve, user_query)
+    clauses = split_compound_query(user_query)
+    classifications = [_submit(_classify, clause) for clause in clauses]
+    guess = predict_category(user_query)
+    prefetch: Optional[Future] = None
+    if guess is not None and category_agent(guess) != "booking" and len(clauses) == 1:
+        prefetch = _submit(_answer, category_agent(guess), guess, user_query)
+
+    try:
+        answer = retrieval.result()
+    except BaseException:
+        _cancel(*classifications, prefetch)
+        raise
+    if answer:
+        _cancel(*classifications, prefetch)
+        return answer
+
+    try:
+        if len(clauses) > 1:
+            categorized = _collect_categories(clauses, classifications, deadline)
+        else:
+            categorized = [(classifications[0].result(), user_query)]
+        if prefetch is not None and len(categorized) == 1 and category_agent(categorized[0][0]) == category_agent(guess):
+            print(f"[Router] Detected intent → {categorized[0][0]} (prefetched)")
+            return prefetch.result()
+        _cancel(prefetch)
+        return dispatch_query(user_query, categorized, deadline)
+    except LLMUnavailable:
+        return degraded_route(user_query)
     except Exception as e:
         return f"⚠️ Router Error: {str(e)}"
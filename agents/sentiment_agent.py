@@ -1,17 +1,67 @@
-from model_loader import load_model_and_vectorizer
-from utils.review_utils import clean_text
+import threading
+
+from utils.model_loader import load_model_and_vectorizer, model_files_exist
+from utils.review_utils import clean_text, clean_text_batch
+from utils.text_normalization import require_wordnet
+
+# The model and vectorizer are loaded on first use (memory-mapped, see
+# utils.model_loader) so importing this module is cheap and never fails.
+_model = None
+_vectorizer = None
+_load_lock = threading.Lock()
+
+
+def is_available():
+    """True if the trained model files are present."""
+    return _model is not None or model_files_exist()
+
+
+def warm():
+    """Load the model now, e.g. in a parent process before forking workers."""
+    global _model, _vectorizer
+    if _model is None:
+        with _load_lock:
+            if _model is None:
+                # Fallback lemmas would silently change the model's input features
+                require_wordnet()
+                model, vectorizer = load_model_and_vectorizer()
+                # _model is the "loaded" flag read without the lock, so it is
+                # published last, once _vectorizer is already set.
+                _vectorizer = vectorizer
+                _model = model
+    return _model, _vectorizer
+
+
+def _label(prediction):
+    return 'Positive' if prediction == 1 else 'Negative'
 
-model, vectorizer = load_model_and_vectorizer()
 
 def analyze_sentiment(review):
+    model, vectorizer = warm()
     cleaned = clean_text(review)
     vec = vectorizer.transform([cleaned])
     prediction = model.predict(vec)[0]
-    return 'Positive' if prediction == 1 else 'Negative'
+    return _label(prediction)
+
+
+def analyze_sentiment_many(reviews):
+    """Score a list of reviews with one vectorizer call over a single sparse matrix."""
+    return analyze_cleaned_many(clean_text_batch(list(reviews)))
+
+
+def analyze_cleaned_many(cleaned_reviews):
+    """Like analyze_sentiment_many, for reviews already passed through clean_text_batch."""
+    cleaned_reviews = list(cleaned_reviews)
+    if not cleaned_reviews:
+        return []
+    model, vectorizer = warm()
+    matrix = vectorizer.transform(cleaned_reviews)
+    return [_label(prediction) for prediction in model.predict(matrix)]
+
 
 def respond_to_review(review):
     sentiment = analyze_sentiment(review)
     if sentiment == 'Negative':
         return "We’re sorry you had a bad experience. Our team will contact you shortly."
     else:
-        return "Thank you for your kind words! We're happy you enjoyed your stay."
\ No newline at end of file
+        return "Thank you for your kind words! We're happy you enjoyed your stay."
@@ -1,10 +1,6 @@
-from openai import OpenAI
-from dotenv import load_dotenv
-import os, pandas as pd
+import pandas as pd
 
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-MODEL_NAME = os.getenv("MODEL_NAME", "gpt-4o-mini")
+from agents.llm_gateway import MODEL_NAME, LLMUnavailable, chat_completion
 
 def shuttle_response(user_query: str):
     """Provides shuttle timing and route info from shuttle_service.csv."""
@@ -23,7 +19,7 @@ def shuttle_response(user_query: str):
         prompt = f"The guest asked: '{user_query}'. No exact shuttle match found. Provide a general shuttle service answer."
 
     try:
-        completion = client.chat.completions.create(
+        return chat_completion(
             model=MODEL_NAME,
             messages=[
                 {"role": "system", "content": "You are a transportation assistant helping hotel guests with shuttle timings and routes."},
@@ -31,6 +27,8 @@ def shuttle_response(user_query: str):
             ],
             temperature=0.6,
         )
-        return completion.choices[0].message.content.strip()
+    except LLMUnavailable:
+        # Let the router answer from local data instead of apologizing
+        raise
     except Exception as e:
         return f"⚠️ Sorry, I'm having trouble accessing shuttle information right now. (Error: {str(e)})"
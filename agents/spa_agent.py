@@ -1,10 +1,6 @@
-from openai import OpenAI
-from dotenv import load_dotenv
-import os, pandas as pd
+import pandas as pd
 
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-MODEL_NAME = os.getenv("MODEL_NAME", "gpt-4o-mini")
+from agents.llm_gateway import MODEL_NAME, LLMUnavailable, chat_completion
 
 def spa_response(user_query: str):
     """Provides spa service details from spa.csv or fallback via API."""
@@ -23,7 +19,7 @@ def spa_response(user_query: str):
         prompt = f"The guest asked: '{user_query}'. No exact match found. Provide a calm, spa-themed response."
 
     try:
-        completion = client.chat.completions.create(
+        return chat_completion(
             model=MODEL_NAME,
             messages=[
                 {"role": "system", "content": "You are a spa desk assistant providing wellness and service details in a soothing tone."},
@@ -31,6 +27,8 @@ def spa_response(user_query: str):
             ],
             temperature=0.6,
         )
-        return completion.choices[0].message.content.strip()
+    except LLMUnavailable:
+        # Let the router answer from local data instead of apologizing
+        raise
     except Exception as e:
         return f"⚠️ Sorry, I'm having trouble accessing the spa service right now. (Error: {str(e)})"
@@ -0,0 +1,51 @@
+"""Build the process-wide shared resources ahead of the first guest request."""
+
+from __future__ import annotations
+
+import time
+from typing import Callable, Dict
+
+
+def _timed(steps: Dict[str, Callable[[], object]]) -> Dict[str, float]:
+    timings: Dict[str, float] = {}
+    for name, step in steps.items():
+        started = time.perf_counter()
+        try:
+            step()
+        except ImportError:
+            timings[name] = -1.0
+            continue
+        timings[name] = time.perf_counter() - started
+    return timings
+
+
+def warm_up(include_agents: bool = True) -> Dict[str, float]:
+    """Load the data catalog, retrieval indexes, LLM client, response cache and (optionally) agents.
+
+    Every resource is cached for the life of the process, so calling this at
+    server start moves all one-off costs out of the request path.  Returns the
+    seconds spent per step (``-1`` when an optional dependency is missing).
+    """
+
+    from agents.faq_index import get_faq_index
+    from agents.knowledge_base import load_rag_database
+    from agents.llm_gateway import get_client
+    from agents.local_guide_agent import get_local_guide_index
+    from agents.menu_index import get_menu_index
+    from agents.policy_index import get_policy_index
+    from agents.registry import AGENTS
+    from utils.response_cache import get_response_cache
+
+    steps: Dict[str, Callable[[], object]] = {
+        "data_catalog": load_rag_database,
+        "faq_index": get_faq_index,
+        "policy_index": get_policy_index,
+        "menu_index": get_menu_index,
+        "local_guide_index": get_local_guide_index,
+        "llm_client": get_client,
+        "response_cache": lambda: get_response_cache().load(),
+    }
+    timings = _timed(steps)
+    if include_agents:
+        timings.update({f"agent:{name}": t for name, t in AGENTS.warm().items()})
+    return timings
@@ -2,10 +2,13 @@ import os
 from typing import Optional
 
 from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 from transformers import AutoTokenizer, AutoModelForCausalLM
 import torch
 
+from utils.tracing import CONTENT_TYPE, render_metrics, span
+
 # ---------- Config ----------
 API_KEY = os.getenv("API_KEY", "changeme")  # set in env for real usage
 MODEL_PATH = os.getenv("PHI_MODEL_PATH", r"D:\phi_finetuned_full_model")  # change if needed
@@ -39,6 +42,11 @@ class GenerateResponse(BaseModel):
 def health():
     return {"status": "ok"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    # Per-stage latency histograms in Prometheus text format (TRACING_ENABLED=1)
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
+
 @app.post("/generate", response_model=GenerateResponse)
 def generate(req: GenerateRequest, x_api_key: Optional[str] = Header(None)):
     if x_api_key != API_KEY:
@@ -49,9 +57,10 @@ def generate(req: GenerateRequest, x_api_key: Optional[str] = Header(None)):
     if not ("Assistant:" in prompt):
         prompt = f"Guest: {prompt}\nAssistant:"
 
-    inputs = tokenizer(prompt, return_tensors="pt").to(model.device)
+    with span("tokenize"):
+        inputs = tokenizer(prompt, return_tensors="pt").to(model.device)
 
-    with torch.no_grad():
+    with torch.no_grad(), span("model.generate"):
         output = model.generate(
             **inputs,
             max_new_tokens=req.max_new_tokens,
@@ -1,17 +1,35 @@
 import streamlit as st
-from openai import OpenAI
-from dotenv import load_dotenv
+from importlib.metadata import PackageNotFoundError, version
 import os
-import openai
-
-# === Load environment variables ===
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-MODEL_NAME = os.getenv("MODEL_NAME", "gpt-4o-mini")
+import uuid
 
 # === Import router agent ===
-from agents.router_agent import route_query
+from agents.router_agent import route_query, route_query_speculative
 from agents.rag_agent import search_rag_database
+from agents.warmup import warm_up
+from utils.usage import attribute
+
+# Number of chat messages rendered per rerun; older ones load on demand
+HISTORY_WINDOW = int(os.getenv("CHAT_HISTORY_WINDOW", "20"))
+
+# Run the RAG lookup, intent classification and the likely agent concurrently
+# instead of one after another (same answers, shorter wait on RAG misses)
+SPECULATIVE_ROUTING = os.getenv("SPECULATIVE_ROUTING") == "1"
+
+
+# === Shared resources (built once per server process, not per rerun) ===
+@st.cache_resource(show_spinner="Warming up the concierge...")
+def load_shared_resources():
+    """LLM gateway, retrieval indexes, data catalog and agents, shared by all sessions."""
+    timings = warm_up()
+    try:
+        openai_version = version("openai")
+    except PackageNotFoundError:
+        openai_version = "not installed"
+    return {"warmup_seconds": timings, "openai_version": openai_version}
+
+
+shared_resources = load_shared_resources()
 
 # === Streamlit Page Configuration ===
 st.set_page_config(
@@ -116,6 +134,10 @@ st.markdown("""
 # === Maintain chat history ===
 if "history" not in st.session_state:
     st.session_state.history = []
+if "history_window" not in st.session_state:
+    st.session_state.history_window = HISTORY_WINDOW
+if "usage_session" not in st.session_state:
+    st.session_state.usage_session = f"web-{uuid.uuid4().hex[:12]}"
 
 # === Chat input field ===
 user_query = st.chat_input("Type your message here...")
@@ -125,20 +147,32 @@ def get_router_response(message):
     Handles RAG lookup + router agent decision automatically.
     """
     try:
+        if SPECULATIVE_ROUTING:
+            with attribute(session=st.session_state.usage_session):
+                return route_query_speculative(message, search_rag_database)
+
         # Step 1 — Check RAG database first (local knowledge)
         rag_response = search_rag_database(message)
         if rag_response:
             return rag_response
 
-        # Step 2 — Route query to appropriate agent
-        response = route_query(message)
+        # Step 2 — Route query to appropriate agent (token usage is tracked per chat session)
+        with attribute(session=st.session_state.usage_session):
+            response = route_query(message)
         return response
 
     except Exception as e:
         return f"⚠️ Error while processing your request: {str(e)}"
 
-# === Display chat history ===
-for chat in st.session_state.history:
+# === Display chat history (only the most recent window, so reruns stay constant-time) ===
+history = st.session_state.history
+hidden = max(len(history) - st.session_state.history_window, 0)
+if hidden:
+    st.caption(f"{hidden} earlier messages hidden")
+    if st.button("Show earlier messages"):
+        st.session_state.history_window += HISTORY_WINDOW
+        st.rerun()
+for chat in history[hidden:]:
     with st.chat_message(chat["role"]):
         st.markdown(chat["content"])
 
@@ -158,7 +192,7 @@ if user_query:
 # === Sidebar ===
 with st.sidebar:
     st.markdown("### 🧠 System Information")
-    st.info(f"✅ OpenAI version: {openai.__version__}")
+    st.info(f"✅ OpenAI version: {shared_resources['openai_version']}")
     
     st.markdown("---")
     
@@ -0,0 +1,146 @@
+"""Microbenchmark: ``utils.text_normalization`` vs. the original NLTK ``clean_text``.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_clean_text --iterations 2000
+
+Reports the cold import cost of both implementations (in a fresh interpreter)
+and the per-utterance cost of ``clean_text`` and ``clean_text_batch``.  The
+legacy implementation downloads NLTK corpora on import, so it is skipped when
+those corpora cannot be loaded.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import subprocess
+import sys
+import time
+import timeit
+from pathlib import Path
+from typing import Callable, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Verbatim copy of the pre-optimization implementation, run in a subprocess
+# for import timing and exec'd in-process for call timing.
+LEGACY_SOURCE = '''
+import re
+import nltk
+from nltk.corpus import stopwords
+from nltk.stem import WordNetLemmatizer
+
+nltk.download('stopwords', quiet=True)
+nltk.download('wordnet', quiet=True)
+
+stop_words = set(stopwords.words('english'))
+lemmatizer = WordNetLemmatizer()
+
+def clean_text(text):
+    text = str(text).lower()
+    text = re.sub(r'[^a-z\\s]', '', text)
+    words = text.split()
+    words = [lemmatizer.lemmatize(word) for word in words if word not in stop_words]
+    return " ".join(words)
+'''
+
+SAMPLE_UTTERANCES = [
+    "What time is check-in tomorrow?",
+    "Can I book a deep tissue massage for two people this evening?",
+    "The room was spotless and the staff were incredibly friendly, loved the breakfast!",
+    "Is the airport shuttle running every hour on weekends?",
+    "Do you have any vegetarian dinner options under $25?",
+    "Our air conditioning stopped working and nobody answered the phone at the front desk.",
+    "I'd like to cancel my reservation, what's your cancellation policy?",
+    "Are pets allowed? We're travelling with two small dogs.",
+]
+
+
+def _corpus() -> List[str]:
+    corpus = list(SAMPLE_UTTERANCES)
+    faq_path = ROOT / "rag_data" / "hotel_faq.json"
+    db_path = ROOT / "data" / "rag_database.json"
+    if faq_path.exists():
+        corpus.extend(item["question"] for item in json.loads(faq_path.read_text(encoding="utf-8")))
+    if db_path.exists():
+        for item in json.loads(db_path.read_text(encoding="utf-8")).get("faq", []):
+            corpus.extend([item["question"], item["answer"]])
+    return corpus
+
+
+def _import_seconds(code: str) -> Optional[float]:
+    """Wall time for a fresh interpreter to run ``code``, minus a bare interpreter."""
+
+    def run(snippet: str) -> Optional[float]:
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-c", snippet], cwd=ROOT, capture_output=True)
+        elapsed = time.perf_counter() - start
+        return elapsed if proc.returncode == 0 else None
+
+    baseline = min(filter(None, (run("pass") for _ in range(3))))
+    samples = [run(code) for _ in range(3)]
+    if any(sample is None for sample in samples):
+        return None
+    return max(0.0, min(samples) - baseline)
+
+
+def _legacy_clean_text() -> Optional[Callable[[str], str]]:
+    namespace: dict = {}
+    try:
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            exec(LEGACY_SOURCE, namespace)
+            namespace["clean_text"]("warm up")
+    except Exception:
+        return None
+    return namespace["clean_text"]
+
+
+def _per_call_us(func: Callable[[str], str], corpus: List[str], iterations: int) -> float:
+    def run() -> None:
+        for text in corpus:
+            func(text)
+
+    total = min(timeit.repeat(run, number=max(1, iterations // len(corpus)), repeat=3))
+    return total / (max(1, iterations // len(corpus)) * len(corpus)) * 1e6
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000, help="utterances cleaned per measurement")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, str(ROOT))
+    from utils.text_normalization import clean_text, clean_text_batch
+
+    corpus = _corpus()
+    print(f"corpus: {len(corpus)} utterances")
+
+    new_import = _import_seconds("import utils.review_utils")
+    legacy_import = _import_seconds(LEGACY_SOURCE)
+    print(f"import  new:    {new_import * 1e3:8.1f} ms" if new_import is not None else "import  new:    failed")
+    print(f"import  legacy: {legacy_import * 1e3:8.1f} ms" if legacy_import is not None
+          else "import  legacy: unavailable (NLTK corpora could not be loaded)")
+
+    new_call = _per_call_us(clean_text, corpus, args.iterations)
+    batch_total = min(timeit.repeat(lambda: clean_text_batch(corpus), number=max(1, args.iterations // len(corpus)), repeat=3))
+    batch_call = batch_total / (max(1, args.iterations // len(corpus)) * len(corpus)) * 1e6
+    print(f"clean_text       new:    {new_call:8.2f} us/utterance")
+    print(f"clean_text_batch new:    {batch_call:8.2f} us/utterance")
+
+    legacy = _legacy_clean_text()
+    if legacy is None:
+        print("clean_text       legacy: unavailable (NLTK corpora could not be loaded)")
+        return 0
+
+    legacy_call = _per_call_us(legacy, corpus, args.iterations)
+    print(f"clean_text       legacy: {legacy_call:8.2f} us/utterance ({legacy_call / new_call:.1f}x slower)")
+    mismatches = sum(1 for text in corpus if legacy(text) != clean_text(text))
+    print(f"output mismatches vs legacy: {mismatches}/{len(corpus)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
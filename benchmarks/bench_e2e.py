@@ -0,0 +1,213 @@
+"""End-to-end latency/throughput benchmark against the offline OpenAI stand-in.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_e2e                       # compare with e2e_baseline.json
+    python -m benchmarks.bench_e2e --llm-latency lognormal:250,0.4 --concurrency 8
+    python -m benchmarks.bench_e2e --update-baseline     # record a new baseline
+
+The guest corpus (:mod:`benchmarks.corpus`) is replayed through
+``route_query``, ``generate_agent_response`` and each agent handler while a
+local :mod:`benchmarks.fake_openai_server` answers every model call with the
+configured latency.  For each stage the script reports p50/p95/p99 latency,
+requests per second and the mean peak memory allocated per call (measured
+with ``tracemalloc`` in a separate, untimed pass).  It exits with status 1
+when a stage is slower, slower in throughput or allocates more than the
+committed baseline allows (``--tolerance``, plus a small absolute slack so
+sub-millisecond stages do not flap).
+
+Booking is stateful and keeps its state in Streamlit's session, so the
+benchmark swaps in a stateless stand-in for it; everything else is the real
+code path.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from benchmarks.corpus import load_corpus
+from benchmarks.fake_openai_server import start_server
+
+BASELINE_PATH = Path(__file__).resolve().parent / "e2e_baseline.json"
+LATENCY_SLACK_MS = 2.0
+ALLOC_SLACK_KIB = 16.0
+
+Stage = Callable[[str], object]
+
+
+def _booking_stand_in(user_input: str) -> str:
+    return "Got it, may I have your email address for the booking confirmation?"
+
+
+def build_stages(only: Optional[List[str]] = None) -> Dict[str, Stage]:
+    """Stage name -> callable taking one utterance."""
+
+    from agents.registry import AGENTS
+    from agents.router_agent import route_query
+    from hotel_voice_integration.stt_tts_utils import generate_agent_response
+
+    AGENTS.register("booking", "benchmarks.bench_e2e:_booking_stand_in")
+    stages: Dict[str, Stage] = {
+        "route_query": route_query,
+        "generate_agent_response": generate_agent_response,
+    }
+    for name in ("faq", "restaurant", "spa", "shuttle", "policy", "local_guide"):
+        stages[f"agent:{name}"] = AGENTS.get(name)
+    if only:
+        stages = {name: fn for name, fn in stages.items() if name in only}
+    return stages
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def time_stage(fn: Stage, corpus: List[str], repeat: int, concurrency: int) -> Tuple[List[float], float]:
+    """Run the corpus ``repeat`` times on ``concurrency`` threads; return latencies (s) and wall time."""
+
+    def timed(text: str) -> float:
+        started = time.perf_counter()
+        fn(text)
+        return time.perf_counter() - started
+
+    work = corpus * repeat
+    started = time.perf_counter()
+    if concurrency <= 1:
+        latencies = [timed(text) for text in work]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(timed, work))
+    return latencies, time.perf_counter() - started
+
+
+def measure_allocations(fn: Stage, corpus: List[str]) -> float:
+    """Mean peak KiB allocated per call (single-threaded, tracemalloc on)."""
+
+    peaks: List[float] = []
+    tracemalloc.start()
+    try:
+        for text in corpus:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            fn(text)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(max(peak - before, 0) / 1024.0)
+    finally:
+        tracemalloc.stop()
+    return statistics.fmean(peaks) if peaks else 0.0
+
+
+def run(stages: Dict[str, Stage], corpus: List[str], repeat: int, concurrency: int) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for name, fn in stages.items():
+            results[name] = _run_stage(fn, corpus, repeat, concurrency)
+    return results
+
+
+def _run_stage(fn: Stage, corpus: List[str], repeat: int, concurrency: int) -> Dict[str, float]:
+    for text in corpus[:3]:
+        fn(text)  # warm caches, indexes and the HTTP connection pool
+    latencies, wall = time_stage(fn, corpus, repeat, concurrency)
+    ordered = sorted(latencies)
+    return {
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+        "rps": round(len(latencies) / wall, 1),
+        "alloc_kib": round(measure_allocations(fn, corpus), 1),
+    }
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            tolerance: float, concurrency: int = 1) -> List[str]:
+    """Human-readable regressions of ``results`` against ``baseline``."""
+
+    failures: List[str] = []
+    for stage, current in results.items():
+        base = baseline.get(stage)
+        if not base:
+            continue
+        for metric in ("p95_ms", "p99_ms"):
+            limit = base[metric] * (1 + tolerance) + LATENCY_SLACK_MS
+            if current[metric] > limit:
+                failures.append(f"{stage}: {metric} {current[metric]} > {limit:.2f}")
+        # Throughput gets the same absolute slack per request as latency.
+        per_request = (1 + tolerance) / base["rps"] + LATENCY_SLACK_MS / 1000 / max(concurrency, 1)
+        floor = 1 / per_request
+        if current["rps"] < floor:
+            failures.append(f"{stage}: rps {current['rps']} < {floor:.1f}")
+        limit = base["alloc_kib"] * (1 + tolerance) + ALLOC_SLACK_KIB
+        if current["alloc_kib"] > limit:
+            failures.append(f"{stage}: alloc_kib {current['alloc_kib']} > {limit:.1f}")
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="End-to-end benchmark with an offline LLM stand-in.")
+    parser.add_argument("--llm-latency", default="fixed:20", help="fake chat latency spec (ms)")
+    parser.add_argument("--stt-latency", default="fixed:20", help="fake transcription latency spec (ms)")
+    parser.add_argument("--tts-latency", default="fixed:20", help="fake speech latency spec (ms)")
+    parser.add_argument("--repeat", type=int, default=2, help="passes over the corpus per stage")
+    parser.add_argument("--concurrency", type=int, default=4, help="threads issuing requests")
+    parser.add_argument("--limit", type=int, default=0, help="use only the first N utterances")
+    parser.add_argument("--stage", action="append", help="run only this stage (repeatable)")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    parser.add_argument("--update-baseline", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    server = start_server(args.llm_latency, args.stt_latency, args.tts_latency)
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ["OPENAI_API_KEY"] = "offline-benchmark"
+
+    corpus = load_corpus(args.limit or None)
+    config = {"llm_latency": args.llm_latency, "stt_latency": args.stt_latency,
+              "tts_latency": args.tts_latency, "repeat": args.repeat,
+              "concurrency": args.concurrency, "corpus": len(corpus)}
+    results = run(build_stages(args.stage), corpus, args.repeat, args.concurrency)
+    server.shutdown()
+
+    if args.json:
+        print(json.dumps({"config": config, "stages": results}, indent=2))
+    else:
+        print(f"{'stage':28s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'req/s':>8s} {'KiB/call':>9s}")
+        for stage, row in results.items():
+            print(f"{stage:28s} {row['p50_ms']:9.2f} {row['p95_ms']:9.2f} {row['p99_ms']:9.2f} "
+                  f"{row['rps']:8.1f} {row['alloc_kib']:9.1f}")
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline_path.write_text(json.dumps({"config": config, "stages": results}, indent=2) + "\n",
+                                 encoding="utf-8")
+        print(f"Baseline written to {baseline_path}")
+        return 0
+    if not baseline_path.exists():
+        print(f"No baseline at {baseline_path}; run with --update-baseline to create one.")
+        return 0
+
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    if baseline.get("config") != config:
+        print(f"Note: baseline was recorded with {baseline.get('config')}")
+    failures = compare(results, baseline.get("stages", {}), args.tolerance, args.concurrency)
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""Guest utterance corpus for the end-to-end benchmarks and load tests.
+
+The corpus is the checked-in list in ``benchmarks/guest_utterances.txt``
+plus every FAQ question in ``data/rag_database.json``, deduplicated
+case-insensitively.  Order is stable so runs are comparable.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List, Optional
+
+UTTERANCES_PATH = Path(__file__).resolve().parent / "guest_utterances.txt"
+
+
+def guest_utterances(path: Path = UTTERANCES_PATH) -> List[str]:
+    """Utterances from ``path``, one per line, skipping blanks and ``#`` comments."""
+
+    with open(path, encoding="utf-8") as handle:
+        lines = (line.strip() for line in handle)
+        return [line for line in lines if line and not line.startswith("#")]
+
+
+def faq_questions() -> List[str]:
+    from agents.knowledge_base import get_section
+
+    return [entry["question"] for entry in get_section("faq", []) if entry.get("question")]
+
+
+def load_corpus(limit: Optional[int] = None, utterances_path: Path = UTTERANCES_PATH) -> List[str]:
+    """Deduplicated utterances: the checked-in list, then FAQ questions."""
+
+    seen = set()
+    corpus: List[str] = []
+    for text in (*guest_utterances(utterances_path), *faq_questions()):
+        key = text.lower().strip()
+        if key not in seen:
+            seen.add(key)
+            corpus.append(text)
+    return corpus[:limit] if limit else corpus
@@ -0,0 +1,243 @@
+"""Offline stand-in for the OpenAI API with configurable latency.
+
+Serves the endpoints the project uses -- chat completions, audio
+transcriptions and speech -- with deterministic canned answers, so the
+benchmarks and load tests need no network or API key::
+
+    python -m benchmarks.fake_openai_server --port 8765 --llm-latency lognormal:250,0.4
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=fake python -m flask_server
+
+Latency specs (milliseconds) are ``fixed:MS``, ``uniform:LOW,HIGH``,
+``normal:MEAN,STD`` or ``lognormal:MEDIAN,SIGMA``; a bare number means fixed.
+The LLM latency is the time to the first token; ``--token-latency`` adds a
+delay per generated word, sent as it is "generated" when the request asks
+for ``stream=True`` and all at the end otherwise.
+Classification prompts get a category chosen by keyword, so routing behaves
+like it does against the real model.  Import :func:`start_server` to run it
+inside a benchmark process.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class LatencyModel:
+    """A latency distribution in milliseconds."""
+
+    kind: str = "fixed"
+    a: float = 0.0
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        kind, _, params = spec.partition(":")
+        if not params:
+            return cls("fixed", float(kind))
+        values = [float(value) for value in params.split(",")]
+        if kind not in ("fixed", "uniform", "normal", "lognormal"):
+            raise ValueError(f"unknown latency distribution {kind!r}")
+        return cls(kind, values[0], values[1] if len(values) > 1 else 0.0)
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw one latency in seconds."""
+
+        if self.kind == "uniform":
+            ms = rng.uniform(self.a, self.b)
+        elif self.kind == "normal":
+            ms = rng.gauss(self.a, self.b)
+        elif self.kind == "lognormal":
+            ms = self.a * rng.lognormvariate(0.0, self.b)
+        else:
+            ms = self.a
+        return max(ms, 0.0) / 1000.0
+
+
+# Keyword -> (router category, voice intent), checked in order.
+_ROUTES: List[Tuple[Tuple[str, ...], str, str]] = [
+    (("book", "reserve", "reservation", "room for"), "Booking", "booking_request"),
+    (("menu", "dinner", "lunch", "breakfast", "restaurant", "eat", "food", "vegan", "vegetarian"),
+     "Restaurant", "restaurant_inquiry"),
+    (("spa", "massage", "facial", "sauna"), "Spa", "spa_request"),
+    (("shuttle", "airport", "pickup", "transport"), "Shuttle", "shuttle_request"),
+    (("policy", "pets", "smoking", "cancel", "refund", "complain"), "Policy", "complaint"),
+    (("nearby", "museum", "park", "attraction", "open now", "around here"), "LocalGuide", "local_guide_request"),
+]
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def classify(text: str) -> Tuple[str, str]:
+    lowered = text.lower()
+    for keywords, category, intent in _ROUTES:
+        if any(keyword in lowered for keyword in keywords):
+            return category, intent
+    return "FAQ", "general_question"
+
+
+def chat_reply(messages: List[Dict[str, str]]) -> str:
+    system = next((m.get("content", "") for m in messages if m.get("role") == "system"), "")
+    user = messages[-1].get("content", "") if messages else ""
+    if "intent classification" in system:
+        return json.dumps({"intent": classify(user)[1]})
+    if "Respond with ONLY one word" in user:
+        query = re.search(r'Query:\s*"(.*)"', user, re.S)
+        return classify(query.group(1) if query else user)[0]
+    return ("Thank you for your question. Our team is happy to help with that. "
+            "Is there anything else I can do for you during your stay?")
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Send headers and body in one segment; otherwise Nagle plus delayed ACKs
+    # add ~40 ms to every response and swamp the configured latency.
+    wbufsize = -1
+    disable_nagle_algorithm = True
+    server: "FakeOpenAIServer"
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002 - BaseHTTPRequestHandler API
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream_chat(self, payload: Dict, content: str, prompt_tokens: int, completion_tokens: int) -> None:
+        """Send ``content`` as server-sent chunks, one word at a time, then the usage chunk."""
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        base = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()),
+                "model": payload.get("model", "fake")}
+        for word in re.findall(r"\S+\s*", content):
+            self._write_event({**base, "choices": [{"index": 0, "finish_reason": None,
+                                                    "delta": {"role": "assistant", "content": word}}]})
+            time.sleep(self.server.delay("token"))
+        self._write_event({**base, "choices": [{"index": 0, "finish_reason": "stop", "delta": {}}]})
+        if (payload.get("stream_options") or {}).get("include_usage"):
+            self._write_event({**base, "choices": [], "usage": {
+                "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens}})
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+        self.wfile.flush()
+
+    def _write_event(self, event: Dict) -> None:
+        self._write_chunk(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+
+    def do_POST(self) -> None:  # noqa: N802 - BaseHTTPRequestHandler API
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        path = self.path.split("?", 1)[0].rstrip("/")
+        self.server.count(path)
+
+        if path.endswith("/chat/completions"):
+            time.sleep(self.server.delay("llm"))
+            payload = json.loads(raw or b"{}")
+            messages = payload.get("messages", [])
+            content = chat_reply(messages)
+            prompt_tokens = sum(len(_WORD_RE.findall(m.get("content", ""))) for m in messages)
+            completion_tokens = len(_WORD_RE.findall(content))
+            if payload.get("stream"):
+                self._stream_chat(payload, content, prompt_tokens, completion_tokens)
+                return
+            time.sleep(sum(self.server.delay("token") for _ in range(completion_tokens)))
+            body = {
+                "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()),
+                "model": payload.get("model", "fake"),
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": content}}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                          "total_tokens": prompt_tokens + completion_tokens},
+            }
+            self._send(200, json.dumps(body).encode("utf-8"), "application/json")
+        elif path.endswith("/audio/transcriptions"):
+            time.sleep(self.server.delay("stt"))
+            body = {"text": "What time does the spa open tomorrow?"}
+            self._send(200, json.dumps(body).encode("utf-8"), "application/json")
+        elif path.endswith("/audio/speech"):
+            time.sleep(self.server.delay("tts"))
+            # Roughly the size of a short MP3 sentence.
+            self._send(200, b"ID3" + bytes(min(len(raw), 4096) * 8), "audio/mpeg")
+        else:
+            self._send(404, b'{"error": {"message": "not found"}}', "application/json")
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], latencies: Dict[str, LatencyModel], seed: int = 0):
+        super().__init__(address, FakeOpenAIHandler)
+        self.latencies = latencies
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests: Dict[str, int] = {}
+
+    def delay(self, kind: str) -> float:
+        with self._lock:
+            return self.latencies.get(kind, LatencyModel()).sample(self._rng)
+
+    def count(self, path: str) -> None:
+        with self._lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+def start_server(llm: str = "0", stt: str = "0", tts: str = "0", *, host: str = "127.0.0.1",
+                 port: int = 0, seed: int = 0, token: str = "0") -> FakeOpenAIServer:
+    """Start the fake API on a daemon thread; ``server.base_url`` is the OpenAI base URL."""
+
+    latencies = {"llm": LatencyModel.parse(llm), "stt": LatencyModel.parse(stt), "tts": LatencyModel.parse(tts),
+                 "token": LatencyModel.parse(token)}
+    server = FakeOpenAIServer((host, port), latencies, seed)
+    threading.Thread(target=server.serve_forever, name="fake-openai", daemon=True).start()
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline OpenAI-compatible stand-in for benchmarks.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--llm-latency", default="lognormal:250,0.4", help="chat completion latency spec (ms)")
+    parser.add_argument("--stt-latency", default="lognormal:400,0.3", help="transcription latency spec (ms)")
+    parser.add_argument("--tts-latency", default="lognormal:300,0.3", help="speech synthesis latency spec (ms)")
+    parser.add_argument("--token-latency", default="0", help="per generated word latency spec (ms)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    server = start_server(args.llm_latency, args.stt_latency, args.tts_latency,
+                          host=args.host, port=args.port, seed=args.seed, token=args.token_latency)
+    print(f"Fake OpenAI API listening on {server.base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
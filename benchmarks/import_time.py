@@ -0,0 +1,83 @@
+"""Import-time budget check driven by ``python -X importtime``.
+
+Run from the repository root::
+
+    python -m benchmarks.import_time            # check against import_budget.json
+    python -m benchmarks.import_time --top 15   # also list the heaviest imports
+
+Each module listed in ``benchmarks/import_budget.json`` is imported in a fresh
+interpreter with ``-X importtime``; the cumulative time reported for the
+module itself is compared with its budget in milliseconds.  The best of
+``--repeat`` runs is used to filter out noise.  Exits with status 1 if any
+module is over budget, so it can gate CI or a deploy.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+BUDGET_PATH = Path(__file__).resolve().parent / "import_budget.json"
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(module: str) -> Tuple[float, List[Tuple[float, str]]]:
+    """Import ``module`` in a fresh interpreter; return (cumulative ms, [(self ms, name)])."""
+
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "import-time-benchmark")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{proc.stderr.strip().splitlines()[-1]}")
+
+    total = 0.0
+    entries: List[Tuple[float, str]] = []
+    for line in proc.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, _, name = match.groups()
+        entries.append((int(self_us) / 1000.0, name))
+        if name == module:
+            total = int(cumulative_us) / 1000.0
+    return total, entries
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check module import times against a budget.")
+    parser.add_argument("--budget", default=str(BUDGET_PATH), help="JSON file mapping module -> max ms")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per module (best is kept)")
+    parser.add_argument("--top", type=int, default=0, help="show the N heaviest imports per module")
+    args = parser.parse_args(argv)
+
+    budget: Dict[str, float] = json.loads(Path(args.budget).read_text(encoding="utf-8"))
+    failures = 0
+    for module, limit in budget.items():
+        try:
+            runs = [measure(module) for _ in range(max(1, args.repeat))]
+        except RuntimeError as exc:
+            print(f"ERROR {module}: {exc}")
+            failures += 1
+            continue
+        best, entries = min(runs, key=lambda run: run[0])
+        status = "ok  " if best <= limit else "OVER"
+        failures += best > limit
+        print(f"{status} {module:45s} {best:8.1f} ms  (budget {limit:.0f} ms)")
+        for self_ms, name in sorted(entries, reverse=True)[: args.top]:
+            print(f"       {self_ms:8.1f} ms  {name}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,357 @@
+"""Concurrent Twilio call load generator for the voice webhooks.
+
+Simulates callers the way Twilio drives a call: ``/voice`` for the greeting,
+then one ``/process`` POST per utterance with ``SpeechResult`` and the call's
+``CallSid``, following ``<Redirect>`` (after its ``<Pause>``) when fast-ack
+mode is on.  Every caller runs scripted multi-turn conversations
+(:data:`SCRIPTS`) under its own CallSid, and each concurrency level is run in
+turn::
+
+    python -m benchmarks.voice_loadgen --app voice --levels 1,5,10,25
+    VOICE_FAST_ACK=1 python -m benchmarks.voice_loadgen --app flask --levels 10,50
+    python -m benchmarks.voice_loadgen --url http://127.0.0.1:8000 --app voice
+
+By default the chosen app runs in-process on a threaded server, with every
+model call answered by :mod:`benchmarks.fake_openai_server`.  With ``--url``
+the tool drives an already running worker instead (start that one with
+``OPENAI_BASE_URL`` pointing at the fake server).
+
+Per level the report gives webhook latency percentiles, timeouts (no answer
+within Twilio's ``--timeout`` or fast-ack giving up), HTTP errors and session
+state errors: a reply that does not match the step of the conversation the
+call is in (e.g. one caller's booking prompt showing up in another call), or
+a hang-up / missing ``<Gather>`` at the wrong moment.  The saturation point is
+the last level whose webhook p95 stays within ``--slo-ms`` without timeouts
+or HTTP errors.
+
+The booking flow is not in the default mix (:data:`DEFAULT_SCRIPTS`): the
+booking agent keeps its stage in the process-wide ``st.session_state``, so
+concurrent calls overwrite each other's booking, and it reads
+``data/room_availability.csv``, which is not shipped with the repository.
+Run it explicitly with ``--script booking`` against a deployment that has
+the room data, at concurrency 1.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks.bench_e2e import percentile
+from benchmarks.fake_openai_server import start_server
+
+GAVE_UP_PHRASE = "couldn't get that answer in time"
+
+
+@dataclass(frozen=True)
+class Turn:
+    """One caller utterance; ``expect`` is a phrase the reply must contain."""
+
+    text: str
+    expect: Optional[str] = None
+    hangup: bool = False
+
+
+SCRIPTS: Dict[str, Tuple[Turn, ...]] = {
+    "faq": (
+        Turn("What time is check-out?"),
+        Turn("Are pets allowed in the rooms?"),
+        Turn("Thank you, goodbye", hangup=True),
+    ),
+    "amenities": (
+        Turn("Do you have vegan breakfast dishes?"),
+        Turn("How much is a deep tissue massage?"),
+        Turn("When does the shuttle leave for the airport?"),
+        Turn("Where is the nearest museum?"),
+        Turn("That's all, goodbye", hangup=True),
+    ),
+    "booking": (
+        Turn("I'd like to book a room for two nights", expect="email address"),
+        Turn("jane.doe@example.com", expect="check-in date"),
+        Turn("2026-11-02", expect="check-out date"),
+        Turn("2026-11-04", expect="room types"),
+        Turn("Deluxe please", expect="confirm your booking"),
+        Turn("No, cancel it", expect="cancelled"),
+        Turn("Thank you, goodbye", hangup=True),
+    ),
+}
+
+
+# Scripts that are safe to run concurrently on a clean checkout (see the module docstring).
+DEFAULT_SCRIPTS: Tuple[str, ...] = ("amenities", "faq")
+
+
+@dataclass
+class Twiml:
+    say: str = ""
+    plays: int = 0
+    gather: bool = False
+    hangup: bool = False
+    redirect: Optional[str] = None
+    pause: float = 0.0
+
+    @classmethod
+    def parse(cls, body: bytes) -> "Twiml":
+        root = ET.fromstring(body)
+        return cls(
+            say=" ".join((node.text or "") for node in root.iter("Say")),
+            plays=sum(1 for _ in root.iter("Play")),
+            gather=root.find("Gather") is not None,
+            hangup=root.find("Hangup") is not None,
+            redirect=next((node.text for node in root.iter("Redirect")), None),
+            pause=sum(float(node.get("length", 1)) for node in root.iter("Pause")),
+        )
+
+
+@dataclass
+class LevelStats:
+    concurrency: int
+    calls: int = 0
+    calls_ok: int = 0
+    webhook_latencies: List[float] = field(default_factory=list)
+    turn_latencies: List[float] = field(default_factory=list)
+    timeouts: int = 0
+    http_errors: int = 0
+    state_errors: int = 0
+    examples: List[str] = field(default_factory=list)
+    wall: float = 0.0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def problem(self, kind: str, message: str) -> None:
+        with self.lock:
+            setattr(self, kind, getattr(self, kind) + 1)
+            if len(self.examples) < 5:
+                self.examples.append(message)
+
+    def report(self) -> Dict[str, object]:
+        webhook = sorted(self.webhook_latencies)
+        turns = sorted(self.turn_latencies)
+        ms = lambda values, q: round(percentile(values, q) * 1000, 1)
+        return {
+            "concurrency": self.concurrency, "calls": self.calls, "calls_ok": self.calls_ok,
+            "webhooks": len(webhook), "webhook_p50_ms": ms(webhook, 0.50), "webhook_p95_ms": ms(webhook, 0.95),
+            "webhook_p99_ms": ms(webhook, 0.99), "webhook_max_ms": round(webhook[-1] * 1000, 1) if webhook else 0.0,
+            "turn_p95_ms": ms(turns, 0.95), "timeouts": self.timeouts, "http_errors": self.http_errors,
+            "state_errors": self.state_errors, "calls_per_s": round(self.calls / self.wall, 2) if self.wall else 0.0,
+            "examples": self.examples,
+        }
+
+
+class CallFailed(Exception):
+    """The call cannot continue (timeout or HTTP error); already counted."""
+
+
+class Caller:
+    """Plays one scripted call against the webhooks, like Twilio would."""
+
+    def __init__(self, base_url: str, stats: LevelStats, *, timeout: float, pause_scale: float,
+                 check_replies: bool):
+        self.base_url = base_url.rstrip("/")
+        self.stats = stats
+        self.timeout = timeout
+        self.pause_scale = pause_scale
+        self.check_replies = check_replies
+        self.call_sid = "CA" + uuid.uuid4().hex
+
+    def _post(self, path: str, speech: Optional[str] = None) -> Twiml:
+        params = {"CallSid": self.call_sid, "From": "+15555550100", "To": "+15555550199", "CallStatus": "in-progress"}
+        if speech is not None:
+            params["SpeechResult"] = speech
+            params["Confidence"] = "0.93"
+        data = urllib.parse.urlencode(params).encode("ascii")
+        where = f"{self.call_sid} {path}" + (f" ({speech!r})" if speech is not None else "")
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(self.base_url + path, data=data, timeout=self.timeout) as response:
+                body = response.read()
+        except (socket.timeout, TimeoutError):
+            self.stats.problem("timeouts", f"{where}: no response within {self.timeout}s")
+            raise CallFailed
+        except urllib.error.HTTPError as exc:
+            self.stats.problem("http_errors", f"{where}: HTTP {exc.code}")
+            raise CallFailed
+        except urllib.error.URLError as exc:
+            kind = "timeouts" if isinstance(exc.reason, socket.timeout) else "http_errors"
+            self.stats.problem(kind, f"{where}: {exc.reason}")
+            raise CallFailed
+        with self.stats.lock:
+            self.stats.webhook_latencies.append(time.perf_counter() - started)
+        return Twiml.parse(body)
+
+    def _turn(self, turn: Turn) -> Twiml:
+        started = time.perf_counter()
+        twiml = self._post("/process", turn.text)
+        while twiml.redirect:
+            time.sleep(twiml.pause * self.pause_scale)
+            twiml = self._post(twiml.redirect)
+        with self.stats.lock:
+            self.stats.turn_latencies.append(time.perf_counter() - started)
+        return twiml
+
+    def _check(self, step: int, turn: Turn, twiml: Twiml) -> bool:
+        where = f"{self.call_sid} turn {step} ({turn.text!r})"
+        if GAVE_UP_PHRASE in twiml.say:
+            self.stats.problem("timeouts", f"{where}: fast-ack gave up")
+            return False
+        if turn.hangup != twiml.hangup or (not turn.hangup and not twiml.gather):
+            expected = "hang-up" if turn.hangup else "<Gather>"
+            self.stats.problem("state_errors", f"{where}: expected {expected}")
+            return False
+        # Replies played as <Play> audio cannot be checked for wording.
+        if self.check_replies and turn.expect and not twiml.plays and turn.expect not in twiml.say:
+            self.stats.problem("state_errors", f"{where}: expected {turn.expect!r}, got {twiml.say[:80]!r}")
+            return False
+        return True
+
+    def run(self, script: Tuple[Turn, ...], think: float) -> bool:
+        try:
+            greeting = self._post("/voice")
+            if not greeting.gather:
+                self.stats.problem("state_errors", f"{self.call_sid} /voice: no <Gather> in greeting")
+                return False
+            ok = True
+            for step, turn in enumerate(script, 1):
+                time.sleep(think)
+                twiml = self._turn(turn)
+                ok = self._check(step, turn, twiml) and ok
+                if twiml.hangup:
+                    break
+            return ok
+        except CallFailed:
+            return False
+        except ET.ParseError as exc:
+            self.stats.problem("http_errors", f"{self.call_sid}: response is not TwiML ({exc})")
+            return False
+
+
+def run_level(base_url: str, concurrency: int, scripts: List[str], *, calls_per_caller: int, think: float,
+              timeout: float, pause_scale: float, check_replies: bool) -> LevelStats:
+    """``concurrency`` simultaneous callers, each placing ``calls_per_caller`` calls back to back."""
+
+    stats = LevelStats(concurrency)
+
+    def caller(index: int) -> None:
+        for n in range(calls_per_caller):
+            script = SCRIPTS[scripts[(index + n) % len(scripts)]]
+            ok = Caller(base_url, stats, timeout=timeout, pause_scale=pause_scale,
+                        check_replies=check_replies).run(script, think)
+            with stats.lock:
+                stats.calls += 1
+                stats.calls_ok += ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(caller, range(concurrency)))
+    stats.wall = time.perf_counter() - started
+    return stats
+
+
+def start_app(name: str):
+    """Serve ``voice_server`` or ``flask_server`` in-process; returns the werkzeug server."""
+
+    from werkzeug.serving import make_server
+
+    if name == "voice":
+        from hotel_voice_integration.voice_server import app
+    else:
+        from flask_server import app
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, name=f"{name}-server", daemon=True).start()
+    return server
+
+
+def saturation_point(reports: List[Dict[str, object]], slo_ms: float) -> Optional[int]:
+    """Highest concurrency before the first level that times out, fails requests or misses the SLO."""
+
+    within = None
+    for report in reports:
+        if report["timeouts"] or report["http_errors"] or report["webhook_p95_ms"] > slo_ms:
+            break
+        within = report["concurrency"]
+    return within
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Simulate concurrent Twilio calls against the voice webhooks.")
+    parser.add_argument("--app", choices=("voice", "flask"), default="voice",
+                        help="voice = hotel_voice_integration/voice_server.py, flask = flask_server.py")
+    parser.add_argument("--url", help="drive a running server at this base URL instead of an in-process one")
+    parser.add_argument("--levels", default="1,5,10,25", help="comma-separated concurrent call counts")
+    parser.add_argument("--calls-per-caller", type=int, default=2, help="calls each simulated caller places")
+    parser.add_argument("--script", action="append", choices=sorted(SCRIPTS),
+                        help=f"scripts to use (repeatable; default: {', '.join(DEFAULT_SCRIPTS)})")
+    parser.add_argument("--think", type=float, default=0.0, help="seconds a caller speaks before each turn")
+    parser.add_argument("--timeout", type=float, default=15.0, help="webhook timeout (Twilio's is 15 s)")
+    parser.add_argument("--pause-scale", type=float, default=1.0, help="multiplier for <Pause> before redirects")
+    parser.add_argument("--slo-ms", type=float, default=3000.0, help="webhook p95 that counts as saturated")
+    parser.add_argument("--llm-latency", default="lognormal:250,0.4", help="fake chat latency spec (ms)")
+    parser.add_argument("--tts-latency", default="lognormal:300,0.3", help="fake speech latency spec (ms)")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    levels = [int(level) for level in args.levels.split(",") if level.strip()]
+    scripts = args.script or list(DEFAULT_SCRIPTS)
+    # flask_server answers every turn with a plain LLM reply, so only the
+    # call structure (gather / hang-up) is checked there.
+    check_replies = args.app == "voice"
+
+    base_url = args.url
+    fake = server = None
+    if not base_url:
+        fake = start_server(args.llm_latency, "0", args.tts_latency)
+        os.environ["OPENAI_BASE_URL"] = fake.base_url
+        os.environ["OPENAI_API_KEY"] = "offline-loadgen"
+        server = start_app(args.app)
+        base_url = f"http://127.0.0.1:{server.server_port}"
+
+    reports = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for level in levels:
+            reports.append(run_level(base_url, level, scripts, calls_per_caller=args.calls_per_caller,
+                                     think=args.think, timeout=args.timeout, pause_scale=args.pause_scale,
+                                     check_replies=check_replies).report())
+    if server is not None:
+        server.shutdown()
+        fake.shutdown()
+
+    saturated_after = saturation_point(reports, args.slo_ms)
+    if args.json:
+        print(json.dumps({"app": args.app, "scripts": scripts, "levels": reports,
+                          "saturation_concurrency": saturated_after}, indent=2))
+    else:
+        print(f"{'calls':>6s} {'conc':>5s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} {'max ms':>8s} "
+              f"{'timeout':>8s} {'http err':>8s} {'state err':>9s} {'calls/s':>8s}")
+        for r in reports:
+            print(f"{r['calls']:6d} {r['concurrency']:5d} {r['webhook_p50_ms']:8.1f} {r['webhook_p95_ms']:8.1f} "
+                  f"{r['webhook_p99_ms']:8.1f} {r['webhook_max_ms']:8.1f} {r['timeouts']:8d} {r['http_errors']:8d} "
+                  f"{r['state_errors']:9d} {r['calls_per_s']:8.2f}")
+            for example in r["examples"]:
+                print(f"       ! {example}")
+        if saturated_after is None:
+            print(f"Saturated at the first level (p95 > {args.slo_ms:.0f} ms, timeouts or HTTP errors).")
+        elif saturated_after == levels[-1]:
+            print(f"Within the {args.slo_ms:.0f} ms SLO up to {saturated_after} concurrent calls (not saturated).")
+        else:
+            print(f"Within the {args.slo_ms:.0f} ms SLO up to {saturated_after} concurrent calls.")
+    failed = any(r["timeouts"] or r["http_errors"] or r["state_errors"] for r in reports)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
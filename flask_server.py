@@ -1,15 +1,22 @@
 import os
 
 from dotenv import load_dotenv
-from flask import Flask, Request, Response, request
+from flask import Flask, Request, Response, abort, jsonify, request
 from twilio.twiml.voice_response import VoiceResponse, Gather
 
 # Local utilities
+from utils.job_queue import DONE, FAST_ACK_WAIT, MAX_POLLS, PENDING, POLL_PAUSE_SECONDS, get_job_queue
 from utils.stt_tts_utils import process_speech_and_generate_audio
+from utils.tracing import CONTENT_TYPE, render_metrics
+from utils import usage
 
 load_dotenv()
 app = Flask(__name__)
 
+# VOICE_FAST_ACK=1 answers /process right away and computes the reply in a
+# background worker, so a slow LLM turn never hits Twilio's webhook timeout.
+FAST_ACK = os.getenv("VOICE_FAST_ACK") == "1"
+
 
 def _extract_speech(req: Request) -> str:
     """
@@ -75,14 +82,10 @@ def voice() -> Response:
     return Response(str(resp), mimetype="text/xml")
 
 
-@app.route("/process", methods=["GET", "POST"])
-def process() -> Response:
+def _reply_response(user_input: str, reply_text: str) -> Response:
     """
-    (Optional second stage if you use a Gather -> /process flow)
-    Mirrors /voice so Twilio can repost follow-up speech.
+    Speak the reply, then either hang up or gather the next utterance.
     """
-    user_input = _extract_speech(request) or "Hello"
-    reply_text = process_speech_and_generate_audio(user_input)
     resp = VoiceResponse()
     resp.say(
         reply_text,
@@ -98,5 +101,82 @@ def process() -> Response:
     return Response(str(resp), mimetype="text/xml")
 
 
+def _job_response(job_id: str, poll: int) -> Response:
+    """
+    Return the finished reply for a background job, or TwiML that pauses and
+    polls /result/<job_id> again.  Gives up after MAX_POLLS polls.
+    """
+    queue = get_job_queue()
+    job = queue.get(job_id)
+    status = queue.wait(job, FAST_ACK_WAIT) if job is not None else None
+
+    if status == DONE:
+        queue.pop(job_id)
+        return _reply_response(job.context["user_input"], job.future.result())
+
+    resp = VoiceResponse()
+    if status == PENDING and poll < MAX_POLLS:
+        if poll == 0:
+            resp.say(
+                "One moment, please.",
+                voice=os.getenv("TWILIO_VOICE", "Polly.Joanna"),
+                language=os.getenv("TWILIO_LANGUAGE", "en-US"),
+            )
+        resp.pause(length=POLL_PAUSE_SECONDS)
+        resp.redirect(f"/result/{job_id}?poll={poll + 1}", method="POST")
+        return Response(str(resp), mimetype="text/xml")
+
+    # Failed, expired or still running after MAX_POLLS: let the caller retry.
+    queue.pop(job_id)
+    _append_gather(resp, "Sorry, I couldn't get that answer in time. Could you please repeat your question?")
+    return Response(str(resp), mimetype="text/xml")
+
+
+@app.route("/process", methods=["GET", "POST"])
+def process() -> Response:
+    """
+    (Optional second stage if you use a Gather -> /process flow)
+    Mirrors /voice so Twilio can repost follow-up speech.
+    """
+    user_input = _extract_speech(request) or "Hello"
+    with usage.attribute(session=request.values.get("CallSid")):
+        if not FAST_ACK:
+            return _reply_response(user_input, process_speech_and_generate_audio(user_input))
+
+        job = get_job_queue().submit(
+            process_speech_and_generate_audio, user_input, context={"user_input": user_input}
+        )
+    return _job_response(job.job_id, poll=0)
+
+
+@app.route("/result/<job_id>", methods=["GET", "POST"])
+def result(job_id: str) -> Response:
+    """
+    Poll endpoint Twilio is redirected to while a fast-ack reply is computed.
+    """
+    return _job_response(job_id, request.args.get("poll", default=1, type=int))
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics() -> Response:
+    """
+    Per-stage latency histograms in Prometheus text format (TRACING_ENABLED=1).
+    """
+    return Response(render_metrics(), content_type=CONTENT_TYPE)
+
+
+@app.route("/usage", methods=["GET"])
+def usage_report() -> Response:
+    """
+    Token usage and cost, e.g. /usage?by=agent&top=5 (by: agent, intent, session, model).
+    """
+    by = request.args.get("by", "agent")
+    if by not in usage.DIMENSIONS:
+        abort(400)
+    top = request.args.get("top", default=0, type=int)
+    rows = usage.top(by, top) if top > 0 else sorted(usage.summary(by).items())
+    return jsonify({"totals": usage.totals(), "by": by, "rows": dict(rows)})
+
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=int(os.getenv("PORT", "5000")), debug=True)
@@ -4,9 +4,16 @@ from __future__ import annotations
 
 import json
 import os
-from typing import Dict
+from typing import TYPE_CHECKING, Dict
 
-from openai import OpenAI
+from agents.llm_gateway import LLM_TIMEOUT_SECONDS, guarded_call
+from agents.router_agent import coalesced
+from utils import call_log
+from utils.tracing import span
+from utils.usage import attribute, record_completion
+
+if TYPE_CHECKING:
+    from openai import OpenAI
 
 SUPPORTED_INTENTS = [
     "booking_request",
@@ -17,6 +24,7 @@ SUPPORTED_INTENTS = [
     "shuttle_request",
     "feedback_review",
     "room_upgrade_inquiry",
+    "local_guide_request",
 ]
 
 MODEL_NAME = os.getenv("INTENT_CLASSIFIER_MODEL", "gpt-4o-mini")
@@ -31,7 +39,9 @@ def _get_client() -> OpenAI:
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise RuntimeError("OPENAI_API_KEY environment variable is not set.")
-        _client = OpenAI(api_key=api_key)
+        from openai import OpenAI
+
+        _client = OpenAI(api_key=api_key, timeout=LLM_TIMEOUT_SECONDS)
     return _client
 
 
@@ -66,8 +76,11 @@ def classify_intent(user_message: str) -> str:
     sanitized_message = (user_message or "").strip()
     if not sanitized_message:
         return json.dumps({"intent": "general_question"})
+    # Identical questions asked at the same moment share one completion.
+    return coalesced("intent_classifier", sanitized_message, lambda: _request_intent(sanitized_message))
 
-    client = _get_client()
+
+def _request_intent(sanitized_message: str) -> str:
     system_prompt = (
         "You are an intent classification assistant for a hotel concierge system. "
         "Respond ONLY with a JSON object containing the key 'intent'. Valid "
@@ -76,14 +89,20 @@ def classify_intent(user_message: str) -> str:
         + ". If unsure, reply with general_question."
     )
 
-    completion = client.chat.completions.create(
-        model=MODEL_NAME,
-        temperature=0,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": sanitized_message},
-        ],
-    )
+    with span("llm", model=MODEL_NAME), attribute(agent="intent_classifier"):
+        request = {
+            "model": MODEL_NAME,
+            "temperature": 0,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": sanitized_message},
+            ],
+        }
+        completion = guarded_call(
+            MODEL_NAME,
+            lambda: call_log.invoke("chat", request, lambda: _get_client().chat.completions.create(**request)),
+        )
+        record_completion(MODEL_NAME, completion)
 
     raw = completion.choices[0].message.content if completion.choices else ""
     payload = _extract_json_object(raw)
@@ -0,0 +1,289 @@
+"""Bounded, TTL-evicting call session storage for the voice servers.
+
+Each call (keyed by Twilio ``CallSid``) gets a compact :class:`CallSession`
+record.  Two backends share the same interface:
+
+* :class:`MemorySessionStore` -- an ``OrderedDict`` in least-recently-used
+  order, so expired and overflow sessions are always at the front and are
+  evicted in O(evicted);
+* :class:`SQLiteSessionStore` -- a SQLite file (WAL mode) that several
+  gunicorn workers can open at once, so every worker sees the same call state.
+
+Both drop sessions idle for longer than ``ttl`` seconds, cap the number of
+live sessions at ``max_sessions`` (LRU eviction) and report counters through
+:meth:`stats`.  A session only becomes live -- and counts as created -- when
+it is first saved; :meth:`SessionStore.get` of an unknown call hands out a
+fresh record without storing it.  :func:`create_session_store` picks a backend from the
+environment (``VOICE_SESSION_BACKEND``, ``VOICE_SESSION_DB``,
+``VOICE_SESSION_TTL``, ``VOICE_SESSION_MAX``).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+DEFAULT_TTL_SECONDS = 3600.0
+DEFAULT_MAX_SESSIONS = 10000
+
+
+class CallSession:
+    """Per-call state.  ``__slots__`` keeps each record to a few hundred bytes."""
+
+    __slots__ = ("call_sid", "active_agent", "turns", "created_at", "updated_at", "data")
+
+    def __init__(self, call_sid: str, active_agent: Optional[str] = None, turns: int = 0,
+                 created_at: Optional[float] = None, updated_at: Optional[float] = None,
+                 data: Optional[Dict[str, Any]] = None):
+        now = time.time()
+        self.call_sid = call_sid
+        self.active_agent = active_agent
+        self.turns = turns
+        self.created_at = now if created_at is None else created_at
+        self.updated_at = self.created_at if updated_at is None else updated_at
+        self.data = data if data is not None else {}
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Dict-style access kept for code written against the old plain-dict sessions."""
+
+        if key in self.__slots__:
+            return getattr(self, key)
+        return self.data.get(key, default)
+
+    def __repr__(self) -> str:
+        return f"CallSession({self.call_sid!r}, active_agent={self.active_agent!r}, turns={self.turns})"
+
+
+class SessionStore(ABC):
+    """Interface shared by the session backends."""
+
+    def __init__(self, ttl: float = DEFAULT_TTL_SECONDS, max_sessions: int = DEFAULT_MAX_SESSIONS):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+
+    @abstractmethod
+    def get(self, call_sid: str) -> CallSession:
+        """Return the live session for ``call_sid`` or a fresh, not yet saved one."""
+
+    @abstractmethod
+    def save(self, session: CallSession) -> None:
+        """Persist ``session`` and mark it as recently used; the first save counts as created."""
+
+    @abstractmethod
+    def end(self, call_sid: str) -> None:
+        """Drop a session as soon as its call finishes."""
+
+    @abstractmethod
+    def purge(self) -> int:
+        """Evict expired and overflow sessions now; return how many were removed."""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """Counters: live sessions, created, ended, expired and LRU evictions."""
+
+    def __len__(self) -> int:
+        return self.stats()["live"]
+
+
+class MemorySessionStore(SessionStore):
+    """In-process store; fastest, but private to one worker."""
+
+    def __init__(self, ttl: float = DEFAULT_TTL_SECONDS, max_sessions: int = DEFAULT_MAX_SESSIONS):
+        super().__init__(ttl, max_sessions)
+        self._sessions: "OrderedDict[str, CallSession]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"created": 0, "ended": 0, "expired": 0, "evicted_lru": 0}
+
+    def _evict(self, now: float) -> int:
+        removed = 0
+        cutoff = now - self.ttl
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if oldest.updated_at >= cutoff:
+                break
+            self._sessions.popitem(last=False)
+            self._counters["expired"] += 1
+            removed += 1
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self._counters["evicted_lru"] += 1
+            removed += 1
+        return removed
+
+    def get(self, call_sid: str) -> CallSession:
+        now = time.time()
+        with self._lock:
+            self._evict(now)
+            session = self._sessions.get(call_sid)
+            if session is None:
+                return CallSession(call_sid, created_at=now)
+            self._sessions.move_to_end(call_sid)
+            session.updated_at = now
+            return session
+
+    def save(self, session: CallSession) -> None:
+        now = time.time()
+        with self._lock:
+            if session.call_sid not in self._sessions:
+                self._counters["created"] += 1
+            session.updated_at = now
+            self._sessions[session.call_sid] = session
+            self._sessions.move_to_end(session.call_sid)
+            self._evict(now)
+
+    def end(self, call_sid: str) -> None:
+        with self._lock:
+            if self._sessions.pop(call_sid, None) is not None:
+                self._counters["ended"] += 1
+
+    def purge(self) -> int:
+        with self._lock:
+            return self._evict(time.time())
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"live": len(self._sessions), **self._counters}
+
+
+class SQLiteSessionStore(SessionStore):
+    """SQLite-backed store shared by every worker process on the host."""
+
+    _SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS call_sessions (
+               call_sid TEXT PRIMARY KEY,
+               active_agent TEXT,
+               turns INTEGER NOT NULL DEFAULT 0,
+               created_at REAL NOT NULL,
+               updated_at REAL NOT NULL,
+               data TEXT NOT NULL DEFAULT '{}'
+           )""",
+        "CREATE INDEX IF NOT EXISTS idx_call_sessions_updated ON call_sessions(updated_at)",
+        "CREATE TABLE IF NOT EXISTS session_counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+    )
+
+    def __init__(self, path: str, ttl: float = DEFAULT_TTL_SECONDS,
+                 max_sessions: int = DEFAULT_MAX_SESSIONS, purge_every: int = 100):
+        super().__init__(ttl, max_sessions)
+        self.path = path
+        self.purge_every = purge_every
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        conn = self._conn()
+        with conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in self._SCHEMA:
+                conn.execute(statement)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _bump(conn: sqlite3.Connection, name: str, amount: int = 1) -> None:
+        if amount:
+            conn.execute(
+                "INSERT INTO session_counters(name, value) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                (name, amount),
+            )
+
+    def get(self, call_sid: str) -> CallSession:
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT active_agent, turns, created_at, updated_at, data FROM call_sessions WHERE call_sid = ?",
+            (call_sid,),
+        ).fetchone()
+        if row is not None and row[3] >= now - self.ttl:
+            return CallSession(call_sid, row[0], row[1], row[2], now, json.loads(row[4]))
+
+        if row is not None:
+            with conn:
+                deleted = conn.execute(
+                    "DELETE FROM call_sessions WHERE call_sid = ? AND updated_at < ?", (call_sid, now - self.ttl)
+                ).rowcount
+                self._bump(conn, "expired", deleted)
+        # Counted as created when first saved, so repeated gets of a new call count once.
+        return CallSession(call_sid, created_at=now)
+
+    def save(self, session: CallSession) -> None:
+        session.updated_at = time.time()
+        data = json.dumps(session.data, separators=(",", ":"))
+        conn = self._conn()
+        with conn:
+            created = conn.execute(
+                "INSERT INTO call_sessions(call_sid, active_agent, turns, created_at, updated_at, data) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(call_sid) DO NOTHING",
+                (session.call_sid, session.active_agent, session.turns, session.created_at,
+                 session.updated_at, data),
+            ).rowcount
+            if created:
+                self._bump(conn, "created")
+            else:
+                conn.execute(
+                    "UPDATE call_sessions SET active_agent = ?, turns = ?, updated_at = ?, data = ? "
+                    "WHERE call_sid = ?",
+                    (session.active_agent, session.turns, session.updated_at, data, session.call_sid),
+                )
+        with self._writes_lock:
+            self._writes += 1
+            due = self._writes % self.purge_every == 0
+        if due:
+            self.purge()
+
+    def end(self, call_sid: str) -> None:
+        conn = self._conn()
+        with conn:
+            deleted = conn.execute("DELETE FROM call_sessions WHERE call_sid = ?", (call_sid,)).rowcount
+            self._bump(conn, "ended", deleted)
+
+    def purge(self) -> int:
+        conn = self._conn()
+        with conn:
+            expired = conn.execute(
+                "DELETE FROM call_sessions WHERE updated_at < ?", (time.time() - self.ttl,)
+            ).rowcount
+            self._bump(conn, "expired", expired)
+            overflow = conn.execute("SELECT COUNT(*) FROM call_sessions").fetchone()[0] - self.max_sessions
+            evicted = 0
+            if overflow > 0:
+                evicted = conn.execute(
+                    "DELETE FROM call_sessions WHERE call_sid IN "
+                    "(SELECT call_sid FROM call_sessions ORDER BY updated_at LIMIT ?)",
+                    (overflow,),
+                ).rowcount
+                self._bump(conn, "evicted_lru", evicted)
+        return expired + evicted
+
+    def stats(self) -> Dict[str, int]:
+        conn = self._conn()
+        live = conn.execute(
+            "SELECT COUNT(*) FROM call_sessions WHERE updated_at >= ?", (time.time() - self.ttl,)
+        ).fetchone()[0]
+        counters = dict(conn.execute("SELECT name, value FROM session_counters").fetchall())
+        return {
+            "live": live,
+            **{name: int(counters.get(name, 0)) for name in ("created", "ended", "expired", "evicted_lru")},
+        }
+
+
+def create_session_store() -> SessionStore:
+    """Build the session store configured by environment variables."""
+
+    ttl = float(os.getenv("VOICE_SESSION_TTL", str(DEFAULT_TTL_SECONDS)))
+    max_sessions = int(os.getenv("VOICE_SESSION_MAX", str(DEFAULT_MAX_SESSIONS)))
+    if os.getenv("VOICE_SESSION_BACKEND", "memory").lower() == "sqlite":
+        path = os.getenv("VOICE_SESSION_DB", "voice_sessions.db")
+        return SQLiteSessionStore(path, ttl=ttl, max_sessions=max_sessions)
+    return MemorySessionStore(ttl=ttl, max_sessions=max_sessions)
@@ -0,0 +1,276 @@
+"""Streaming speech-to-text with energy-based voice-activity segmentation.
+
+Instead of uploading a whole recording once the caller has finished, audio is
+fed in as it arrives (16-bit little-endian mono PCM).  It is cut into
+fixed-size frames; a small NumPy voice-activity detector tracks each frame's
+energy against a noise floor -- calibrated at a fixed quiet-line level, so
+audio that opens with speech is still detected, then adapted to the
+background -- and closes a segment after a short pause.  Each finished segment is transcribed on a worker thread while the
+caller keeps talking, and the partial transcripts are stitched back together
+in segment order.
+
+Typical use with a live source::
+
+    transcriber = StreamingTranscriber(sample_rate=16000)
+    for chunk in audio_chunks:
+        transcriber.feed(chunk)
+        print(transcriber.partial())
+    text = transcriber.finish()
+
+:func:`transcribe_wav_streaming` does the same for a WAV file on disk.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import wave
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterator, List, Optional
+
+import numpy as np
+
+STREAMING_STT_WORKERS = int(os.getenv("STREAMING_STT_WORKERS", "4"))
+
+Transcriber = Callable[[BinaryIO], str]
+
+
+@dataclass(frozen=True)
+class VADConfig:
+    """Voice-activity detector settings (all durations in milliseconds)."""
+
+    frame_ms: int = 30
+    # A frame is speech when its energy exceeds the noise floor by this many dB
+    # and is above the absolute floor.
+    margin_db: float = 12.0
+    min_energy_db: float = -50.0
+    # Frames of speech needed to open a segment, silence needed to close it.
+    start_ms: int = 90
+    end_ms: int = 450
+    # Audio kept before the detected onset so the first syllable is not cut.
+    preroll_ms: int = 150
+    # Long monologues are split so transcription can start mid-sentence.
+    max_segment_ms: int = 12000
+    # How quickly the noise floor adapts to background level during silence.
+    noise_adapt: float = 0.05
+    # Starting noise floor in dBFS (a quiet phone line).  Seeding it from the
+    # first frame would make speech at the very start of the audio the floor.
+    calibration_db: float = -60.0
+    # A background louder than the calibration is tracked as the low
+    # percentile of the frame energies over this window.
+    noise_window_ms: int = 5000
+    noise_percentile: float = 10.0
+
+
+def frame_energy_db(frame: np.ndarray) -> float:
+    """RMS energy of int16 samples in dBFS."""
+
+    samples = frame.astype(np.float32) / 32768.0
+    rms = float(np.sqrt(np.mean(samples * samples))) if samples.size else 0.0
+    return 20.0 * np.log10(max(rms, 1e-10))
+
+
+class EnergyVAD:
+    """Incremental energy-based segmenter: feed frames, get finished speech segments."""
+
+    def __init__(self, sample_rate: int, config: VADConfig = VADConfig()):
+        self.sample_rate = sample_rate
+        self.config = config
+        self.frame_samples = sample_rate * config.frame_ms // 1000
+        self._start_frames = max(1, config.start_ms // config.frame_ms)
+        self._end_frames = max(1, config.end_ms // config.frame_ms)
+        self._preroll_frames = config.preroll_ms // config.frame_ms
+        self._max_frames = max(1, config.max_segment_ms // config.frame_ms)
+        self._window_frames = max(1, config.noise_window_ms // config.frame_ms)
+        self._noise_db = config.calibration_db
+        self._energies: List[float] = []
+        self._recent: List[np.ndarray] = []
+        self._segment: List[np.ndarray] = []
+        self._in_speech = False
+        self._voiced_run = 0
+        self._silent_run = 0
+
+    def _is_speech(self, energy_db: float) -> bool:
+        self._energies.append(energy_db)
+        if len(self._energies) >= self._window_frames:
+            # Raise the floor to a steady background that is louder than the
+            # calibration; pauses between words keep this low during speech.
+            floor = float(np.percentile(self._energies, self.config.noise_percentile))
+            self._noise_db = max(self._noise_db, floor)
+            self._energies = []
+        threshold = max(self.config.min_energy_db, self._noise_db + self.config.margin_db)
+        voiced = energy_db > threshold
+        if not voiced:
+            alpha = self.config.noise_adapt
+            self._noise_db = (1 - alpha) * self._noise_db + alpha * energy_db
+        return voiced
+
+    def push(self, frame: np.ndarray) -> Optional[np.ndarray]:
+        """Consume one frame; return a finished segment when one closes."""
+
+        voiced = self._is_speech(frame_energy_db(frame))
+        if not self._in_speech:
+            self._recent.append(frame)
+            self._voiced_run = self._voiced_run + 1 if voiced else 0
+            if self._voiced_run >= self._start_frames:
+                keep = self._voiced_run + self._preroll_frames
+                self._segment = self._recent[-keep:]
+                self._recent = []
+                self._in_speech = True
+                self._silent_run = 0
+            else:
+                del self._recent[: -(self._start_frames + self._preroll_frames)]
+            return None
+
+        self._segment.append(frame)
+        self._silent_run = 0 if voiced else self._silent_run + 1
+        if self._silent_run >= self._end_frames or len(self._segment) >= self._max_frames:
+            return self._close()
+        return None
+
+    def flush(self) -> Optional[np.ndarray]:
+        """Return the segment still open at end of stream, if any."""
+
+        return self._close() if self._in_speech else None
+
+    def _close(self) -> np.ndarray:
+        segment = np.concatenate(self._segment)
+        self._segment = []
+        self._in_speech = False
+        self._voiced_run = 0
+        self._silent_run = 0
+        return segment
+
+
+def segment_to_wav(samples: np.ndarray, sample_rate: int) -> io.BytesIO:
+    """Encode int16 mono samples as an in-memory WAV file for the STT API."""
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.astype("<i2").tobytes())
+    buffer.seek(0)
+    buffer.name = "segment.wav"  # the OpenAI SDK infers the format from the name
+    return buffer
+
+
+def _default_transcriber(stream: BinaryIO) -> str:
+    from hotel_voice_integration.stt_tts_utils import transcribe_audio_stream
+
+    return transcribe_audio_stream(stream)
+
+
+class StreamingTranscriber:
+    """Segment live PCM audio and transcribe segments in parallel as they close."""
+
+    def __init__(self, sample_rate: int, config: VADConfig = VADConfig(),
+                 transcribe: Optional[Transcriber] = None, max_workers: int = STREAMING_STT_WORKERS):
+        self.sample_rate = sample_rate
+        self.vad = EnergyVAD(sample_rate, config)
+        self._transcribe = transcribe or _default_transcriber
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stt-segment")
+        self._futures: List[Future] = []
+        self._pending = b""
+
+    def feed(self, pcm: bytes) -> None:
+        """Add raw 16-bit mono PCM of any length."""
+
+        data = self._pending + pcm
+        frame_bytes = self.vad.frame_samples * 2
+        usable = len(data) - len(data) % frame_bytes
+        self._pending = data[usable:]
+        if not usable:
+            return
+        frames = np.frombuffer(data[:usable], dtype="<i2").reshape(-1, self.vad.frame_samples)
+        for frame in frames:
+            segment = self.vad.push(frame)
+            if segment is not None:
+                self._submit(segment)
+
+    def _submit(self, segment: np.ndarray) -> None:
+        wav = segment_to_wav(segment, self.sample_rate)
+        self._futures.append(self._executor.submit(self._transcribe, wav))
+
+    @property
+    def segments(self) -> int:
+        return len(self._futures)
+
+    def partial(self) -> str:
+        """Transcript of the leading segments that have finished, in order."""
+
+        parts: List[str] = []
+        for future in self._futures:
+            if not future.done():
+                break
+            parts.append(future.result())
+        return _stitch(parts)
+
+    def finish(self) -> str:
+        """Close the stream, wait for outstanding segments and return the full transcript."""
+
+        if self._pending:
+            tail = np.frombuffer(self._pending[: len(self._pending) // 2 * 2], dtype="<i2")
+            self._pending = b""
+            if tail.size:
+                segment = self.vad.push(tail)
+                if segment is not None:
+                    self._submit(segment)
+        segment = self.vad.flush()
+        if segment is not None:
+            self._submit(segment)
+        try:
+            return _stitch([future.result() for future in self._futures])
+        finally:
+            self._executor.shutdown(wait=False)
+
+
+def _stitch(parts: List[str]) -> str:
+    return " ".join(part.strip() for part in parts if part and part.strip())
+
+
+def read_wav_chunks(path: str | Path, chunk_ms: int = 100) -> tuple[int, Iterator[bytes]]:
+    """Open a 16-bit PCM WAV file; return its sample rate and mono PCM chunks."""
+
+    wav = wave.open(str(path), "rb")
+    if wav.getsampwidth() != 2:
+        wav.close()
+        raise ValueError(f"{path}: only 16-bit PCM WAV audio is supported")
+    sample_rate, channels = wav.getframerate(), wav.getnchannels()
+    frames_per_chunk = max(1, sample_rate * chunk_ms // 1000)
+
+    def chunks() -> Iterator[bytes]:
+        with wav:
+            while True:
+                raw = wav.readframes(frames_per_chunk)
+                if not raw:
+                    return
+                if channels > 1:
+                    samples = np.frombuffer(raw, dtype="<i2").reshape(-1, channels)
+                    raw = samples.mean(axis=1).astype("<i2").tobytes()
+                yield raw
+
+    return sample_rate, chunks()
+
+
+def transcribe_wav_streaming(path: str | Path, *, config: VADConfig = VADConfig(),
+                             transcribe: Optional[Transcriber] = None,
+                             max_workers: int = STREAMING_STT_WORKERS) -> str:
+    """Transcribe a WAV file segment by segment, in parallel, and stitch the result.
+
+    If the detector finds no speech segment at all, the whole file is
+    transcribed in one request rather than returning an empty transcript.
+    """
+
+    sample_rate, chunks = read_wav_chunks(path)
+    transcriber = StreamingTranscriber(sample_rate, config, transcribe, max_workers)
+    for chunk in chunks:
+        transcriber.feed(chunk)
+    text = transcriber.finish()
+    if transcriber.segments:
+        return text
+    with open(path, "rb") as audio_file:
+        return (transcribe or _default_transcriber)(audio_file)
@@ -4,14 +4,23 @@ from __future__ import annotations
 
 import json
 import os
+import shutil
+import threading
 from pathlib import Path
-from typing import BinaryIO, Dict, Optional
+from typing import TYPE_CHECKING, BinaryIO, Callable, Dict, Optional
 
-from openai import OpenAI
+if TYPE_CHECKING:
+    from openai import OpenAI
 
-from agents.router_agent import route_to_agent
+from agents.degraded import llm_available, local_answer
+from agents.llm_gateway import LLMUnavailable, stream_reply
+from agents.router_agent import category_intent, predict_category, route_to_agent
 from hotel_voice_integration.intent_classifier import SUPPORTED_INTENTS, classify_intent
+from hotel_voice_integration.tts_cache import STANDARD_PROMPTS, cache_key, get_tts_cache
+from utils import call_log
+from utils.response_cache import cached_answer
 from utils.review_utils import clean_text
+from utils.tracing import span
 
 VOICE_STT_MODEL = os.getenv("VOICE_STT_MODEL", "gpt-4o-mini-transcribe")
 VOICE_TTS_MODEL = os.getenv("VOICE_TTS_MODEL", "gpt-4o-mini-tts")
@@ -27,6 +36,8 @@ def _get_client() -> OpenAI:
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise RuntimeError("OPENAI_API_KEY environment variable is not set.")
+        from openai import OpenAI
+
         _client = OpenAI(api_key=api_key)
     return _client
 
@@ -45,54 +56,100 @@ def _extract_intent(intent_payload: str) -> str:
     return intent
 
 
-def generate_agent_response(user_text: str) -> str:
-    """Return the AI response after cleaning and routing the user input."""
+def generate_agent_response(user_text: str, on_delta: Optional[Callable[[str], None]] = None) -> str:
+    """Return the AI response after cleaning and routing the user input.
+
+    With ``on_delta`` the agent's completion is streamed to it as it is
+    generated (see :func:`agents.llm_gateway.stream_reply`); the return value
+    is still the whole reply.
+    """
 
+    call_log.record_turn("generate_agent_response", user_text)
     cleaned_input = clean_text(user_text or "")
-    intent_payload = classify_intent(cleaned_input)
-    intent = _extract_intent(intent_payload)
-    response_text = route_to_agent(intent, cleaned_input)
+    cached = cached_answer("generate_agent_response", user_text or "")
+    if cached is not None:
+        return cached
+    if not llm_available():
+        return _local_response(user_text or "")
+    try:
+        with span("classify"):
+            intent_payload = classify_intent(cleaned_input)
+        intent = _extract_intent(intent_payload)
+        if on_delta is None:
+            response_text = route_to_agent(intent, cleaned_input)
+        else:
+            with stream_reply(on_delta):
+                response_text = route_to_agent(intent, cleaned_input)
+    except LLMUnavailable:
+        return _local_response(user_text or "")
     if not isinstance(response_text, str):
         response_text = "" if response_text is None else str(response_text)
     print("Intent Classified:", intent)
     return response_text
 
 
+def _local_response(user_text: str) -> str:
+    """Answer without the LLM while its circuit breaker is open."""
+
+    category = predict_category(user_text) or "faq"
+    if category == "booking":
+        return str(route_to_agent(category_intent(category), clean_text(user_text)))
+    return local_answer(user_text, category)
+
+
 def transcribe_audio_file(audio_path: str | Path) -> str:
     """Transcribe an audio file using the configured OpenAI STT model."""
 
-    client = _get_client()
     with open(audio_path, "rb") as audio_file:
-        transcription = client.audio.transcriptions.create(
-            model=VOICE_STT_MODEL,
-            file=audio_file,
-        )
-    text = getattr(transcription, "text", "")
-    return text.strip()
+        return transcribe_audio_stream(audio_file)
 
 
 def transcribe_audio_stream(audio_stream: BinaryIO) -> str:
     """Transcribe an in-memory audio stream (e.g., direct upload from Twilio)."""
 
-    client = _get_client()
-    transcription = client.audio.transcriptions.create(
-        model=VOICE_STT_MODEL,
-        file=audio_stream,
-    )
+    with span("stt", model=VOICE_STT_MODEL):
+        transcription = call_log.invoke(
+            "stt",
+            lambda: {"model": VOICE_STT_MODEL, "audio_sha256": call_log.audio_fingerprint(audio_stream)},
+            lambda: _get_client().audio.transcriptions.create(model=VOICE_STT_MODEL, file=audio_stream),
+        )
     text = getattr(transcription, "text", "")
     return text.strip()
 
 
+def synthesize_speech_bytes(text: str) -> bytes:
+    """Call the TTS API once and return the encoded audio (MP3)."""
+
+    request = {"model": VOICE_TTS_MODEL, "voice": VOICE_NAME, "input": text}
+    with span("tts", model=VOICE_TTS_MODEL):
+        response = call_log.invoke("tts", request, lambda: _get_client().audio.speech.create(**request))
+        return response.content
+
+
+def cached_speech(text: str) -> Path:
+    """Return the cached audio file for ``text``, synthesizing it only on a miss."""
+
+    return get_tts_cache().get_or_synthesize(text, VOICE_NAME, VOICE_TTS_MODEL, synthesize_speech_bytes)
+
+
+def cached_speech_key(text: str) -> str:
+    """Cache key (and audio URL stem) of ``text`` rendered with the configured voice."""
+
+    return cache_key(text, VOICE_NAME, VOICE_TTS_MODEL)
+
+
+def prewarm_standard_prompts() -> threading.Thread:
+    """Synthesize the prompts every call hears in a background thread."""
+
+    return get_tts_cache().prewarm(STANDARD_PROMPTS, VOICE_NAME, VOICE_TTS_MODEL, synthesize_speech_bytes)
+
+
 def synthesize_speech(text: str, output_path: str | Path) -> Path:
-    """Generate a speech file for the given text and return its path."""
-
-    client = _get_client()
-    response = client.audio.speech.create(
-        model=VOICE_TTS_MODEL,
-        voice=VOICE_NAME,
-        input=text,
-    )
+    """Generate a speech file for the given text and return its path.
+
+    Audio comes from the TTS cache, so a phrase is only synthesized once.
+    """
+
     output_path = Path(output_path)
-    audio_bytes = getattr(response, "audio", b"")
-    output_path.write_bytes(audio_bytes)
+    shutil.copyfile(cached_speech(text), output_path)
     return output_path
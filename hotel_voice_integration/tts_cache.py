@@ -0,0 +1,177 @@
+"""Content-addressed, size-capped disk cache for synthesized speech.
+
+Audio is stored as ``<sha256(model, voice, text)>.mp3`` under
+``TTS_CACHE_DIR`` (default ``data/tts_cache``).  Reads refresh the file's
+mtime, so when the directory grows past ``TTS_CACHE_MAX_MB`` (default 200) the
+least recently used files are deleted first -- except files used within
+the last ``TTS_CACHE_GRACE_SECONDS`` (default 300), which TwiML just issued
+may still point at; the cap may be exceeded briefly rather than break a
+``<Play>`` Twilio has yet to fetch.  Files are written to a
+temporary name and ``os.replace``-d into place, so concurrent workers never
+serve a half-written file, and concurrent requests for the same phrase in one
+process wait for a single synthesis instead of each calling the API.
+
+:data:`STANDARD_PROMPTS` lists the phrases every call hears; :meth:`TTSCache.prewarm`
+synthesizes them in a background thread at server start.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional
+
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "data/tts_cache")
+TTS_CACHE_MAX_BYTES = int(float(os.getenv("TTS_CACHE_MAX_MB", "200")) * 1024 * 1024)
+TTS_CACHE_GRACE_SECONDS = float(os.getenv("TTS_CACHE_GRACE_SECONDS", "300"))
+
+STANDARD_PROMPTS = (
+    "Welcome to the Hotel Concierge AI. How may I assist you today?",
+    "Is there anything else I can help you with?",
+    "One moment, please.",
+    "Sorry, I didn't hear anything. Please call again. Goodbye.",
+    "Sorry, I couldn't get that answer in time. Could you please repeat your question?",
+)
+
+Synthesizer = Callable[[str], bytes]
+
+_KEY_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def cache_key(text: str, voice: str, model: str) -> str:
+    """Stable content address for one (text, voice, model) rendering."""
+
+    return hashlib.sha256("\x00".join((model, voice, text)).encode("utf-8")).hexdigest()
+
+
+def is_cache_key(value: str) -> bool:
+    return bool(_KEY_RE.match(value))
+
+
+class TTSCache:
+    """Disk LRU of audio files keyed by :func:`cache_key`."""
+
+    def __init__(self, directory: str = TTS_CACHE_DIR, max_bytes: int = TTS_CACHE_MAX_BYTES,
+                 grace_seconds: float = TTS_CACHE_GRACE_SECONDS):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.grace_seconds = grace_seconds
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, threading.Event] = {}
+        self._total_bytes = sum(path.stat().st_size for path in self.directory.glob("*.mp3"))
+
+    def path_for(self, key: str) -> Path:
+        return self.directory / f"{key}.mp3"
+
+    def get(self, key: str) -> Optional[Path]:
+        """Return the cached file for ``key`` (marking it recently used) or ``None``."""
+
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, audio: bytes) -> Path:
+        """Atomically store ``audio`` under ``key`` and enforce the size cap."""
+
+        path = self.path_for(key)
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(audio)
+            os.replace(tmp_name, path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+        with self._lock:
+            self._total_bytes += len(audio)
+            if self._total_bytes > self.max_bytes:
+                self._evict(keep=path)
+        return path
+
+    def get_or_synthesize(self, text: str, voice: str, model: str, synthesize: Synthesizer) -> Path:
+        """Return cached audio for ``text``, calling ``synthesize`` at most once per phrase."""
+
+        key = cache_key(text, voice, model)
+        while True:
+            path = self.get(key)
+            if path is not None:
+                return path
+            with self._lock:
+                pending = self._inflight.get(key)
+                if pending is None:
+                    pending = self._inflight[key] = threading.Event()
+                    owner = True
+                else:
+                    owner = False
+            if not owner:
+                # Another thread is synthesizing this phrase; reuse its result.
+                pending.wait()
+                continue
+            try:
+                return self.put(key, synthesize(text))
+            finally:
+                with self._lock:
+                    del self._inflight[key]
+                pending.set()
+
+    def prewarm(self, texts: Iterable[str], voice: str, model: str,
+                synthesize: Synthesizer) -> threading.Thread:
+        """Synthesize ``texts`` in a daemon thread; failures are logged and skipped."""
+
+        def run() -> None:
+            for text in texts:
+                try:
+                    self.get_or_synthesize(text, voice, model, synthesize)
+                except Exception as exc:
+                    print(f"[TTS cache] prewarm failed for {text!r}: {exc}")
+
+        thread = threading.Thread(target=run, name="tts-prewarm", daemon=True)
+        thread.start()
+        return thread
+
+    def _evict(self, keep: Path) -> None:
+        entries = []
+        for path in self.directory.glob("*.mp3"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        self._total_bytes = sum(size for _, size, _ in entries)
+        # get() and put() refresh the mtime, so this spares every file handed out recently.
+        recent = time.time() - self.grace_seconds
+        for mtime, size, path in sorted(entries):
+            if self._total_bytes <= self.max_bytes or mtime >= recent:
+                break
+            if path == keep:
+                continue
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            self._total_bytes -= size
+
+
+_cache: Optional[TTSCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_tts_cache() -> TTSCache:
+    """Return the process-wide TTS cache."""
+
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = TTSCache()
+    return _cache
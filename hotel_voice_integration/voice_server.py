@@ -19,8 +19,10 @@ transcript to `/process`.  The transcript is routed through the
 classification logic to select one of your specialised agents (faq,
 booking, restaurant, spa, shuttle or policy), and the agent’s
 response is returned as a spoken reply.  Multi‑turn flows such as
-hotel bookings are supported by tracking state in a simple in‑memory
-session dictionary keyed by the Twilio Call SID.
+hotel bookings are supported by tracking state in a bounded session
+store keyed by the Twilio Call SID (see `session_store.py`); idle calls
+expire after `VOICE_SESSION_TTL` seconds and `VOICE_SESSION_BACKEND=sqlite`
+shares call state between worker processes.
 
 This file is independent of your Streamlit front end; it imports the
 classification and agent functions directly from your existing
@@ -38,6 +40,17 @@ Environment variables:
 
     OPENAI_API_KEY – your OpenAI API key for classification
     MODEL_NAME – optional; defaults to "gpt-4o-mini"
+    VOICE_SESSION_BACKEND – optional; "memory" (default) or "sqlite"
+    VOICE_SESSION_DB – optional; SQLite file, defaults to "voice_sessions.db"
+    VOICE_SESSION_TTL – optional; idle seconds before a call session expires
+    VOICE_SESSION_MAX – optional; maximum number of live call sessions
+    VOICE_FAST_ACK – optional; "1" answers `/process` immediately and
+        computes the reply in a background worker (see utils/job_queue.py)
+    VOICE_TTS_PLAYBACK – optional; "1" plays OpenAI TTS audio from the
+        content-addressed cache (see tts_cache.py) with `<Play>` instead
+        of Twilio's `<Say>`; standard prompts are synthesized at startup,
+        and replies are streamed from the model and synthesized sentence
+        by sentence while the rest is still being generated
 
 Usage:
 
@@ -50,95 +63,180 @@ configure your Twilio phone number’s Voice webhook to point to
 instructions.
 """
 
+import functools
 import os
-from flask import Flask, request
+from contextlib import nullcontext
+from typing import List
+
+from flask import Flask, Response, abort, jsonify, request, send_file
 from twilio.twiml.voice_response import VoiceResponse, Gather
-from openai import OpenAI
 
-from agents.faq_agent import faq_answer
-from agents.booking_agent import booking_agent
-from agents.restaurant_agent import restaurant_response
-from agents.spa_agent import spa_response
-from agents.policy_agent import policy_response
-from agents.shuttle_agent import shuttle_response
+from agents.degraded import llm_available, local_answer
+from agents.llm_gateway import MODEL_NAME, LLMUnavailable, breaker_states, chat_completion, stream_reply
+from agents.registry import AGENTS
+from agents.router_agent import category_intent, coalesced, predict_category
+from agents.warmup import warm_up
+from hotel_voice_integration.session_store import create_session_store
+from hotel_voice_integration.stt_tts_utils import cached_speech, cached_speech_key, prewarm_standard_prompts
+from hotel_voice_integration.tts_cache import get_tts_cache, is_cache_key
+from utils.tracing import CONTENT_TYPE, render_metrics, span
+from utils import call_log, usage
+from utils.response_cache import cached_answer
+from utils.job_queue import DONE, FAST_ACK_WAIT, MAX_POLLS, PENDING, POLL_PAUSE_SECONDS, get_job_queue
+from utils.voice_backend import reply_fragments, synthesize_pipelined
 
 app = Flask(__name__)
 
-# Initialise OpenAI client
-openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-MODEL_NAME = os.getenv("MODEL_NAME", "gpt-4o-mini")
+# Agents and indexes load on first use; WARM_AGENTS=1 builds them all at
+# startup so the first caller does not pay for it.
+if os.getenv("WARM_AGENTS") == "1":
+    warm_up()
+
+# Per-call session state keyed by Twilio CallSid, bounded by TTL and LRU eviction.
+sessions = create_session_store()
+
+# Fast-ack mode keeps webhook latency constant however slow the LLM turn is:
+# /process queues the turn and Twilio polls /result/<job> until it is ready.
+FAST_ACK = os.getenv("VOICE_FAST_ACK") == "1"
+
+# TTS playback serves cached audio via <Play>; every phrase is synthesized
+# once, and the prompts every caller hears are synthesized at startup.
+TTS_PLAYBACK = os.getenv("VOICE_TTS_PLAYBACK") == "1"
+if TTS_PLAYBACK:
+    prewarm_standard_prompts()
+
 
-# Keep session state per call in memory.  Keys are Twilio CallSid.
-sessions = {}
+def _speak(target, text: str, wait: bool = True) -> None:
+    """Add `text` to a VoiceResponse or Gather, as cached audio when
+    TTS playback is enabled.  With `wait=False` an uncached phrase is
+    spoken with `<Say>` instead of blocking on synthesis; synthesis
+    errors also fall back to `<Say>`.
+    """
+    if TTS_PLAYBACK:
+        try:
+            if wait:
+                cached_speech(text)
+                ready = True
+            else:
+                ready = get_tts_cache().get(cached_speech_key(text)) is not None
+        except Exception as exc:
+            print(f"[Voice] TTS failed, falling back to <Say>: {exc}")
+            ready = False
+        if ready:
+            target.play(f"/audio/{cached_speech_key(text)}.mp3")
+            return
+    target.say(text, voice="alice", language="en-US")
 
 
 def classify_intent(text: str) -> str:
     """Classify a user utterance into one of the supported
     categories using an OpenAI Chat completion.  Returns a lowercase
     category name such as 'faq', 'booking', 'restaurant', 'spa',
-    'shuttle' or 'policy'.  If classification fails, defaults to
+    'shuttle', 'policy' or 'localguide'.  If classification fails, defaults to
     'faq'.  The model is deterministic (temperature 0) to ensure
     predictable routing.
     """
+    return coalesced("voice_classifier", text, lambda: _ask_intent(text))
+
+
+def _ask_intent(text: str) -> str:
     prompt = f"""
-Classify the user's intent into one of these categories: [FAQ, Booking, Restaurant, Spa, Shuttle, Policy].
+Classify the user's intent into one of these categories: [FAQ, Booking, Restaurant, Spa, Shuttle, Policy, LocalGuide].
 Query: "{text}"
 Respond with ONLY one word (the category name).
 """
     try:
-        result = openai_client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[
-                {"role": "system", "content": "You are a classification assistant for hotel queries."},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0,
-        )
-        intent = result.choices[0].message.content.strip().lower()
+        with span("classify"), usage.attribute(agent="voice_classifier"):
+            intent = chat_completion(
+                model=MODEL_NAME,
+                messages=[
+                    {"role": "system", "content": "You are a classification assistant for hotel queries."},
+                    {"role": "user", "content": prompt},
+                ],
+                temperature=0,
+            ).lower()
         return intent
     except Exception:
         # Fallback to FAQ if classification fails
         return "faq"
 
 
-def handle_message(call_id: str, text: str) -> str:
+def handle_message(call_id: str, text: str, on_delta=None) -> str:
     """Route the caller's message to the appropriate agent and
     return the response.  Maintains a simple session dictionary
-    allowing multi‑turn flows for the booking agent.  The booking
+    store allowing multi‑turn flows for the booking agent.  The booking
     agent maintains its own state across turns, so once a user
     triggers a booking intent the session’s `active_agent` field is
     set to "booking" until the booking agent indicates completion.
+    With `on_delta` the agent's completion is streamed to it as it is
+    generated.
     """
-    # Ensure a session entry exists
-    session = sessions.setdefault(call_id, {"active_agent": None})
-    active = session.get("active_agent")
+    call_log.record_turn("voice_call", text, call_id)
+    session = sessions.get(call_id)
+    session.turns += 1
+    try:
+        with span("turn"), usage.attribute(session=call_id):
+            return _dispatch(session, text, on_delta)
+    finally:
+        sessions.save(session)
+
 
+def _dispatch(session, text: str, on_delta=None) -> str:
     # If a multi‑turn flow is in progress, continue with that agent
-    if active == "booking":
-        reply = booking_agent(text)
+    if session.active_agent == "booking":
+        reply = AGENTS.get("booking")(text)
         # Booking agent should determine when to end flow; here we
         # reset active_agent based on a simple keyword heuristic
         if any(word in text.lower() for word in ["thank", "done", "cancel"]):
-            session["active_agent"] = None
+            session.active_agent = None
         return reply
 
-    # Otherwise classify and route
+    cached = cached_answer("voice_call", text)
+    if cached is not None:
+        return cached
+
+    # Provider down or crawling: answer from local data without the LLM
+    if not llm_available():
+        return _local_reply(session, text)
+
+    # Otherwise classify and route; only the agent's reply is streamed
     intent = classify_intent(text)
+    with usage.attribute(intent=category_intent(intent)), stream_reply(on_delta) if on_delta else nullcontext():
+        try:
+            if "booking" in intent:
+                return _route_intent(session, intent, text)
+            # Stateless agents: callers asking the same thing at once share one answer
+            return coalesced(intent, text, lambda: _route_intent(session, intent, text))
+        except LLMUnavailable:
+            # The breaker opened during this turn
+            return _local_reply(session, text)
+
+
+def _local_reply(session, text: str) -> str:
+    intent = predict_category(text) or "faq"
+    if intent == "booking":
+        return _route_intent(session, intent, text)
+    return local_answer(text, intent)
+
+
+def _route_intent(session, intent: str, text: str) -> str:
     if "faq" in intent:
-        return faq_answer(text)
+        return AGENTS.get("faq")(text)
     if "booking" in intent:
-        session["active_agent"] = "booking"
-        return booking_agent(text)
+        session.active_agent = "booking"
+        return AGENTS.get("booking")(text)
     if "restaurant" in intent:
-        return restaurant_response(text)
+        return AGENTS.get("restaurant")(text)
     if "spa" in intent:
-        return spa_response(text)
+        return AGENTS.get("spa")(text)
     if "shuttle" in intent:
-        return shuttle_response(text)
+        return AGENTS.get("shuttle")(text)
     if "policy" in intent:
-        return policy_response(text)
+        return AGENTS.get("policy")(text)
+    if "local" in intent or "guide" in intent:
+        return AGENTS.get("local_guide")(text)
     # Default fallback
-    return faq_answer(text)
+    return AGENTS.get("faq")(text)
 
 
 @app.route("/voice", methods=["GET", "POST"])
@@ -156,30 +254,47 @@ def voice() -> str:
         timeout=5,
         speech_timeout="auto",
     )
-    gather.say("Welcome to the Hotel Concierge AI. How may I assist you today?", voice="alice", language="en-US")
+    _speak(gather, "Welcome to the Hotel Concierge AI. How may I assist you today?", wait=False)
     resp.append(gather)
-    resp.say("Sorry, I didn't hear anything. Please call again. Goodbye.")
+    _speak(resp, "Sorry, I didn't hear anything. Please call again. Goodbye.", wait=False)
     resp.hangup()
     return str(resp)
 
 
-@app.route("/process", methods=["GET", "POST"])
-def process() -> str:
-    """Handle the transcript returned by Twilio.  Uses the CallSid
-    as a session identifier to support multi‑turn flows.  Replies
-    with the agent’s response and gathers further input if the
-    conversation should continue.
+def _prefetch_speech(text: str) -> str:
+    """Synthesize one reply sentence into the TTS cache; on failure the
+    sentence is left for `_speak` to read with `<Say>`.
+    """
+    try:
+        return str(cached_speech(text))
+    except Exception as exc:
+        print(f"[Voice] TTS failed, falling back to <Say>: {exc}")
+        return ""
+
+
+def _turn(call_id: str, transcript: str) -> List[str]:
+    """Compute the reply to one caller turn as the sentences to speak.
+    With TTS playback the reply streams from the model into the TTS
+    pipeline, so each sentence is synthesized while the model is still
+    writing the next one and the audio is cached before the TwiML goes out.
+    """
+    if not TTS_PLAYBACK:
+        return [handle_message(call_id, transcript)]
+    fragments = reply_fragments(transcript, functools.partial(handle_message, call_id))
+    return [chunk.text for chunk in synthesize_pipelined(fragments, synthesize=_prefetch_speech)]
+
+
+def _reply_twiml(call_id: str, transcript: str, sentences: List[str]) -> str:
+    """Speak the agent's reply and gather further input unless the
+    caller is saying goodbye.
     """
-    transcript = request.values.get("SpeechResult", "") or request.values.get("speechResult", "")
-    call_id = request.values.get("CallSid", "")
-    # Generate reply using our routing logic
-    reply = handle_message(call_id, transcript)
-    # Build TwiML response
     resp = VoiceResponse()
-    # Speak the reply
-    resp.say(reply, voice="alice", language="en-US")
+    # Speak the reply; streamed sentences are already in the TTS cache
+    for sentence in sentences:
+        _speak(resp, sentence, wait=False)
     # Determine if conversation should continue
     if any(word in transcript.lower() for word in ["bye", "goodbye", "thank you"]):
+        sessions.end(call_id)
         resp.hangup()
         return str(resp)
     # Prompt for further input
@@ -191,10 +306,121 @@ def process() -> str:
         timeout=5,
         speech_timeout="auto",
     )
-    gather.say("Is there anything else I can help you with?", voice="alice", language="en-US")
+    _speak(gather, "Is there anything else I can help you with?", wait=False)
     resp.append(gather)
     return str(resp)
 
 
+def _job_twiml(job_id: str, poll: int) -> str:
+    """Return the reply of a finished background job, or TwiML that
+    pauses and polls `/result/<job_id>` again (at most MAX_POLLS times).
+    """
+    queue = get_job_queue()
+    job = queue.get(job_id)
+    status = queue.wait(job, FAST_ACK_WAIT) if job is not None else None
+
+    if status == DONE:
+        queue.pop(job_id)
+        return _reply_twiml(job.context["call_id"], job.context["transcript"], job.future.result())
+
+    resp = VoiceResponse()
+    if status == PENDING and poll < MAX_POLLS:
+        if poll == 0:
+            _speak(resp, "One moment, please.", wait=False)
+        resp.pause(length=POLL_PAUSE_SECONDS)
+        resp.redirect(f"/result/{job_id}?poll={poll + 1}", method="POST")
+        return str(resp)
+
+    # Failed, expired or still running after MAX_POLLS: ask the caller to retry.
+    queue.pop(job_id)
+    gather = Gather(
+        input="speech",
+        action="/process",
+        method="POST",
+        language="en-US",
+        timeout=5,
+        speech_timeout="auto",
+    )
+    _speak(gather, "Sorry, I couldn't get that answer in time. Could you please repeat your question?",
+           wait=False)
+    resp.append(gather)
+    return str(resp)
+
+
+@app.route("/process", methods=["GET", "POST"])
+def process() -> str:
+    """Handle the transcript returned by Twilio.  Uses the CallSid
+    as a session identifier to support multi‑turn flows.  Replies
+    with the agent’s response and gathers further input if the
+    conversation should continue.
+    """
+    transcript = request.values.get("SpeechResult", "") or request.values.get("speechResult", "")
+    call_id = request.values.get("CallSid", "")
+    if not FAST_ACK:
+        return _reply_twiml(call_id, transcript, _turn(call_id, transcript))
+
+    job = get_job_queue().submit(
+        _background_turn, call_id, transcript, context={"call_id": call_id, "transcript": transcript}
+    )
+    return _job_twiml(job.job_id, poll=0)
+
+
+def _background_turn(call_id: str, transcript: str) -> List[str]:
+    """Fast-ack job: compute the reply and, with TTS playback, its audio."""
+    return _turn(call_id, transcript)
+
+
+@app.route("/result/<job_id>", methods=["GET", "POST"])
+def result(job_id: str) -> str:
+    """Poll endpoint Twilio is redirected to while a fast-ack reply
+    is computed in the background.
+    """
+    return _job_twiml(job_id, request.args.get("poll", default=1, type=int))
+
+
+@app.route("/audio/<key>.mp3", methods=["GET"])
+def audio(key: str):
+    """Serve synthesized speech from the TTS cache for `<Play>`."""
+    if not is_cache_key(key):
+        abort(404)
+    path = get_tts_cache().get(key)
+    if path is None:
+        abort(404)
+    return send_file(path.resolve(), mimetype="audio/mpeg", max_age=86400)
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics() -> Response:
+    """Per-stage latency histograms in Prometheus text format
+    (populated when TRACING_ENABLED=1).
+    """
+    return Response(render_metrics(), content_type=CONTENT_TYPE)
+
+
+@app.route("/llm/breakers", methods=["GET"])
+def llm_breakers():
+    """Circuit breaker state and recent error / slow-call rates per model."""
+    return jsonify(breaker_states())
+
+
+@app.route("/sessions/stats", methods=["GET"])
+def session_stats():
+    """Live call sessions plus created/ended/expired/LRU-evicted counters."""
+    return jsonify(sessions.stats())
+
+
+@app.route("/usage", methods=["GET"])
+def usage_report():
+    """Token usage and cost, e.g. `/usage?by=agent&top=5`
+    (`by` is agent, intent, session or model).
+    """
+    by = request.args.get("by", "agent")
+    if by not in usage.DIMENSIONS:
+        abort(400)
+    top = request.args.get("top", default=0, type=int)
+    rows = usage.top(by, top) if top > 0 else sorted(usage.summary(by).items())
+    return jsonify({"totals": usage.totals(), "by": by, "rows": dict(rows)})
+
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=8000)
\ No newline at end of file
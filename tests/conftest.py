@@ -0,0 +1,22 @@
+"""Shared fixtures: the offline OpenAI stand-in from :mod:`benchmarks.fake_openai_server`."""
+
+import pytest
+
+from agents import llm_gateway
+from benchmarks.fake_openai_server import start_server
+
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    """Point the shared client at a fresh fake API server with fresh circuit breakers."""
+
+    server = start_server()
+    monkeypatch.setenv("OPENAI_BASE_URL", server.base_url)
+    monkeypatch.setenv("OPENAI_API_KEY", "fake")
+    monkeypatch.setattr(llm_gateway, "_client", None)
+    monkeypatch.setattr(llm_gateway, "_breakers", {})
+    # Build the client now so timing assertions do not include the SDK import.
+    llm_gateway.get_client()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,66 @@
+"""Recording model calls and replaying them without the API."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from agents import llm_gateway
+from utils import call_log
+from utils.call_log import RECORD, REPLAY, CallLog, ReplayedError, ReplayMiss
+
+MESSAGES = [{"role": "user", "content": "Is breakfast included?"}]
+
+
+@pytest.fixture
+def log_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(call_log, "_log", call_log.get_call_log())
+    return str(tmp_path / "model_calls.jsonl")
+
+
+def test_identical_requests_replay_in_recorded_order(tmp_path):
+    path = str(tmp_path / "calls.jsonl")
+    recorder = CallLog(path, RECORD)
+    for text in ("first", "second"):
+        recorder.record_call("stt", {"audio": "abc"}, lambda text=text: SimpleNamespace(text=text))
+    recorder.record_call("tts", {"input": "Hello"}, lambda: SimpleNamespace(content=b"ID3audio"))
+    with pytest.raises(TimeoutError):
+        recorder.record_call("stt", {"audio": "slow"}, lambda: (_ for _ in ()).throw(TimeoutError("too slow")))
+
+    replay = CallLog(path, REPLAY, speed=0)
+
+    assert [replay.replay_call("stt", {"audio": "abc"}).text for _ in range(3)] == ["first", "second", "second"]
+    assert replay.replay_call("tts", {"input": "Hello"}).content == b"ID3audio"
+    with pytest.raises(ReplayedError, match="too slow"):
+        replay.replay_call("stt", {"audio": "slow"})
+
+
+def test_chat_round_trip_through_the_gateway(fake_openai, log_path):
+    call_log.configure(log_path, RECORD)
+    recorded = llm_gateway.chat_completion(MESSAGES)
+    call_log.record_turn("route_query", "Is breakfast included?")
+    fake_openai.requests.clear()
+
+    call_log.configure(log_path, REPLAY, speed=0)
+
+    assert llm_gateway.chat_completion(MESSAGES) == recorded
+    assert fake_openai.requests == {}
+    with pytest.raises(ReplayMiss):
+        llm_gateway.chat_completion([{"role": "user", "content": "Do you allow pets?"}])
+
+
+def test_recorded_traffic_replays_and_reports_misses(fake_openai, log_path):
+    from utils.stt_tts_utils import process_speech_and_generate_audio
+
+    call_log.configure(log_path, RECORD)
+    process_speech_and_generate_audio("Is breakfast included?")
+    # A turn whose model call was never recorded.
+    call_log.record_turn("concierge", "Do you allow pets?")
+    fake_openai.requests.clear()
+
+    result = call_log.replay_traffic(log_path, speed=0, workers=1)
+
+    assert result["turns"] == 2 and result["ok"] == 1
+    assert result["failures"] == {"ReplayMiss": 1}
+    assert result["p50_ms"] >= 0.0
+    assert fake_openai.requests == {}
+    assert call_log.log_stats(log_path)["chat"]["calls"] == 1
@@ -0,0 +1,74 @@
+"""The LLM circuit breaker trips on slow calls and a probe closes it again."""
+
+import time
+
+import pytest
+
+from agents import degraded, llm_gateway, router_agent
+from agents.llm_gateway import LLMUnavailable, chat_completion, is_available
+from benchmarks.fake_openai_server import LatencyModel
+
+MESSAGES = [{"role": "user", "content": "Hello"}]
+
+
+@pytest.fixture
+def breaker_settings(fake_openai, monkeypatch):
+    monkeypatch.setattr(llm_gateway, "BREAKER_ENABLED", True)
+    monkeypatch.setattr(llm_gateway, "BREAKER_MIN_CALLS", 3)
+    monkeypatch.setattr(llm_gateway, "BREAKER_SLOW_SECONDS", 0.1)
+    monkeypatch.setattr(llm_gateway, "BREAKER_SLOW_RATE", 0.5)
+    monkeypatch.setattr(llm_gateway, "BREAKER_PROBE_SECONDS", 0.05)
+    yield fake_openai
+    # Stop the probe threads of breakers left open.
+    for breaker in list(llm_gateway._breakers.values()):
+        breaker.close()
+
+
+def _trip(server):
+    server.latencies["llm"] = LatencyModel.parse("200")
+    for _ in range(3):
+        chat_completion(MESSAGES)
+
+
+def _wait_until(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return condition()
+
+
+def test_slow_calls_trip_the_breaker_and_fail_fast(breaker_settings):
+    server = breaker_settings
+    _trip(server)
+    sent = server.requests["/v1/chat/completions"]
+
+    assert not is_available()
+    assert llm_gateway.breaker_states()[llm_gateway.MODEL_NAME]["trips"] == 1
+    started = time.monotonic()
+    with pytest.raises(LLMUnavailable):
+        chat_completion(MESSAGES)
+    assert time.monotonic() - started < 0.05
+    assert server.requests["/v1/chat/completions"] == sent
+
+
+def test_open_breaker_routes_to_local_answers(breaker_settings):
+    server = breaker_settings
+    _trip(server)
+    sent = server.requests["/v1/chat/completions"]
+
+    answer = router_agent.route_query("Do you allow pets?")
+
+    assert answer == degraded.local_answer("Do you allow pets?")
+    assert server.requests["/v1/chat/completions"] == sent
+
+
+def test_probe_closes_the_breaker_once_the_provider_is_fast(breaker_settings):
+    server = breaker_settings
+    _trip(server)
+    time.sleep(0.3)
+    assert not is_available()  # probes are still too slow
+
+    server.latencies["llm"] = LatencyModel.parse("0")
+
+    assert _wait_until(is_available)
+    assert chat_completion(MESSAGES)
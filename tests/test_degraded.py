@@ -0,0 +1,62 @@
+"""Local-only answers while the LLM circuit breaker is open."""
+
+import pytest
+
+from agents import degraded, llm_gateway, router_agent
+from agents.circuit_breaker import CircuitBreaker
+from agents.faq_agent import faq_answer
+
+
+@pytest.fixture
+def open_breaker(monkeypatch):
+    breaker = CircuitBreaker(llm_gateway.MODEL_NAME, probe=None)
+    breaker.force_open("test")
+    monkeypatch.setattr(llm_gateway, "BREAKER_ENABLED", True)
+    monkeypatch.setitem(llm_gateway._breakers, llm_gateway.MODEL_NAME, breaker)
+    return breaker
+
+
+@pytest.mark.parametrize("query, category", [
+    ("Is there parking at the hotel?", None),
+    ("Can I book a table at the restaurant tonight?", "restaurant"),
+    ("Can I book a massage for tomorrow?", "spa"),
+    ("I'd like to book a room for two nights", "booking"),
+    ("Are there any museums nearby?", "localguide"),
+    ("Is there a park close by?", "localguide"),
+    ("Do you have an airport shuttle?", "shuttle"),
+])
+def test_predict_category_matches_whole_words(query, category):
+    assert router_agent.predict_category(query) == category
+
+
+def test_parking_question_is_not_answered_with_museums():
+    answer = degraded.local_answer("Is there parking at the hotel?")
+
+    assert "parking" in answer.lower()
+    assert "museum" not in answer.lower()
+
+
+def test_complaint_gets_an_apology_not_policy_text():
+    assert degraded.local_answer("I want a refund, the AC broke") == degraded.COMPLAINT_REPLY
+
+
+def test_agents_let_llm_unavailable_through(open_breaker):
+    with pytest.raises(llm_gateway.LLMUnavailable):
+        faq_answer("Tell me something about the moon landing")
+
+
+def test_breaker_opening_mid_turn_falls_back_to_local_data(open_breaker, monkeypatch):
+    # The pre-check saw a closed breaker; it opened before the agent's call.
+    monkeypatch.setattr(router_agent, "llm_available", lambda: True)
+    monkeypatch.setattr(router_agent, "classify_query", lambda query, deadline: [("faq", query)])
+
+    answer = router_agent.route_query("Tell me something about the moon landing")
+
+    assert answer == degraded.UNAVAILABLE_REPLY
+
+
+def test_concierge_falls_back_on_the_guest_wording(open_breaker):
+    from utils.stt_tts_utils import process_speech_and_generate_audio
+
+    # Cleaning drops "not", which would hide the complaint.
+    assert process_speech_and_generate_audio("The shower is not working") == degraded.COMPLAINT_REPLY
@@ -0,0 +1,68 @@
+"""Direct FAQ answers need a clear lead over the runner-up."""
+
+import pytest
+
+from agents import faq_agent
+from agents.faq_index import FAQEntry, FAQIndex, get_faq_index
+
+ENTRIES = [
+    FAQEntry("What time is check-in?", "Check-in is from 3:00 PM."),
+    FAQEntry("what time is check-out", "Check-out is by 12:00 PM."),
+    FAQEntry("do you have valet parking", "We currently offer self-parking only."),
+    FAQEntry("is parking available", "Yes, self-parking is $15 per night."),
+    FAQEntry("Is breakfast included?", "Yes, breakfast is included."),
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return FAQIndex(ENTRIES)
+
+
+def test_postings_are_sets(index):
+    assert all(isinstance(docs, set) for docs in index._postings.values())
+
+
+@pytest.mark.parametrize("query, question", [
+    ("check in time?", "What time is check-in?"),
+    ("Is breakfast included?", "Is breakfast included?"),
+])
+def test_exact_match_is_answered_directly(index, query, question):
+    assert index.best(query).entry.question == question
+
+
+@pytest.mark.parametrize("query", ["is there parking", "What time is checkout?"])
+def test_near_miss_is_not_answered_directly(index, query):
+    assert index.search(query, k=1)[0].score >= 0.7
+    assert index.best(query) is None
+
+
+def test_ambiguous_faq_goes_to_the_model(index, monkeypatch):
+    prompts = []
+    monkeypatch.setattr(faq_agent, "get_faq_index", lambda: index)
+    monkeypatch.setattr(faq_agent, "chat_completion",
+                        lambda messages, **kwargs: prompts.append(messages[-1]["content"]) or "model reply")
+
+    assert faq_agent.faq_answer("is there parking") == "model reply"
+    assert "valet parking" in prompts[0] and "is parking available" in prompts[0]
+
+
+def test_alternative_phrasings_share_one_entry():
+    index = FAQIndex([FAQEntry("what time is check-out", "Check-out is at 12:00 PM.",
+                               ("checkout time", "what time to leave the room")),
+                      FAQEntry("What time is check-in?", "Check-in starts at 3 PM.")],
+                     max_posting_fraction=1.0)
+
+    matches = index.search("checkout time")
+
+    assert [m.entry.question for m in matches] == ["what time is check-out", "What time is check-in?"]
+    assert matches[0].score == 1.0 and matches[1].score < 1.0
+
+
+@pytest.mark.parametrize("query", ["checkout time", "what time to leave the room"])
+def test_checkout_phrasings_answer_directly(query):
+    assert get_faq_index().best(query).entry.answer == "Check-out is at 12:00 PM."
+
+
+def test_check_in_question_does_not_get_the_checkout_answer():
+    assert get_faq_index().best("What time is check-in?").entry.answer != "Check-out is at 12:00 PM."
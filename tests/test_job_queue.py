@@ -0,0 +1,48 @@
+"""Fast-ack jobs can be collected by any worker process sharing the session database."""
+
+import threading
+
+import pytest
+
+from utils.job_queue import DONE, FAILED, PENDING, JobQueue, SQLiteJobResults
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "voice_sessions.db")
+
+
+def test_poll_on_another_worker_gets_the_result(db_path):
+    release = threading.Event()
+    worker_a = JobQueue(max_workers=1, shared=SQLiteJobResults(db_path))
+    worker_b = JobQueue(max_workers=1, shared=SQLiteJobResults(db_path))
+
+    job = worker_a.submit(lambda: release.wait(5) and ["Our spa opens at 9."], context={"call_id": "CA1"})
+    remote = worker_b.get(job.job_id)
+    assert remote is not None and remote.context == {"call_id": "CA1"}
+    assert worker_b.wait(remote, 0.1) == PENDING
+
+    release.set()
+    assert worker_b.wait(remote, 5) == DONE
+    assert remote.future.result() == ["Our spa opens at 9."]
+
+    worker_b.pop(job.job_id)
+    assert worker_b.get(job.job_id) is None
+
+
+def test_failure_is_shared(db_path):
+    worker_a = JobQueue(max_workers=1, shared=SQLiteJobResults(db_path))
+    worker_b = JobQueue(max_workers=1, shared=SQLiteJobResults(db_path))
+
+    def boom():
+        raise ValueError("agent crashed")
+
+    job = worker_a.submit(boom)
+    job.future.exception()
+    remote = worker_b.get(job.job_id)
+    assert worker_b.wait(remote, 5) == FAILED
+
+
+def test_memory_queue_only_knows_its_own_jobs():
+    job = JobQueue(max_workers=1).submit(lambda: "hi")
+    assert JobQueue(max_workers=1).get(job.job_id) is None
@@ -0,0 +1,65 @@
+"""Local guide index: parsing, distance order and "open now" filtering."""
+
+from datetime import datetime
+
+import pytest
+
+from agents.local_guide_agent import LocalGuideIndex, local_guide_response, parse_opening_hours
+
+ENTRIES = [
+    {"place_name": "City Museum", "category": "Museum", "distance_from_hotel": "1.2 km",
+     "opening_hours": "9:00 AM - 5:00 PM", "description": "Regional history."},
+    {"place_name": "Art Gallery", "category": "Gallery", "distance_from_hotel": "800 m",
+     "opening_hours": "10:00 AM - 6:00 PM", "description": "Modern art."},
+    {"place_name": "Night Market", "category": "Market", "distance_from_hotel": "0.5 miles",
+     "opening_hours": "6:00 PM - 1:00 AM", "description": "Street food and crafts."},
+    {"place_name": "Riverside Park", "category": "Park", "distance_from_hotel": "300 m",
+     "opening_hours": "24 hours", "description": "Walking paths."},
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return LocalGuideIndex.from_entries(ENTRIES)
+
+
+def _names(places):
+    return [place.name for place in places]
+
+
+def test_places_are_sorted_by_distance(index):
+    assert _names(index.places) == ["Riverside Park", "Art Gallery", "Night Market", "City Museum"]
+
+
+def test_hours_past_midnight_are_split():
+    assert parse_opening_hours("6:00 PM - 1:00 AM") == ((0, 60), (18 * 60, 24 * 60))
+    assert parse_opening_hours("Closed") == ()
+
+
+@pytest.mark.parametrize("hour, open_places", [
+    (8, ["Riverside Park"]),
+    (9, ["Riverside Park", "City Museum"]),
+    (11, ["Riverside Park", "Art Gallery", "City Museum"]),
+    (17, ["Riverside Park", "Art Gallery"]),
+    (0, ["Riverside Park", "Night Market"]),
+])
+def test_open_at_keeps_only_open_places(index, hour, open_places):
+    assert _names(index.nearest(open_at=datetime(2026, 5, 1, hour, 30), limit=10)) == open_places
+
+
+def test_category_filter_uses_aliases(index):
+    assert _names(index.nearest(index.category_for("any museums around?"))) == ["Art Gallery", "City Museum"]
+
+
+def test_open_now_question_filters_by_the_current_time(index, monkeypatch):
+    from agents import local_guide_agent
+
+    monkeypatch.setattr(local_guide_agent, "get_local_guide_index", lambda: index)
+
+    evening = local_guide_response("Which museums are open now?", now=datetime(2026, 5, 1, 19, 0))
+    morning = local_guide_response("Which museums are open now?", now=datetime(2026, 5, 1, 11, 0))
+
+    assert "none of the nearby culture spots are open" in evening
+    assert "Art Gallery" in morning and "City Museum" in morning
+    # An hours question lists places regardless of the time.
+    assert "City Museum" in local_guide_response("When is the museum open?", now=datetime(2026, 5, 1, 19, 0))
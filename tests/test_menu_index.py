@@ -0,0 +1,46 @@
+"""Dietary answers must not present inferred tags as verified allergen data."""
+
+import pytest
+
+from agents.menu_index import MenuIndex, dietary_caveat
+
+MENUS = {
+    "lunch": [
+        {"name": "Garden Salad", "description": "Mixed greens, tomato and cucumber", "price": 11},
+        {"name": "Quinoa Bowl", "description": "Quinoa, roasted vegetables", "price": 14,
+         "dietary_tags": ["vegan", "gluten-free"]},
+        {"name": "Club Sandwich", "description": "Turkey, bacon and cheese on toast", "price": 15},
+    ],
+}
+
+
+@pytest.fixture(scope="module")
+def index():
+    return MenuIndex.from_sources(menus=MENUS, csv_path="does/not/exist.csv")
+
+
+def test_inferred_tags_are_unverified(index):
+    items = {item.name: item for item in index.items}
+    assert "gluten_free" in items["Garden Salad"].tags
+    assert not items["Garden Salad"].tags_verified
+    assert items["Quinoa Bowl"].tags_verified
+    assert items["Quinoa Bowl"].tags == ("vegan", "gluten_free")
+
+
+def test_inferred_dietary_answer_carries_caveat(index):
+    query, items = index.search("Any gluten free lunch dishes?")
+    assert "Garden Salad" in [item.name for item in items]
+    assert "allergen" in dietary_caveat(query, items)
+
+
+def test_explicit_tags_need_no_caveat(index):
+    query, items = index.search("Any gluten free lunch dishes?")
+    verified = [item for item in items if item.tags_verified]
+    assert [item.name for item in verified] == ["Quinoa Bowl"]
+    assert dietary_caveat(query, verified) == ""
+
+
+def test_non_dietary_question_has_no_caveat(index):
+    query, items = index.search("What is on the lunch menu?")
+    assert items
+    assert dietary_caveat(query, items) == ""
@@ -0,0 +1,68 @@
+"""Policy lookups must not misroute key cards or complaints."""
+
+import pytest
+
+from agents.policy_index import PolicyIndex, is_complaint
+
+POLICIES = {
+    "check_in_time": "3:00 PM",
+    "check_out_time": "12:00 PM",
+    "cancellation_policy": "Free cancellation up to 24 hours before arrival.",
+    "pet_policy": "Pets under 10kg allowed with $50 cleaning fee.",
+    "smoking_policy": "All rooms are non-smoking.",
+    "payment_methods": "Visa, Mastercard, American Express, cash.",
+}
+
+
+@pytest.fixture(scope="module")
+def index():
+    return PolicyIndex.from_sources(policies=POLICIES, csv_path="does/not/exist.csv")
+
+
+def test_key_card_problem_is_not_a_payment_question(index):
+    match = index.lookup("my key card does not open my door")
+
+    assert not match.confident
+    assert "payment_methods" not in [entry.key for entry in match.entries]
+    assert match.complaint
+
+
+def test_refund_with_broken_ac_is_a_complaint(index):
+    match = index.lookup("I want a refund, the AC broke")
+
+    assert match.complaint
+    assert not match.confident
+
+
+@pytest.mark.parametrize("query", [
+    "The shower is not working", "the TV doesn't work", "The safe won't open", "this is unacceptable",
+])
+def test_complaint_cues(query):
+    assert is_complaint(query)
+
+
+@pytest.mark.parametrize("query, key", [
+    ("Do you accept credit cards?", "payment_methods"),
+    ("Can I pay with cash?", "payment_methods"),
+    ("Can I bring my dog?", "pet_policy"),
+    ("What is your cancellation policy?", "cancellation_policy"),
+    ("Can I get a late checkout?", "check_out_time"),
+])
+def test_policy_questions_are_answered_directly(index, query, key):
+    match = index.lookup(query)
+
+    assert match.confident and not match.complaint
+    assert match.entries[0].key == key
+
+
+@pytest.mark.parametrize("query", [
+    "Do I have to pay for parking?", "Can I get cash back?", "Is there a cat on site?",
+])
+def test_ambiguous_word_alone_is_not_answered_directly(index, query):
+    match = index.lookup(query)
+
+    assert match.entries and not match.confident
+
+
+def test_working_hours_question_is_not_a_complaint():
+    assert not is_complaint("Is the gym working tomorrow morning?")
@@ -0,0 +1,77 @@
+"""Lazy agent registry: one import per agent, even under concurrent first use."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from agents import registry
+from agents.registry import AgentRegistry
+from utils import usage
+
+
+@pytest.fixture
+def imports(monkeypatch):
+    """Record every module the registry imports, slowly enough for callers to overlap."""
+
+    seen = []
+    real_import = registry.importlib.import_module
+
+    def slow_import(name):
+        seen.append(name)
+        time.sleep(0.05)
+        return real_import(name)
+
+    monkeypatch.setattr(registry.importlib, "import_module", slow_import)
+    return seen
+
+
+def test_nothing_is_imported_until_first_use(imports):
+    agents = AgentRegistry({"echo": "json:dumps"})
+
+    assert "echo" in agents and not agents.is_loaded("echo")
+    assert imports == []
+
+
+def test_concurrent_first_use_builds_the_handler_once(imports):
+    agents = AgentRegistry({"echo": "json:dumps"})
+    start = threading.Barrier(8)
+
+    def get(_):
+        start.wait()
+        return agents.get("echo")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        handlers = list(pool.map(get, range(8)))
+
+    assert imports == ["json"]
+    assert all(handler is handlers[0] for handler in handlers)
+    assert handlers[0]([1]) == "[1]"
+
+
+def test_handlers_attribute_usage_to_their_agent():
+    seen = []
+    handler = registry._instrumented("probe", lambda: seen.append(usage._agent.get()))
+
+    handler()
+
+    assert seen == ["probe"]
+    assert usage._agent.get() is None
+
+
+def test_register_replaces_a_loaded_handler():
+    agents = AgentRegistry({"echo": "json:dumps"})
+    agents.get("echo")
+    agents.register("echo", "json:loads")
+
+    assert not agents.is_loaded("echo")
+    assert agents.get("echo")("[2]") == [2]
+
+
+def test_warm_reports_missing_dependencies():
+    agents = AgentRegistry({"ok": "json:dumps", "missing": "no_such_module_for_tests:run"})
+
+    timings = agents.warm()
+
+    assert timings["missing"] == -1.0 and timings["ok"] >= 0.0
@@ -0,0 +1,110 @@
+"""Mining logged guest queries and pre-warming the response cache."""
+
+import json
+
+import pytest
+
+from agents import router_agent
+from utils import response_cache
+from utils.response_cache import QueryCluster, ResponseCache, mine_queries, precompute
+
+
+def _turns(*pairs):
+    return [{"type": "turn", "entry": "route_query", "text": text}
+            for text, count in pairs for _ in range(count)]
+
+
+@pytest.fixture
+def offline_router(monkeypatch):
+    """Classify by keyword and answer with a fixed string, without any model call."""
+
+    monkeypatch.setattr(router_agent, "classify_query",
+                        lambda text, deadline: [(router_agent.predict_category(text) or "faq", text)])
+    answered = []
+
+    def answer(entry, text):
+        answered.append(text)
+        return f"answer to {text}"
+
+    monkeypatch.setattr(response_cache, "_answer", answer)
+    return answered
+
+
+def _cluster(text, count=5):
+    cluster = mine_queries(_turns((text, count)), min_count=1)[0]
+    assert isinstance(cluster, QueryCluster)
+    return cluster
+
+
+@pytest.mark.parametrize("query", [
+    "When is the next shuttle to the airport?",
+    "Which museums are open right now?",
+    "Are there any museums nearby?",
+    "I'd like to book a room for two nights",
+    "Is the pool open tonight?",
+    "I want a refund, the AC broke",
+])
+def test_time_dependent_and_stateful_questions_are_not_cached(offline_router, query):
+    assert precompute([_cluster(query)]) == []
+    assert offline_router == []
+
+
+def test_static_questions_are_cached(offline_router):
+    entries = precompute([_cluster("Do you have vegan dishes?"), _cluster("Is breakfast included?")])
+
+    assert [entry["answer"] for entry in entries] == ["answer to Do you have vegan dishes?",
+                                                       "answer to Is breakfast included?"]
+
+
+def test_time_sensitive_phrasings_are_dropped_from_a_cached_cluster(offline_router):
+    cluster = mine_queries(_turns(("Is breakfast included?", 5), ("Is breakfast included today?", 2)),
+                           min_count=1, similarity=0.5)[0]
+    assert len(cluster.phrasings) == 2
+
+    [entry] = precompute([cluster])
+
+    assert entry["phrasings"] == {"is breakfast included": 5}
+
+
+def test_error_replies_are_not_cached(offline_router, monkeypatch):
+    monkeypatch.setattr(response_cache, "_answer", lambda entry, text: "⚠️ Sorry, something failed")
+
+    assert precompute([_cluster("Is breakfast included?")]) == []
+
+
+def test_lookup_matches_normalized_phrasings_of_the_current_knowledge(tmp_path, monkeypatch):
+    path = tmp_path / "cache.json"
+    path.write_text(json.dumps({
+        "knowledge_version": "v1",
+        "entries": [{"entry": "route_query", "phrasings": {"is breakfast included": 3}, "answer": "Yes."}],
+    }))
+    monkeypatch.setattr(response_cache, "knowledge_version", lambda: "v1")
+    cache = ResponseCache(str(path))
+
+    assert cache.lookup("route_query", "Is BREAKFAST included??") == "Yes."
+    assert cache.lookup("voice_call", "Is breakfast included?") is None
+
+    monkeypatch.setattr(response_cache, "knowledge_version", lambda: "v2")
+    assert cache.lookup("route_query", "Is breakfast included?") is None
+
+
+def test_build_mines_a_call_log_and_serves_the_answers(fake_openai, tmp_path):
+    log = tmp_path / "model_calls.jsonl"
+    turns = _turns(("Do you have vegan dishes?", 3), ("Is breakfast included?", 4),
+                   ("Do you offer an airport shuttle?", 3), ("Can I bring my bicycle?", 1))
+    log.write_text("".join(json.dumps({"t": 0.0, "session": None, **turn}) + "\n" for turn in turns))
+    out = tmp_path / "response_cache.json"
+
+    summary = response_cache.build(str(log), str(out), min_count=3)
+
+    assert summary["clusters"] == 3
+    assert summary["cached"] == 2
+    assert summary["turns_covered"] == 7
+    assert fake_openai.requests["/v1/chat/completions"] > 0
+    queries = [entry["query"] for entry in json.loads(out.read_text())["entries"]]
+    assert queries == ["Is breakfast included?", "Do you have vegan dishes?"]
+
+    cache = ResponseCache(str(out))
+    assert cache.lookup("route_query", "is breakfast included??")
+    assert cache.lookup("route_query", "Do you offer an airport shuttle?") is None
+    assert cache.lookup("route_query", "Can I bring my bicycle?") is None
@@ -0,0 +1,47 @@
+"""Daily review counters: append/query round trips and rolling windows."""
+
+import pytest
+
+from utils.review_analytics import ReviewAnalyticsStore
+
+
+def _scorer(cleaned):
+    return ["Positive" if "great" in text.split() else "Negative" for text in cleaned]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ReviewAnalyticsStore(tmp_path / "analytics")
+    # Day 1 and 2 fully positive, day 3 and 4 fully negative.
+    store.append(["2026-01-01", "2026-01-02", "2026-01-03", "2026-01-04"],
+                 ["Great breakfast", "Great spa massage", "Rude staff at the desk", "Dirty room"],
+                 scorer=_scorer)
+    store.save()
+    return ReviewAnalyticsStore(tmp_path / "analytics")
+
+
+def test_append_and_reload_round_trip(store):
+    summary = store.summary("2026-01-01", "2026-01-31")
+
+    assert summary["all"] == {"reviews": 4, "positive": 2, "positive_share": 0.5}
+    assert summary["food"]["reviews"] == 1 and summary["food"]["positive"] == 1
+    assert summary["staff"] == {"reviews": 1, "positive": 0, "positive_share": 0.0}
+    assert [row["reviews"] for row in store.daily("2026-01-02", "2026-01-03")] == [1, 1]
+
+
+def test_scorer_receives_cleaned_text(tmp_path):
+    seen = []
+    store = ReviewAnalyticsStore(tmp_path / "analytics")
+    store.append(["2026-01-01"], ["The Rooms were GREAT!"], scorer=lambda cleaned: seen.extend(cleaned) or ["Positive"])
+
+    assert seen == ["room great"]
+
+
+def test_rolling_window_reaches_before_the_queried_start(store):
+    mid = store.daily("2026-01-03", "2026-01-04", window=3)
+    full = store.daily("2026-01-01", "2026-01-04", window=3)
+
+    assert [row["date"] for row in mid] == ["2026-01-03", "2026-01-04"]
+    # 2026-01-03 covers Jan 1-3 (2 of 3 positive), not just Jan 3.
+    assert [row["rolling_positive_share"] for row in mid] == [0.6667, 0.3333]
+    assert mid == full[2:]
@@ -0,0 +1,70 @@
+"""Compound-question splitting and the fan-out deadline in the router."""
+
+import time
+
+import pytest
+
+from agents import router_agent
+from agents.router_agent import split_compound_query
+from benchmarks.fake_openai_server import LatencyModel
+
+
+@pytest.mark.parametrize("query", [
+    "Is breakfast included and what time does it start?",
+    "Can I book a room for me and my two kids for three nights?",
+    "Do you have a spa and gym?",
+    "I'd like a massage and what time is check-out?",
+    "What time is check-out",
+])
+def test_keeps_dependent_clauses_together(query):
+    assert split_compound_query(query) == [query]
+
+
+@pytest.mark.parametrize("query, clauses", [
+    ("What time is check-out? Do you have a spa?", ["What time is check-out?", "Do you have a spa?"]),
+    ("Is there parking and do you allow pets?", ["Is there parking", "do you allow pets?"]),
+    ("What time is check-out, and also can I get a late check-out?",
+     ["What time is check-out", "can I get a late check-out?"]),
+])
+def test_splits_independent_questions(query, clauses):
+    assert split_compound_query(query) == clauses
+
+
+def test_dependent_tail_joins_previous_question():
+    query = "Do you allow pets and is there parking and how much does it cost?"
+    assert split_compound_query(query) == ["Do you allow pets", "is there parking and how much does it cost?"]
+
+
+def test_fanout_deadline_gives_a_holding_reply_for_slow_parts(fake_openai):
+    fake_openai.latencies["llm"] = LatencyModel.parse("1500")
+    parts = [("general_question", "Is breakfast included?"),
+             ("general_question", "What can you tell me about the history of the hotel district?")]
+
+    started = time.monotonic()
+    answers = router_agent.dispatch_concurrently(parts, started + 0.3)
+
+    assert time.monotonic() - started < 1.0
+    assert "breakfast" in answers[0].lower()
+    assert answers[1] == router_agent._deadline_reply(parts[1][1])
+
+
+def test_fanout_deadline_answers_late_classifications_as_general_questions(fake_openai):
+    fake_openai.latencies["llm"] = LatencyModel.parse("1500")
+
+    started = time.monotonic()
+    parts = router_agent.classify_query("Do you have a sauna? Is there an airport shuttle?", started + 0.3)
+
+    assert time.monotonic() - started < 1.0
+    assert [router_agent.category_intent(category) for category, _ in parts] == ["general_question"]
+
+
+def test_fanout_classifies_clauses_in_parallel(fake_openai):
+    fake_openai.latencies["llm"] = LatencyModel.parse("300")
+
+    started = time.monotonic()
+    parts = router_agent.classify_query("Do you have a massage room? Is there a shuttle to the airport?",
+                                        started + 5)
+
+    assert time.monotonic() - started < 0.55
+    assert [router_agent.category_intent(category) for category, _ in parts] == ["spa_request",
+                                                                                  "shuttle_request"]
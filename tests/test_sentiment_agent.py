@@ -0,0 +1,44 @@
+"""The sentiment model is published only once its vectorizer is in place."""
+
+import threading
+
+import pytest
+
+from agents import sentiment_agent
+
+
+@pytest.fixture
+def unloaded(monkeypatch):
+    monkeypatch.setattr(sentiment_agent, "_model", None)
+    monkeypatch.setattr(sentiment_agent, "_vectorizer", None)
+    monkeypatch.setattr(sentiment_agent, "require_wordnet", lambda: None)
+
+
+def test_concurrent_warm_never_sees_a_model_without_vectorizer(unloaded, monkeypatch):
+    loads = []
+
+    def load():
+        loads.append(1)
+        return "model", "vectorizer"
+
+    monkeypatch.setattr(sentiment_agent, "load_model_and_vectorizer", load)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(sentiment_agent.warm())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert loads == [1]
+    assert set(results) == {("model", "vectorizer")}
+
+
+def test_failed_load_leaves_nothing_published(unloaded, monkeypatch):
+    def load():
+        raise OSError("model file missing")
+
+    monkeypatch.setattr(sentiment_agent, "load_model_and_vectorizer", load)
+
+    with pytest.raises(OSError):
+        sentiment_agent.warm()
+    assert sentiment_agent._model is None and sentiment_agent._vectorizer is None
@@ -0,0 +1,83 @@
+"""Call session stores: abstract interface and accurate SQLite counters."""
+
+import threading
+
+import pytest
+
+from hotel_voice_integration.session_store import MemorySessionStore, SessionStore, SQLiteSessionStore
+
+
+@pytest.fixture
+def sqlite_store(tmp_path):
+    return SQLiteSessionStore(str(tmp_path / "sessions.db"))
+
+
+def test_interface_cannot_be_instantiated():
+    with pytest.raises(TypeError):
+        SessionStore()
+
+
+def test_repeated_gets_of_an_unsaved_session_count_once(sqlite_store):
+    for _ in range(3):
+        session = sqlite_store.get("CA1")
+    assert sqlite_store.stats()["created"] == 0
+
+    session.turns += 1
+    sqlite_store.save(session)
+    sqlite_store.save(sqlite_store.get("CA1"))
+
+    assert sqlite_store.stats() == {"live": 1, "created": 1, "ended": 0, "expired": 0, "evicted_lru": 0}
+    assert sqlite_store.get("CA1").turns == 1
+
+
+def test_expired_session_is_replaced(tmp_path):
+    store = SQLiteSessionStore(str(tmp_path / "sessions.db"), ttl=0)
+    store.save(store.get("CA1"))
+    store.save(store.get("CA1"))
+
+    stats = store.stats()
+    assert stats["created"] == 2
+    assert stats["expired"] == 1
+
+
+def test_concurrent_saves_count_every_write(sqlite_store):
+    purges = []
+    sqlite_store.purge_every = 10
+    sqlite_store.purge = lambda: purges.append(1) or 0
+
+    def call(n):
+        for _ in range(50):
+            sqlite_store.save(sqlite_store.get(f"CA{n}"))
+
+    threads = [threading.Thread(target=call, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sqlite_store._writes == 200
+    assert len(purges) == 20
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemorySessionStore()
+    return SQLiteSessionStore(str(tmp_path / "sessions.db"))
+
+
+def test_backends_count_sessions_alike(store):
+    store.get("CA1")
+    store.get("CA1")
+    assert store.stats() == {"live": 0, "created": 0, "ended": 0, "expired": 0, "evicted_lru": 0}
+
+    session = store.get("CA1")
+    session.turns += 1
+    store.save(session)
+    store.save(store.get("CA1"))
+    store.save(store.get("CA2"))
+    store.end("CA2")
+    store.end("CA3")
+
+    assert store.stats() == {"live": 1, "created": 2, "ended": 1, "expired": 0, "evicted_lru": 0}
+    assert store.get("CA1").turns == 1
@@ -0,0 +1,81 @@
+"""Identical concurrent calls share one computation, and nothing is cached afterwards."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from agents import router_agent
+from benchmarks.fake_openai_server import LatencyModel
+from utils.single_flight import SingleFlight
+
+
+def _slow(calls, result="answer", delay=0.2):
+    def fn():
+        calls.append(threading.current_thread().name)
+        time.sleep(delay)
+        return result
+    return fn
+
+
+def test_concurrent_callers_share_one_run():
+    flight, calls = SingleFlight(), []
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: flight.do("key", _slow(calls)), range(8)))
+
+    assert results == ["answer"] * 8
+    assert len(calls) == 1
+    assert flight.stats() == {"leaders": 1, "followers": 7, "in_flight": 0}
+
+
+def test_exception_is_shared_and_not_remembered():
+    flight = SingleFlight()
+
+    def boom():
+        time.sleep(0.1)
+        raise ValueError("provider error")
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(flight.do, "key", boom) for _ in range(4)]
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result()
+
+    assert flight.do("key", lambda: "fresh") == "fresh"
+
+
+def test_async_caller_joins_a_threaded_call():
+    flight, calls = SingleFlight(), []
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        threaded = loop.run_in_executor(None, flight.do, "key", _slow(calls))
+        await asyncio.sleep(0.05)
+        return await asyncio.gather(threaded, flight.do_async("key", _slow(calls, "other")))
+
+    assert asyncio.run(main()) == ["answer", "answer"]
+    assert len(calls) == 1
+
+
+def test_disabled_runs_every_call():
+    flight, calls = SingleFlight(enabled=False), []
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda _: flight.do("key", _slow(calls, delay=0.05)), range(4)))
+
+    assert len(calls) == 4
+
+
+def test_identical_guest_questions_make_one_model_call(fake_openai):
+    fake_openai.latencies["llm"] = LatencyModel.parse("300")
+    question = "What can you tell me about the history of this building?"
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        answers = list(pool.map(lambda _: router_agent.route_to_agent("general_question", question), range(6)))
+        distinct = list(pool.map(lambda n: router_agent.route_to_agent("general_question", f"{question} {n}"),
+                                 range(2)))
+
+    assert len(set(answers)) == 1 and answers[0]
+    assert len(distinct) == 2
+    assert fake_openai.requests["/v1/chat/completions"] == 3
@@ -0,0 +1,68 @@
+"""Speculative routing: retrieval, classification and a prefetched agent overlap."""
+
+import time
+
+import pytest
+
+from agents import router_agent
+from benchmarks.fake_openai_server import LatencyModel
+
+LATENCY = 0.3
+
+
+@pytest.fixture
+def called_agents(fake_openai, monkeypatch):
+    # One cold run first: thread pools, connections and agent data load on first use.
+    # The guess must agree with the classifier, or the discarded agent call can
+    # still land after the counts are cleared.
+    router_agent.route_query_speculative("Is the sauna open late?", lambda query: None)
+    fake_openai.requests.clear()
+    fake_openai.latencies["llm"] = LatencyModel.parse(str(int(LATENCY * 1000)))
+    called = []
+    agent = router_agent._agent
+
+    def spy(name):
+        called.append(name)
+        return agent(name)
+
+    monkeypatch.setattr(router_agent, "_agent", spy)
+    return called
+
+
+def _requests(server):
+    return server.requests.get("/v1/chat/completions", 0)
+
+
+def test_prefetched_agent_is_used_when_the_classifier_agrees(fake_openai, called_agents):
+    started = time.monotonic()
+    answer = router_agent.route_query_speculative("Do you have a sauna?", lambda query: None)
+
+    # Classification and the agent ran side by side, not one after the other.
+    assert time.monotonic() - started < 1.6 * LATENCY
+    assert answer
+    assert called_agents == ["spa"]
+    assert _requests(fake_openai) == 2
+
+
+def test_misprediction_runs_the_classified_agent(fake_openai, called_agents):
+    router_agent.route_query_speculative("Can I eat at the spa?", lambda query: None)
+
+    assert router_agent.predict_category("Can I eat at the spa?") == "spa"
+    assert called_agents == ["spa", "restaurant"]
+    assert _requests(fake_openai) == 3
+
+
+def test_retrieval_hit_wins_without_waiting_for_the_model(fake_openai, called_agents):
+    started = time.monotonic()
+    answer = router_agent.route_query_speculative("Do you have a steam room?", lambda query: "From our guide.")
+
+    assert answer == "From our guide."
+    assert time.monotonic() - started < LATENCY
+
+
+def test_booking_is_never_prefetched(fake_openai, called_agents, monkeypatch):
+    monkeypatch.setattr(router_agent, "predict_category", lambda query: "booking")
+    monkeypatch.setattr(router_agent, "dispatch_query", lambda query, categorized, deadline: "dispatched")
+
+    assert router_agent.route_query_speculative("Book me a room for two nights", lambda query: None) == "dispatched"
+    assert called_agents == []
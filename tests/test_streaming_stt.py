@@ -0,0 +1,80 @@
+"""Segmentation of synthetic WAVs by the streaming transcriber's VAD."""
+
+import wave
+
+import numpy as np
+import pytest
+
+from hotel_voice_integration.streaming_stt import transcribe_wav_streaming
+
+RATE = 16000
+
+
+def _speech(seconds: float, rng: np.random.Generator) -> np.ndarray:
+    return rng.normal(0, 3000, int(RATE * seconds))
+
+
+def _silence(seconds: float, rng: np.random.Generator) -> np.ndarray:
+    return rng.normal(0, 5, int(RATE * seconds))
+
+
+def _write_wav(path, *parts: np.ndarray) -> str:
+    samples = np.clip(np.concatenate(parts), -32768, 32767).astype("<i2")
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        wav.writeframes(samples.tobytes())
+    return str(path)
+
+
+class _SegmentNamer:
+    """Fake STT: names segments seg0, seg1, ... and remembers their lengths."""
+
+    def __init__(self):
+        self.durations = []
+
+    def __call__(self, stream) -> str:
+        with wave.open(stream, "rb") as wav:
+            self.durations.append(wav.getnframes() / wav.getframerate())
+        return f"seg{len(self.durations) - 1}"
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(7)
+
+
+def test_audio_that_opens_with_speech_keeps_the_first_utterance(tmp_path, rng):
+    path = _write_wav(tmp_path / "speech_first.wav", _speech(2, rng), _silence(1, rng), _speech(1, rng),
+                      _silence(1, rng))
+    stt = _SegmentNamer()
+
+    assert transcribe_wav_streaming(path, transcribe=stt, max_workers=1) == "seg0 seg1"
+    assert stt.durations[0] == pytest.approx(2.45, abs=0.2)
+
+
+def test_continuous_utterance_is_one_segment(tmp_path, rng):
+    path = _write_wav(tmp_path / "no_pause.wav", _speech(3, rng))
+    stt = _SegmentNamer()
+
+    assert transcribe_wav_streaming(path, transcribe=stt, max_workers=1) == "seg0"
+    assert stt.durations == [pytest.approx(3.0, abs=0.05)]
+
+
+def test_speech_after_leading_silence(tmp_path, rng):
+    path = _write_wav(tmp_path / "pause_first.wav", _silence(1, rng), _speech(1, rng), _silence(1, rng))
+
+    assert transcribe_wav_streaming(path, transcribe=_SegmentNamer(), max_workers=1) == "seg0"
+
+
+def test_no_segment_falls_back_to_whole_file(tmp_path, rng):
+    path = _write_wav(tmp_path / "silent.wav", _silence(2, rng))
+    seen = []
+
+    def whole_file(stream) -> str:
+        seen.append(stream.read())
+        return "whole file"
+
+    assert transcribe_wav_streaming(path, transcribe=whole_file, max_workers=1) == "whole file"
+    assert seen and seen[0][:4] == b"RIFF"
@@ -0,0 +1,39 @@
+"""The suffix-rule lemmatizer fallback is loud, and refused on the sentiment path."""
+
+import sys
+
+import pytest
+
+from agents import sentiment_agent
+from utils import text_normalization
+from utils.text_normalization import WordNetUnavailable, require_wordnet
+
+
+@pytest.fixture
+def no_wordnet(monkeypatch):
+    monkeypatch.setitem(sys.modules, "nltk.stem", None)
+    monkeypatch.setattr(text_normalization, "_lemmatizer", None)
+    monkeypatch.setattr(text_normalization, "_fallback_reason", None)
+
+
+def test_fallback_warns(no_wordnet):
+    with pytest.warns(RuntimeWarning, match="suffix rules"):
+        lemmatize = text_normalization.get_lemmatizer()
+
+    assert lemmatize("houses") == "hous"
+
+
+def test_fallback_is_refused_for_sentiment(no_wordnet, monkeypatch):
+    monkeypatch.setattr(sentiment_agent, "_model", None)
+    monkeypatch.setattr(sentiment_agent, "load_model_and_vectorizer",
+                        lambda: pytest.fail("model loaded with fallback lemmas"))
+
+    with pytest.warns(RuntimeWarning), pytest.raises(WordNetUnavailable):
+        sentiment_agent.warm()
+
+
+def test_fallback_can_be_allowed(no_wordnet, monkeypatch):
+    monkeypatch.setattr(text_normalization, "ALLOW_FALLBACK_LEMMATIZER", True)
+
+    with pytest.warns(RuntimeWarning):
+        require_wordnet()
@@ -0,0 +1,79 @@
+"""Stage tracing: histogram labels, status, exposition format and the disabled path."""
+
+import pytest
+
+from utils import tracing
+from utils.tracing import METRIC_NAME, REGISTRY, Histogram, render_metrics, span, traced
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(tracing, "_enabled", True)
+    REGISTRY.reset()
+    yield
+    REGISTRY.reset()
+
+
+def _labels():
+    return [dict(key) for key in REGISTRY.snapshot()]
+
+
+def test_spans_are_labelled_by_stage_extra_labels_and_status(enabled):
+    with span("llm", model="gpt-4o-mini"):
+        pass
+    with pytest.raises(ValueError):
+        with span("llm", model="gpt-4o-mini"):
+            raise ValueError("provider error")
+
+    assert sorted(_labels(), key=lambda labels: labels["status"]) == [
+        {"stage": "llm", "model": "gpt-4o-mini", "status": "error"},
+        {"stage": "llm", "model": "gpt-4o-mini", "status": "ok"},
+    ]
+
+
+def test_traced_defaults_the_stage_to_the_function_name(enabled):
+    @traced()
+    def classify():
+        return "spa"
+
+    @traced("agent", agent="faq")
+    def answer():
+        return "yes"
+
+    assert classify() == "spa" and answer() == "yes"
+    assert {labels["stage"] for labels in _labels()} == {"classify", "agent"}
+    assert {"stage": "agent", "agent": "faq", "status": "ok"} in _labels()
+
+
+def test_render_uses_prometheus_histogram_format(enabled):
+    REGISTRY.observe(0.02, {"stage": "tts", "voice": 'say "hi"'})
+    REGISTRY.observe(0.7, {"stage": "tts", "voice": 'say "hi"'})
+
+    text = render_metrics()
+
+    labels = 'stage="tts",voice="say \\"hi\\""'
+    assert f"# TYPE {METRIC_NAME} histogram" in text
+    assert f'{METRIC_NAME}_bucket{{{labels},le="0.025"}} 1' in text
+    assert f'{METRIC_NAME}_bucket{{{labels},le="1"}} 2' in text
+    assert f'{METRIC_NAME}_bucket{{{labels},le="+Inf"}} 2' in text
+    assert f"{METRIC_NAME}_count{{{labels}}} 2" in text
+
+
+def test_histogram_quantile_is_a_bucket_bound():
+    histogram = Histogram((0.1, 0.5, 1.0))
+    for seconds in (0.05, 0.2, 0.3, 2.0):
+        histogram.observe(seconds)
+
+    assert histogram.quantile(0.5) == 0.5
+    assert histogram.quantile(1.0) == float("inf")
+
+
+def test_disabled_tracing_records_nothing(monkeypatch):
+    monkeypatch.setattr(tracing, "_enabled", False)
+    REGISTRY.reset()
+
+    with span("llm"):
+        pass
+    traced()(lambda: None)()
+
+    assert REGISTRY.snapshot() == {}
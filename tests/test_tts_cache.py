@@ -0,0 +1,61 @@
+"""TTS audio cache: content addressing, byte-budget LRU and the eviction grace period."""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from hotel_voice_integration.tts_cache import TTSCache, cache_key
+
+
+def _age(path, seconds):
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+
+
+def test_same_rendering_reuses_one_content_hash(tmp_path):
+    cache = TTSCache(str(tmp_path))
+    calls = []
+    gate = threading.Event()
+
+    def synthesize(text):
+        calls.append(text)
+        gate.wait(1)
+        return b"ID3" + text.encode()
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(cache.get_or_synthesize, "One moment, please.", "alloy", "tts-1", synthesize)
+                   for _ in range(4)]
+        time.sleep(0.05)
+        gate.set()
+        paths = {future.result() for future in futures}
+
+    assert calls == ["One moment, please."]
+    assert paths == {cache.path_for(cache_key("One moment, please.", "alloy", "tts-1"))}
+    assert cache_key("One moment, please.", "nova", "tts-1") != cache_key("One moment, please.", "alloy", "tts-1")
+
+
+def test_least_recently_used_files_go_first_when_over_budget(tmp_path):
+    cache = TTSCache(str(tmp_path), max_bytes=250, grace_seconds=0)
+    first, second = cache.put("a" * 64, bytes(100)), cache.put("b" * 64, bytes(100))
+    _age(first, 20)
+    _age(second, 10)
+    cache.get("a" * 64)  # read: now the most recently used
+
+    cache.put("c" * 64, bytes(100))
+
+    assert sorted(path.name[0] for path in tmp_path.glob("*.mp3")) == ["a", "c"]
+    assert sum(path.stat().st_size for path in tmp_path.glob("*.mp3")) <= 250
+
+
+def test_recently_issued_audio_survives_eviction(tmp_path):
+    cache = TTSCache(str(tmp_path), max_bytes=150, grace_seconds=60)
+    stale = cache.put("a" * 64, bytes(100))
+    _age(stale, 120)
+    issued = cache.put("b" * 64, bytes(100))
+
+    cache.put("c" * 64, bytes(100))
+
+    assert not stale.exists()
+    # Over budget, but a <Play> URL for this file may still be fetched.
+    assert issued.exists()
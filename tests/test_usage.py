@@ -0,0 +1,28 @@
+"""Usage labels stay bounded: normalized intents and LRU session eviction."""
+
+import time
+
+from agents import router_agent
+from utils import usage
+from utils.usage import UsageLedger, attribute
+
+
+def test_sessions_are_evicted_least_recently_used_first():
+    ledger = UsageLedger(max_sessions=2)
+    for session in ("a", "b", "a", "c"):
+        with attribute(session=session):
+            ledger.record("gpt-4o-mini", 10, 5)
+
+    assert set(ledger.summary("session")) == {"a", "c"}
+    assert ledger.summary("session")["a"]["calls"] == 2
+
+
+def test_route_attributes_the_dispatch_intent_not_the_raw_label(monkeypatch):
+    seen = []
+    monkeypatch.setattr(router_agent, "_agent", lambda name: lambda query: seen.append(usage._intent.get()) or "ok")
+
+    query = "Can I get a massage this afternoon?"
+    reply = router_agent.dispatch_query(query, [("category: spa.", query)], time.monotonic() + 5)
+
+    assert reply == "ok"
+    assert seen == ["spa_request"]
@@ -0,0 +1,71 @@
+"""Batch processing of recordings: ordering, duplicates and resuming from the output."""
+
+import json
+import time
+
+import pytest
+
+from utils import voice_backend
+from utils.voice_batch import iter_audio_files, run_batch
+
+
+@pytest.fixture
+def recordings(tmp_path):
+    root = tmp_path / "recordings"
+    (root / "b").mkdir(parents=True)
+    (root / "a").mkdir()
+    (root / "b" / "2.wav").write_bytes(b"second call")
+    (root / "a" / "3.mp3").write_bytes(b"third call")
+    (root / "a" / "1.wav").write_bytes(b"first call")
+    (root / "b" / "copy.wav").write_bytes(b"first call")
+    (root / "a" / "notes.txt").write_text("not audio")
+    return root
+
+
+@pytest.fixture
+def processed(monkeypatch):
+    seen = []
+
+    def fake_process(path, streaming_stt=False):
+        seen.append(path)
+        # Earlier files finish last, so completion order differs from input order.
+        time.sleep({"1.wav": 0.15, "2.wav": 0.1}.get(path.rsplit("/", 1)[-1], 0.0))
+        if path.endswith("2.wav"):
+            raise RuntimeError("transcription failed")
+        return {"transcript": f"text of {path.rsplit('/', 1)[-1]}"}
+
+    monkeypatch.setattr(voice_backend, "process_audio_file", fake_process)
+    return seen
+
+
+def _records(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_files_are_found_in_a_stable_order(recordings):
+    names = [path.relative_to(recordings).as_posix() for path in iter_audio_files(recordings)]
+
+    assert names == ["a/1.wav", "a/3.mp3", "b/2.wav", "b/copy.wav"]
+
+
+def test_results_are_written_as_they_finish_with_duplicates_last(recordings, processed, tmp_path):
+    output = tmp_path / "results.jsonl"
+
+    counts = run_batch(recordings, output, workers=3, executor="thread", verbose=False)
+
+    records = _records(output)
+    assert counts == {"ok": 2, "error": 1, "duplicate": 1, "skipped": 0}
+    assert [record["path"].rsplit("/", 1)[-1] for record in records] == ["3.mp3", "2.wav", "1.wav", "copy.wav"]
+    assert records[-1]["duplicate_of"] == records[2]["path"]
+    assert len(processed) == 3
+
+
+def test_resume_skips_done_files_and_retries_errors(recordings, processed, tmp_path):
+    output = tmp_path / "results.jsonl"
+    run_batch(recordings, output, workers=3, executor="thread", verbose=False)
+    processed.clear()
+
+    counts = run_batch(recordings, output, workers=3, executor="thread", verbose=False)
+
+    assert counts == {"ok": 0, "error": 1, "duplicate": 0, "skipped": 3}
+    assert [path.rsplit("/", 1)[-1] for path in processed] == ["2.wav"]
@@ -0,0 +1,22 @@
+"""Load generator reporting: what counts as saturated."""
+
+from benchmarks.voice_loadgen import DEFAULT_SCRIPTS, saturation_point
+
+
+def _level(concurrency, p95=100.0, timeouts=0, http_errors=0):
+    return {"concurrency": concurrency, "webhook_p95_ms": p95, "timeouts": timeouts, "http_errors": http_errors}
+
+
+def test_http_errors_end_the_saturation_range():
+    reports = [_level(1), _level(5), _level(10, http_errors=4), _level(25)]
+
+    assert saturation_point(reports, slo_ms=3000) == 5
+
+
+def test_slow_or_timed_out_levels_end_the_saturation_range():
+    assert saturation_point([_level(1), _level(5, p95=4000.0)], slo_ms=3000) == 1
+    assert saturation_point([_level(1, timeouts=1)], slo_ms=3000) is None
+
+
+def test_booking_is_not_in_the_default_mix():
+    assert "booking" not in DEFAULT_SCRIPTS
@@ -0,0 +1,76 @@
+"""Voice replies stream from the model into the TTS pipeline."""
+
+import threading
+
+from agents.llm_gateway import chat_completion, stream_chat_completion, stream_reply
+from benchmarks.fake_openai_server import chat_reply
+from utils.voice_backend import reply_fragments, synthesize_pipelined
+
+MESSAGES = [{"role": "user", "content": "Do you have a spa?"}]
+REPLY = chat_reply(MESSAGES)
+
+
+def test_stream_chat_completion_yields_the_reply_in_pieces(fake_openai):
+    pieces = list(stream_chat_completion(MESSAGES))
+
+    assert len(pieces) > 1
+    assert "".join(pieces).strip() == REPLY
+
+
+def test_only_the_first_completion_in_a_block_streams(fake_openai):
+    deltas = []
+    with stream_reply(deltas.append):
+        first = chat_completion(MESSAGES)
+        chat_completion(MESSAGES)
+
+    assert first == REPLY
+    assert "".join(deltas).strip() == REPLY
+    assert fake_openai.requests["/v1/chat/completions"] == 2
+
+
+def test_sentences_are_synthesized_before_the_reply_is_finished():
+    first_synthesized = threading.Event()
+
+    def respond(message, on_delta):
+        for piece in ["Our spa opens at 9 a.m. daily. ", "Massages are ", "bookable at the front desk."]:
+            on_delta(piece)
+        # The reply is not returned until the pipeline has started on the first sentence.
+        assert first_synthesized.wait(5)
+        return "Our spa opens at 9 a.m. daily. Massages are bookable at the front desk."
+
+    def synthesize(text):
+        first_synthesized.set()
+        return "audio.mp3"
+
+    chunks = list(synthesize_pipelined(reply_fragments("spa?", respond), synthesize=synthesize))
+
+    assert [chunk.text for chunk in chunks] == ["Our spa opens at 9 a.m. daily.",
+                                                "Massages are bookable at the front desk."]
+
+
+def test_unstreamed_reply_comes_through_whole():
+    fragments = list(reply_fragments("hi", lambda message, on_delta: "Welcome back!"))
+
+    assert "".join(fragments) == "Welcome back!"
+
+
+def test_replaced_reply_follows_the_streamed_text():
+    def respond(message, on_delta):
+        on_delta("Our spa ")
+        return "Sorry, I couldn't fetch that."
+
+    assert "".join(reply_fragments("spa?", respond)) == "Our spa  Sorry, I couldn't fetch that."
+
+
+def test_voice_turn_streams_reply_into_tts(fake_openai, monkeypatch):
+    from hotel_voice_integration import voice_server
+
+    prefetched = []
+    monkeypatch.setattr(voice_server, "TTS_PLAYBACK", True)
+    monkeypatch.setattr(voice_server, "_prefetch_speech", lambda text: prefetched.append(text) or "")
+
+    sentences = voice_server._turn("CA-test", "Tell me something about the moon landing")
+
+    assert " ".join(sentences) == REPLY
+    assert prefetched == sentences
+    assert len(sentences) > 1
@@ -0,0 +1,375 @@
+"""Record and replay every outbound LLM, STT and TTS call.
+
+``MODEL_CALL_MODE=record`` appends each model call -- request, response (or
+error) and latency -- as one compact JSON line to ``MODEL_CALL_LOG`` (default
+``data/model_calls.jsonl``).  Synthesized audio is stored once per content
+hash next to the log in ``<log>.blobs/``.  Guest turns entering the system
+(``route_query``, the voice servers) are logged too, with their arrival time.
+
+``MODEL_CALL_MODE=replay`` answers model calls from that log instead of the
+API: requests are matched by a hash of their content, identical requests get
+their recorded responses in order, and each answer is delayed by the recorded
+latency divided by ``MODEL_CALL_REPLAY_SPEED`` (``1`` original timing, ``10``
+ten times faster, ``0`` instant -- useful to profile only our own code).
+A request that was never recorded raises :class:`ReplayMiss`.
+
+To reproduce a recorded day's traffic, replay its guest turns at their
+original spacing through the same entry points::
+
+    python -m utils.call_log replay data/model_calls.jsonl --speed 10 --workers 16
+    python -m utils.call_log replay data/model_calls.jsonl --speed 0 --warm-up --profile replay.prof
+    python -m utils.call_log stats data/model_calls.jsonl
+
+Call sites wrap the raw client call with :func:`invoke`; with the mode ``off``
+(the default) that is a single flag check.
+"""
+
+from __future__ import annotations
+
+import argparse
+import cProfile
+import hashlib
+import importlib
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Union
+
+OFF, RECORD, REPLAY = "off", "record", "replay"
+
+Request = Union[Dict[str, Any], Callable[[], Dict[str, Any]]]
+
+
+class ReplayMiss(LookupError):
+    """A replayed run made a model call that is not in the log."""
+
+
+class ReplayedError(RuntimeError):
+    """The recorded call failed; replay raises the same failure."""
+
+
+def request_key(kind: str, request: Dict[str, Any]) -> str:
+    canonical = json.dumps({"kind": kind, **request}, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+
+def audio_fingerprint(stream: Any) -> str:
+    """SHA-256 of a binary file object's content; the stream position is restored."""
+
+    position = stream.tell()
+    digest = hashlib.sha256(stream.read()).hexdigest()
+    stream.seek(position)
+    return digest
+
+
+def _namespace(value: Any) -> Any:
+    """JSON -> attribute access, enough to stand in for an SDK response object."""
+
+    if isinstance(value, dict):
+        return SimpleNamespace(**{key: _namespace(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return [_namespace(item) for item in value]
+    return value
+
+
+class CallLog:
+    """Append-only log of model calls with a replay index."""
+
+    def __init__(self, path: str, mode: str = OFF, speed: float = 1.0):
+        if mode not in (OFF, RECORD, REPLAY):
+            raise ValueError(f"MODEL_CALL_MODE must be off, record or replay, not {mode!r}")
+        self.path = Path(path)
+        self.mode = mode
+        self.speed = speed
+        self._lock = threading.Lock()
+        self._index: Optional[Dict[str, List[Dict[str, Any]]]] = None
+        self._cursor: Dict[str, int] = defaultdict(int)
+
+    @property
+    def blob_dir(self) -> Path:
+        return self.path.with_name(self.path.name + ".blobs")
+
+    # -- recording --------------------------------------------------------
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, separators=(",", ":"), default=str) + "\n"
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as handle:
+                handle.write(line)
+
+    def _store_blob(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        target = self.blob_dir / f"{digest}.bin"
+        if not target.exists():
+            self.blob_dir.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, target)
+        return digest
+
+    def _encode(self, kind: str, response: Any) -> Dict[str, Any]:
+        if kind == "chat":
+            return response.model_dump(mode="json") if hasattr(response, "model_dump") else dict(response)
+        if kind == "stt":
+            return {"text": getattr(response, "text", "")}
+        if kind == "tts":
+            return {"blob": self._store_blob(response.content)}
+        raise ValueError(f"unknown call kind {kind!r}")
+
+    def _decode(self, kind: str, data: Dict[str, Any]) -> Any:
+        if kind == "chat":
+            return _namespace(data)
+        if kind == "stt":
+            return SimpleNamespace(text=data.get("text", ""))
+        if kind == "tts":
+            return SimpleNamespace(content=(self.blob_dir / f"{data['blob']}.bin").read_bytes())
+        raise ValueError(f"unknown call kind {kind!r}")
+
+    def record_call(self, kind: str, request: Dict[str, Any], fn: Callable[[], Any]) -> Any:
+        started_wall, started = time.time(), time.perf_counter()
+        record: Dict[str, Any] = {"t": round(started_wall, 3), "type": "call", "kind": kind,
+                                  "key": request_key(kind, request), "request": request}
+        try:
+            response = fn()
+        except Exception as exc:
+            record["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            record["error"] = f"{type(exc).__name__}: {exc}"
+            self._append(record)
+            raise
+        record["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        record["response"] = self._encode(kind, response)
+        self._append(record)
+        return response
+
+    def record_turn(self, entry: str, text: str, session: Optional[str] = None) -> None:
+        if self.mode == RECORD:
+            self._append({"t": round(time.time(), 3), "type": "turn", "entry": entry,
+                          "session": session, "text": text})
+
+    # -- replaying --------------------------------------------------------
+
+    def records(self) -> List[Dict[str, Any]]:
+        if not self.path.exists():
+            return []
+        out = []
+        with open(self.path, encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    out.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue  # torn last line from a crash
+        return out
+
+    def _load_index(self) -> Dict[str, List[Dict[str, Any]]]:
+        with self._lock:
+            if self._index is None:
+                index: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+                for record in self.records():
+                    if record.get("type") == "call":
+                        index[record["key"]].append(record)
+                self._index = dict(index)
+            return self._index
+
+    def replay_call(self, kind: str, request: Dict[str, Any]) -> Any:
+        key = request_key(kind, request)
+        matches = self._load_index().get(key)
+        if not matches:
+            raise ReplayMiss(f"no recorded {kind} call matches request {key}")
+        with self._lock:
+            position = self._cursor[key]
+            self._cursor[key] = position + 1
+        record = matches[min(position, len(matches) - 1)]
+        if self.speed > 0:
+            time.sleep(record.get("latency_ms", 0) / 1000.0 / self.speed)
+        if "error" in record:
+            raise ReplayedError(record["error"])
+        return self._decode(kind, record["response"])
+
+
+_log = CallLog(
+    os.getenv("MODEL_CALL_LOG", "data/model_calls.jsonl"),
+    os.getenv("MODEL_CALL_MODE", OFF).lower(),
+    float(os.getenv("MODEL_CALL_REPLAY_SPEED", "1")),
+)
+
+
+def get_call_log() -> CallLog:
+    return _log
+
+
+def configure(path: Optional[str] = None, mode: Optional[str] = None, speed: Optional[float] = None) -> CallLog:
+    """Replace the process-wide log (e.g. from a CLI or test harness)."""
+
+    global _log
+    _log = CallLog(path or str(_log.path), mode or _log.mode, _log.speed if speed is None else speed)
+    return _log
+
+
+def invoke(kind: str, request: Request, fn: Callable[[], Any]) -> Any:
+    """Run a model call through the configured mode.
+
+    ``kind`` is ``chat``, ``stt`` or ``tts``; ``request`` is the JSON-able
+    description that identifies the call (a callable is only evaluated when
+    recording or replaying); ``fn`` performs the real API call.
+    """
+
+    log = _log
+    if log.mode == OFF:
+        return fn()
+    payload = request() if callable(request) else request
+    if log.mode == RECORD:
+        return log.record_call(kind, payload, fn)
+    return log.replay_call(kind, payload)
+
+
+def record_turn(entry: str, text: str, session: Optional[str] = None) -> None:
+    """Log a guest turn arriving at ``entry`` (recording mode only)."""
+
+    if _log.mode == RECORD:
+        _log.record_turn(entry, text, session)
+
+
+# -- traffic replay CLI -----------------------------------------------------
+
+ENTRYPOINTS = {
+    "route_query": ("agents.router_agent", "route_query"),
+    "generate_agent_response": ("hotel_voice_integration.stt_tts_utils", "generate_agent_response"),
+    "concierge": ("utils.stt_tts_utils", "process_speech_and_generate_audio"),
+    "voice_call": ("hotel_voice_integration.voice_server", "handle_message"),
+}
+
+
+def _entry_function(entry: str) -> Callable[..., Any]:
+    module_name, attr = ENTRYPOINTS[entry]
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def replay_traffic(path: str, *, speed: float = 1.0, workers: int = 16,
+                   profile_path: Optional[str] = None, warm: bool = False) -> Dict[str, Any]:
+    """Re-issue recorded guest turns at their original spacing (divided by ``speed``).
+
+    With ``profile_path`` every turn runs under its own profiler (cProfile
+    only sees the thread it was started in) and the merged stats are written
+    there for ``pstats`` / snakeviz.  ``warm`` runs :func:`agents.warmup.warm_up`
+    first, so cold-start imports and index builds stay out of the numbers.
+    """
+
+    log = configure(path, REPLAY, speed)
+    turns = [record for record in log.records() if record.get("type") == "turn"]
+    if not turns:
+        return {"turns": 0}
+    origin = turns[0]["t"]
+    latencies: List[float] = []
+    failures: Dict[str, int] = defaultdict(int)
+    profiles: List[Any] = []
+    lock = threading.Lock()
+
+    if warm:
+        from agents.warmup import warm_up
+
+        warm_up()
+    # Import the entry points before the clock starts.
+    functions = {entry: _entry_function(entry) for entry in {turn["entry"] for turn in turns}}
+
+    def run(turn: Dict[str, Any]) -> None:
+        fn = functions[turn["entry"]]
+        args = (turn.get("session") or "replay", turn["text"]) if turn["entry"] == "voice_call" else (turn["text"],)
+        profiler = cProfile.Profile() if profile_path else None
+        started = time.perf_counter()
+        try:
+            if profiler is not None:
+                profiler.runcall(fn, *args)
+            else:
+                fn(*args)
+        except Exception as exc:
+            with lock:
+                failures[type(exc).__name__] += 1
+            return
+        finally:
+            if profiler is not None:
+                with lock:
+                    profiles.append(profiler)
+        with lock:
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for turn in turns:
+            if speed > 0:
+                delay = (turn["t"] - origin) / speed - (time.perf_counter() - started)
+                if delay > 0:
+                    time.sleep(delay)
+            pool.submit(run, turn)
+    wall = time.perf_counter() - started
+    if profiles:
+        stats = pstats.Stats(profiles[0])
+        for profiler in profiles[1:]:
+            stats.add(profiler)
+        stats.dump_stats(profile_path)
+    latencies.sort()
+
+    def pick(q: float) -> float:
+        if not latencies:
+            return 0.0
+        return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 1)
+
+    return {"turns": len(turns), "ok": len(latencies), "failures": dict(failures),
+            "wall_s": round(wall, 2), "p50_ms": pick(0.5), "p95_ms": pick(0.95), "p99_ms": pick(0.99)}
+
+
+def log_stats(path: str) -> Dict[str, Any]:
+    """Counts and latency percentiles per call kind in a log."""
+
+    per_kind: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    turns = 0
+    for record in CallLog(path).records():
+        if record.get("type") == "turn":
+            turns += 1
+        elif record.get("type") == "call":
+            per_kind[record["kind"]].append(record.get("latency_ms", 0.0))
+            errors[record["kind"]] += "error" in record
+    stats: Dict[str, Any] = {"turns": turns}
+    for kind, values in per_kind.items():
+        values.sort()
+        stats[kind] = {"calls": len(values), "errors": errors[kind],
+                       "p50_ms": values[len(values) // 2], "p95_ms": values[int(0.95 * (len(values) - 1))]}
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect or replay a recorded model-call log.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    replay = sub.add_parser("replay", help="replay recorded guest turns against recorded model answers")
+    replay.add_argument("log")
+    replay.add_argument("--speed", type=float, default=1.0, help="time compression; 0 = no waiting at all")
+    replay.add_argument("--workers", type=int, default=16, help="concurrent turns")
+    replay.add_argument("--profile", help="write cProfile stats of the replay to this file")
+    replay.add_argument("--warm-up", action="store_true", help="load agents and indexes before replaying")
+    stats = sub.add_parser("stats", help="summarize a log")
+    stats.add_argument("log")
+    args = parser.parse_args(argv)
+
+    if args.command == "stats":
+        print(json.dumps(log_stats(args.log), indent=2))
+        return 0
+
+    result = replay_traffic(args.log, speed=args.speed, workers=args.workers, profile_path=args.profile,
+                            warm=args.warm_up)
+    print(json.dumps(result, indent=2))
+    return 1 if result.get("failures") else 0
+
+
+if __name__ == "__main__":
+    # Run against the module instance the call sites imported, not ``__main__``.
+    from utils.call_log import main as _main
+
+    sys.exit(_main())
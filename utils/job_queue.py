@@ -0,0 +1,262 @@
+"""Background job queue used by the voice webhooks' fast-ack mode.
+
+Twilio drops a call when a webhook takes too long to answer.  In fast-ack
+mode ``/process`` submits the agent turn here and immediately returns TwiML
+that pauses and redirects to ``/result/<job_id>``; the poll endpoint then
+picks up the reply once a worker thread has produced it.
+
+Finished jobs are kept for ``ttl`` seconds so a late poll can still collect
+them, then dropped.
+
+Jobs run in the process that accepted ``/process``, but Twilio's poll may be
+routed to any gunicorn worker.  With ``VOICE_SESSION_BACKEND=sqlite`` every
+job's status, context and result are also written to the shared session
+database (:class:`SQLiteJobResults`), so a worker that did not run the job can
+still answer the poll.  The in-memory default only works with a single worker
+process (or sticky routing by ``CallSid``).  Configuration comes from the
+environment:
+
+* ``VOICE_JOB_WORKERS`` -- worker threads (default 8);
+* ``VOICE_JOB_TTL`` -- seconds a job is kept for polling (default 300);
+* ``VOICE_FAST_ACK_WAIT`` -- seconds a webhook may wait for the reply before
+  falling back to pause-and-redirect (default 0.5), which bounds webhook
+  latency while still answering fast turns in one round trip;
+* ``VOICE_POLL_PAUSE`` -- ``<Pause>`` length between polls (default 1);
+* ``VOICE_MAX_POLLS`` -- polls before the caller is asked to repeat (default 20);
+* ``VOICE_SESSION_BACKEND`` / ``VOICE_SESSION_DB`` -- ``sqlite`` shares jobs
+  between worker processes through that file (see
+  :mod:`hotel_voice_integration.session_store`).
+"""
+
+from __future__ import annotations
+
+import contextvars
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional, Tuple
+
+FAST_ACK_WAIT = float(os.getenv("VOICE_FAST_ACK_WAIT", "0.5"))
+POLL_PAUSE_SECONDS = int(os.getenv("VOICE_POLL_PAUSE", "1"))
+MAX_POLLS = int(os.getenv("VOICE_MAX_POLLS", "20"))
+# How often a worker re-reads a job another process is running.
+SHARED_POLL_SECONDS = 0.05
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+
+class Job:
+    """A submitted unit of work plus caller-supplied context (e.g. the transcript)."""
+
+    __slots__ = ("job_id", "future", "context", "created_at")
+
+    def __init__(self, job_id: str, future: Future, context: Dict[str, Any]):
+        self.job_id = job_id
+        self.future = future
+        self.context = context
+        self.created_at = time.monotonic()
+
+    @property
+    def status(self) -> str:
+        if not self.future.done():
+            return PENDING
+        return FAILED if self.future.exception() is not None else DONE
+
+
+class SQLiteJobResults:
+    """Job status, context and JSON result in a SQLite file shared by worker processes."""
+
+    _SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS voice_jobs (
+               job_id TEXT PRIMARY KEY,
+               status TEXT NOT NULL,
+               context TEXT NOT NULL,
+               result TEXT,
+               created_at REAL NOT NULL
+           )""",
+        "CREATE INDEX IF NOT EXISTS idx_voice_jobs_created ON voice_jobs(created_at)",
+    )
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        with conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in self._SCHEMA:
+                conn.execute(statement)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def put(self, job_id: str, status: str, context: Dict[str, Any], result: Any = None) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT INTO voice_jobs(job_id, status, context, result, created_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(job_id) DO UPDATE SET status = excluded.status, result = excluded.result",
+                (job_id, status, json.dumps(context), json.dumps(result), time.time()),
+            )
+
+    def load(self, job_id: str) -> Optional[Tuple[str, Dict[str, Any], Any]]:
+        """``(status, context, result)`` of a job, or ``None`` if unknown."""
+
+        row = self._conn().execute(
+            "SELECT status, context, result FROM voice_jobs WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1]), json.loads(row[2]) if row[2] is not None else None
+
+    def delete(self, job_id: str) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM voice_jobs WHERE job_id = ?", (job_id,))
+
+    def expire(self, ttl: float) -> int:
+        conn = self._conn()
+        with conn:
+            return conn.execute("DELETE FROM voice_jobs WHERE created_at < ?", (time.time() - ttl,)).rowcount
+
+
+class JobQueue:
+    """Thread-pool backed queue with TTL cleanup of finished jobs.
+
+    With ``shared`` results, jobs submitted by other processes can be looked
+    up, waited on and popped here too; their results must be JSON-able.
+    """
+
+    def __init__(self, max_workers: int = 8, ttl: float = 300.0, shared: Optional[SQLiteJobResults] = None):
+        self.ttl = ttl
+        self.shared = shared
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="voice-job")
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[..., Any], *args: Any,
+               context: Optional[Dict[str, Any]] = None, **kwargs: Any) -> Job:
+        """Schedule ``fn(*args, **kwargs)`` and return its :class:`Job`.
+
+        The job runs in a copy of the caller's context, so context variables
+        such as the usage session label follow it onto the worker thread.
+        """
+
+        job_id = uuid.uuid4().hex
+        context = dict(context or {})
+        if self.shared is not None:
+            # Registered before the job can finish, so no poll sees it missing.
+            self.shared.put(job_id, PENDING, context)
+        future = self._executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+        job = Job(job_id, future, context)
+        if self.shared is not None:
+            future.add_done_callback(lambda done: self._publish(job_id, context, done))
+        with self._lock:
+            self._expire()
+            self._jobs[job.job_id] = job
+        if self.shared is not None:
+            self.shared.expire(self.ttl)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Return the job registered under ``job_id`` (``None`` if unknown or expired)."""
+
+        with self._lock:
+            self._expire()
+            job = self._jobs.get(job_id)
+        if job is None and self.shared is not None:
+            job = self._load_shared(job_id)
+        return job
+
+    def wait(self, job: Job, timeout: float) -> str:
+        """Block up to ``timeout`` seconds for ``job``; return its status."""
+
+        if job.job_id in self._jobs or self.shared is None:
+            if timeout > 0:
+                wait([job.future], timeout=timeout)
+            return job.status
+        # Running in another process: re-read the shared row until it finishes.
+        deadline = time.monotonic() + timeout
+        while job.status == PENDING and time.monotonic() < deadline:
+            time.sleep(SHARED_POLL_SECONDS)
+            fresh = self._load_shared(job.job_id)
+            if fresh is None:
+                break
+            job.future = fresh.future
+        return job.status
+
+    def pop(self, job_id: str) -> Optional[Job]:
+        """Remove and return a job once its result has been delivered."""
+
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+        if self.shared is not None:
+            job = job or self._load_shared(job_id)
+            self.shared.delete(job_id)
+        return job
+
+    def _publish(self, job_id: str, context: Dict[str, Any], future: Future) -> None:
+        error = future.exception()
+        try:
+            if error is None:
+                self.shared.put(job_id, DONE, context, future.result())
+            else:
+                self.shared.put(job_id, FAILED, context, str(error))
+        except Exception as exc:
+            print(f"[Jobs] Could not share result of job {job_id}: {exc}")
+            self.shared.put(job_id, FAILED, context, str(exc))
+
+    def _load_shared(self, job_id: str) -> Optional[Job]:
+        row = self.shared.load(job_id)
+        if row is None:
+            return None
+        status, context, result = row
+        future: Future = Future()
+        if status == DONE:
+            future.set_result(result)
+        elif status == FAILED:
+            future.set_exception(RuntimeError(result))
+        return Job(job_id, future, context)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._jobs)
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.ttl
+        stale = [job_id for job_id, job in self._jobs.items()
+                 if job.created_at < cutoff and job.future.done()]
+        for job_id in stale:
+            del self._jobs[job_id]
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Return the process-wide job queue, creating it on first use."""
+
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                shared = None
+                if os.getenv("VOICE_SESSION_BACKEND", "memory").lower() == "sqlite":
+                    shared = SQLiteJobResults(os.getenv("VOICE_SESSION_DB", "voice_sessions.db"))
+                _queue = JobQueue(
+                    max_workers=int(os.getenv("VOICE_JOB_WORKERS", "8")),
+                    ttl=float(os.getenv("VOICE_JOB_TTL", "300")),
+                    shared=shared,
+                )
+    return _queue
@@ -0,0 +1,49 @@
+"""Load the review sentiment model and its TF-IDF vectorizer from joblib files."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+SENTIMENT_MODEL_PATH = os.getenv("SENTIMENT_MODEL_PATH", "models/sentiment_model.joblib")
+SENTIMENT_VECTORIZER_PATH = os.getenv("SENTIMENT_VECTORIZER_PATH", "models/tfidf_vectorizer.joblib")
+
+
+def model_files_exist(model_path: str | Path = SENTIMENT_MODEL_PATH,
+                      vectorizer_path: str | Path = SENTIMENT_VECTORIZER_PATH) -> bool:
+    """Return True if both the model and vectorizer files are present."""
+
+    return Path(model_path).exists() and Path(vectorizer_path).exists()
+
+
+def load_model_and_vectorizer(model_path: str | Path = SENTIMENT_MODEL_PATH,
+                              vectorizer_path: str | Path = SENTIMENT_VECTORIZER_PATH,
+                              mmap_mode: Optional[str] = "r") -> Tuple[Any, Any]:
+    """Load ``(model, vectorizer)``.
+
+    With ``mmap_mode="r"`` the NumPy arrays inside both objects (coefficients,
+    IDF weights) are memory-mapped read-only instead of copied onto the heap,
+    so worker processes forked after loading share the same physical pages.
+    Memory mapping only applies to files written uncompressed -- see
+    :func:`save_model_and_vectorizer`.
+    """
+
+    import joblib
+
+    model = joblib.load(model_path, mmap_mode=mmap_mode)
+    vectorizer = joblib.load(vectorizer_path, mmap_mode=mmap_mode)
+    return model, vectorizer
+
+
+def save_model_and_vectorizer(model: Any, vectorizer: Any,
+                              model_path: str | Path = SENTIMENT_MODEL_PATH,
+                              vectorizer_path: str | Path = SENTIMENT_VECTORIZER_PATH) -> None:
+    """Persist a trained model/vectorizer pair uncompressed so it can be memory-mapped."""
+
+    import joblib
+
+    for path in (model_path, vectorizer_path):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+    joblib.dump(model, model_path, compress=0)
+    joblib.dump(vectorizer, vectorizer_path, compress=0)
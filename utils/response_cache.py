@@ -0,0 +1,381 @@
+"""Pre-warmed answers for the questions guests ask most.
+
+An offline job mines the guest turns recorded by :mod:`utils.call_log`
+(``MODEL_CALL_MODE=record``): queries are grouped by normalized text, near
+duplicates are merged by character n-gram similarity (the FAQ index's
+signatures), and the ``--top`` most frequent groups are answered once through
+the same entry point the guests used.  Only questions the router sends to an
+agent that answers from the knowledge data alone (FAQ, policy, menu, spa) are
+cached: booking changes guest state, and shuttle times and the local guide's
+"open now" lists depend on the clock, as does any question asking about "now",
+"tonight" or the "next" departure.  Answers that fail vetting -- errors,
+apologies, holding replies -- are dropped too, and the rest are written to ``RESPONSE_CACHE_PATH`` (default
+``data/response_cache.json``), a readable file that can be reviewed and
+trimmed before it ships::
+
+    python -m utils.response_cache mine data/model_calls.jsonl --top 20
+    python -m utils.response_cache build data/model_calls.jsonl --top 50 --min-count 3
+    python -m utils.response_cache build data/model_calls.jsonl --if-stale
+
+The entry points look a turn up with :func:`cached_answer` before doing any
+work.  The file is loaded on first use (or at start-up by
+:func:`agents.warmup.warm_up`), reloaded when it changes on disk, and ignored
+while its knowledge version differs from the data files' current one -- so
+after a knowledge update no stale answer is served, and rerunning ``build``
+(``--if-stale`` makes it a no-op otherwise) warms the cache again.  Lookups
+match the mined phrasings exactly (after normalization); anything else takes
+the normal path.  ``RESPONSE_CACHE_ENABLED=0`` turns lookups off.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from agents.knowledge_base import knowledge_version
+from utils.text_normalization import normalize_query
+
+RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", "data/response_cache.json")
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "1") == "1"
+
+# Entry points whose turns are mined (``concierge`` included: it is stateless too).
+MINED_ENTRIES = ("route_query", "generate_agent_response", "concierge", "voice_call")
+
+# Replies that must never be pinned in the cache.
+_UNVETTED_MARKERS = (
+    "⚠️", "Router Error", "Sorry, I couldn't", "I'm still checking", "We encountered an issue",
+    "I'm sorry, I can't look that up right now",
+)
+
+
+# Router agents whose answers depend only on the knowledge data -- not on the
+# clock (shuttle, local guide) or on the guest (booking).
+CACHEABLE_AGENTS = frozenset({"faq", "policy", "restaurant", "spa"})
+
+# Questions about the current moment are never pinned, whatever their agent.
+_TIME_SENSITIVE_RE = re.compile(
+    r"\b(?:now|currently|today|tonight|tomorrow|yesterday|next|still|yet|soon|later|"
+    r"at the moment|this (?:morning|afternoon|evening|week|weekend))\b"
+)
+
+
+class ResponseCache:
+    """Answers keyed by ``(entry point, normalized query)`` for one knowledge version."""
+
+    def __init__(self, path: str = RESPONSE_CACHE_PATH, enabled: bool = True):
+        self.path = path
+        self.enabled = enabled
+        self._answers: Dict[Tuple[str, str], str] = {}
+        self._version = ""
+        self._file_stat: Optional[Tuple[int, int]] = None
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def load(self) -> int:
+        """(Re)read the cache file; returns the number of phrasings loaded."""
+
+        with self._lock:
+            return self._load(self._stat())
+
+    def _load(self, file_stat: Optional[Tuple[int, int]]) -> int:
+        self._file_stat = file_stat
+        self._answers, self._version = {}, ""
+        if file_stat is None:
+            return 0
+        try:
+            with open(self.path, encoding="utf-8") as handle:
+                data = json.load(handle)
+        except (OSError, json.JSONDecodeError) as exc:
+            print(f"[Cache] Could not read {self.path}: {exc}")
+            return 0
+        self._version = str(data.get("knowledge_version", ""))
+        for item in data.get("entries", []):
+            for phrasing in item.get("phrasings", {}):
+                self._answers[(item["entry"], phrasing)] = item["answer"]
+        print(f"[Cache] Loaded {len(self._answers)} phrasings from {self.path}")
+        return len(self._answers)
+
+    def lookup(self, entry: str, text: str) -> Optional[str]:
+        """The pre-warmed answer for ``text`` at ``entry``, or ``None``."""
+
+        if not self.enabled:
+            return None
+        file_stat = self._stat()
+        with self._lock:
+            if file_stat != self._file_stat:
+                self._load(file_stat)
+            if not self._answers or self._version != knowledge_version():
+                return None
+            answer = self._answers.get((entry, normalize_query(text)))
+            if answer is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+            return answer
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"phrasings": len(self._answers), "knowledge_version": self._version,
+                    "current": self._version == knowledge_version(), "hits": self._hits, "misses": self._misses}
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Return the process-wide response cache, creating it on first use."""
+
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(RESPONSE_CACHE_PATH, enabled=RESPONSE_CACHE_ENABLED)
+    return _cache
+
+
+def cached_answer(entry: str, text: str) -> Optional[str]:
+    """Pre-warmed answer for a guest turn at ``entry`` (``None`` on a miss)."""
+
+    return get_response_cache().lookup(entry, text)
+
+
+# -- mining -----------------------------------------------------------------
+
+@dataclass
+class QueryCluster:
+    """Phrasings of one question at one entry point, with how often each was asked."""
+
+    entry: str
+    signature: FrozenSet[str]
+    phrasings: Counter = field(default_factory=Counter)
+    samples: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def count(self) -> int:
+        return sum(self.phrasings.values())
+
+    @property
+    def representative(self) -> str:
+        """The guest's own wording of the most frequent phrasing."""
+
+        return self.samples[self.phrasings.most_common(1)[0][0]]
+
+
+def _dice(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    return 2.0 * len(a & b) / (len(a) + len(b)) if a and b else 0.0
+
+
+def mine_queries(turns: Iterable[Dict[str, Any]], *, top: int = 50, min_count: int = 3,
+                 similarity: float = 0.85) -> List[QueryCluster]:
+    """Group logged guest turns into clusters of the same question, most asked first.
+
+    Turns are first counted by normalized text; phrasings are then merged
+    greedily, most frequent first, into the cluster whose leading phrasing
+    has a Dice similarity of at least ``similarity`` with them.
+    """
+
+    from agents.faq_index import ngram_signature
+
+    counts: Dict[str, Counter] = defaultdict(Counter)
+    samples: Dict[Tuple[str, str], str] = {}
+    for turn in turns:
+        entry, text = turn.get("entry"), turn.get("text") or ""
+        normalized = normalize_query(text)
+        if entry not in MINED_ENTRIES or not normalized:
+            continue
+        counts[entry][normalized] += 1
+        samples.setdefault((entry, normalized), text.strip())
+
+    clusters: List[QueryCluster] = []
+    for entry, phrasings in counts.items():
+        entry_clusters: List[QueryCluster] = []
+        for normalized, count in phrasings.most_common():
+            signature = ngram_signature(normalized)
+            home = max(entry_clusters, key=lambda c: _dice(c.signature, signature), default=None)
+            if home is None or _dice(home.signature, signature) < similarity:
+                home = QueryCluster(entry, signature)
+                entry_clusters.append(home)
+            home.phrasings[normalized] += count
+            home.samples[normalized] = samples[(entry, normalized)]
+        clusters.extend(entry_clusters)
+    clusters.sort(key=lambda c: c.count, reverse=True)
+    return [c for c in clusters if c.count >= min_count][:top]
+
+
+def _vetted(answer: object) -> bool:
+    return isinstance(answer, str) and bool(answer.strip()) and not any(m in answer for m in _UNVETTED_MARKERS)
+
+
+def is_time_sensitive(text: str) -> bool:
+    return bool(_TIME_SENSITIVE_RE.search(normalize_query(text)))
+
+
+def _uncacheable_reason(text: str) -> Optional[str]:
+    """Why ``text`` must not be cached, or ``None`` when its answer is stateless and time-independent."""
+
+    from agents.policy_index import is_complaint
+    from agents.router_agent import ROUTER_DEADLINE_SECONDS, category_agent, classify_query, predict_category
+
+    if is_time_sensitive(text):
+        return "time-sensitive"
+    if is_complaint(text):
+        return "complaint"
+    guess = predict_category(text)
+    if guess is not None and category_agent(guess) not in CACHEABLE_AGENTS:
+        return category_agent(guess)
+    categorized = classify_query(text, time.monotonic() + ROUTER_DEADLINE_SECONDS)
+    for category, _ in categorized:
+        if category_agent(category) not in CACHEABLE_AGENTS:
+            return category_agent(category)
+    return None
+
+
+def _answer(entry: str, text: str) -> Any:
+    from utils.call_log import ENTRYPOINTS
+
+    module_name, attr = ENTRYPOINTS[entry]
+    fn = getattr(importlib.import_module(module_name), attr)
+    if entry != "voice_call":
+        return fn(text)
+    # A throwaway call, ended straight away so it leaves no session behind.
+    from hotel_voice_integration.voice_server import sessions
+
+    call_id = f"prewarm-{uuid.uuid4().hex}"
+    try:
+        return fn(call_id, text)
+    finally:
+        sessions.end(call_id)
+
+
+def precompute(clusters: List[QueryCluster]) -> List[Dict[str, Any]]:
+    """Answer each cluster once through its entry point; keep the answers that pass vetting.
+
+    Stops early if the LLM becomes unavailable, so local-only fallback answers
+    are never pinned as the normal reply.
+    """
+
+    from agents.degraded import llm_available
+
+    cache = get_response_cache()
+    enabled, cache.enabled = cache.enabled, False  # answer fresh, not from the old file
+    entries: List[Dict[str, Any]] = []
+    try:
+        for cluster in clusters:
+            if not llm_available():
+                print("[Cache] LLM unavailable; stopping before degraded answers are cached")
+                break
+            text = cluster.representative
+            phrasings = {p: n for p, n in cluster.phrasings.most_common() if not is_time_sensitive(p)}
+            try:
+                reason = _uncacheable_reason(text)
+                if reason is None and not phrasings:
+                    reason = "time-sensitive"
+                if reason is not None:
+                    print(f"[Cache] skip ({reason}): {text!r}")
+                    continue
+                answer = _answer(cluster.entry, text)
+            except Exception as exc:
+                print(f"[Cache] skip ({type(exc).__name__}: {exc}): {text!r}")
+                continue
+            if not _vetted(answer) or not llm_available():
+                print(f"[Cache] skip (failed vetting): {text!r}")
+                continue
+            entries.append({"entry": cluster.entry, "query": text, "count": sum(phrasings.values()),
+                            "phrasings": phrasings, "answer": answer})
+    finally:
+        cache.enabled = enabled
+    return entries
+
+
+def _turns(log_path: str) -> List[Dict[str, Any]]:
+    from utils.call_log import CallLog
+
+    return [record for record in CallLog(log_path).records() if record.get("type") == "turn"]
+
+
+def is_stale(out_path: str, log_path: str) -> bool:
+    """True unless ``out_path`` was built from the current data and is newer than the log."""
+
+    try:
+        with open(out_path, encoding="utf-8") as handle:
+            built_for = json.load(handle).get("knowledge_version")
+    except (OSError, json.JSONDecodeError):
+        return True
+    log_mtime = os.path.getmtime(log_path) if os.path.exists(log_path) else 0.0
+    return built_for != knowledge_version() or os.path.getmtime(out_path) < log_mtime
+
+
+def build(log_path: str, out_path: str = RESPONSE_CACHE_PATH, *, top: int = 50, min_count: int = 3,
+          similarity: float = 0.85) -> Dict[str, Any]:
+    """Mine ``log_path``, precompute vetted answers and write them to ``out_path``."""
+
+    clusters = mine_queries(_turns(log_path), top=top, min_count=min_count, similarity=similarity)
+    entries = precompute(clusters)
+    document = {"knowledge_version": knowledge_version(), "generated_at": round(time.time(), 3),
+                "source": log_path, "entries": entries}
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    tmp_path = f"{out_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(document, handle, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, out_path)
+    return {"clusters": len(clusters), "cached": len(entries),
+            "phrasings": sum(len(e["phrasings"]) for e in entries),
+            "turns_covered": sum(e["count"] for e in entries), "knowledge_version": document["knowledge_version"]}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Mine logged guest queries and pre-warm the response cache.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    mine = sub.add_parser("mine", help="show the most asked questions")
+    build_parser = sub.add_parser("build", help="answer the most asked questions and write the cache")
+    for command in (mine, build_parser):
+        command.add_argument("log", nargs="?", default=os.getenv("MODEL_CALL_LOG", "data/model_calls.jsonl"))
+        command.add_argument("--top", type=int, default=50, help="questions to keep")
+        command.add_argument("--min-count", type=int, default=3, help="times a question must have been asked")
+        command.add_argument("--similarity", type=float, default=0.85,
+                             help="n-gram similarity at which phrasings count as one question")
+    build_parser.add_argument("--out", default=RESPONSE_CACHE_PATH)
+    build_parser.add_argument("--if-stale", action="store_true",
+                              help="do nothing if the cache matches the current data and log")
+    args = parser.parse_args(argv)
+
+    if args.command == "mine":
+        clusters = mine_queries(_turns(args.log), top=args.top, min_count=args.min_count,
+                                similarity=args.similarity)
+        for cluster in clusters:
+            print(f"{cluster.count:6d}  {cluster.entry:<24} {cluster.representative}  "
+                  f"({len(cluster.phrasings)} phrasings)")
+        return 0
+
+    if args.if_stale and not is_stale(args.out, args.log):
+        print(f"{args.out} is current")
+        return 0
+    print(json.dumps(build(args.log, args.out, top=args.top, min_count=args.min_count,
+                           similarity=args.similarity), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    # Run against the module instance the entry points imported, not ``__main__``.
+    from utils.response_cache import main as _main
+
+    sys.exit(_main())
@@ -1,17 +1,3 @@
-import re
-import nltk
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
+from utils.text_normalization import clean_text, clean_text_batch, stop_words
 
-nltk.download('stopwords')
-nltk.download('wordnet')
-
-stop_words = set(stopwords.words('english'))
-lemmatizer = WordNetLemmatizer()
-
-def clean_text(text):
-    text = str(text).lower()
-    text = re.sub(r'[^a-z\s]', '', text)
-    words = text.split()
-    words = [lemmatizer.lemmatize(word) for word in words if word not in stop_words]
-    return " ".join(words)
\ No newline at end of file
+__all__ = ["clean_text", "clean_text_batch", "stop_words"]
@@ -0,0 +1,71 @@
+"""Score a large review CSV in chunks with the sentiment model.
+
+Usage::
+
+    python -m utils.score_reviews reviews.csv scored.csv --text-column review --chunksize 5000
+
+The input is streamed with ``pandas.read_csv(chunksize=...)`` and each chunk is
+scored with a single :func:`agents.sentiment_agent.analyze_sentiment_many`
+call, so memory stays flat regardless of file size.  A ``sentiment`` column is
+appended and rows are written to the output as each chunk finishes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import pandas as pd
+
+from agents import sentiment_agent
+
+
+def score_review_csv(input_path: str | Path, output_path: str | Path, *,
+                     text_column: str = "review", chunksize: int = 5000,
+                     output_column: str = "sentiment", verbose: bool = True) -> int:
+    """Stream ``input_path`` through the model and write scored rows; return the row count."""
+
+    sentiment_agent.warm()
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    total = 0
+    started = time.perf_counter()
+    for chunk_number, chunk in enumerate(pd.read_csv(input_path, chunksize=chunksize)):
+        if text_column not in chunk.columns:
+            raise KeyError(f"Column '{text_column}' not found in {input_path}")
+        texts = chunk[text_column].fillna("").astype(str).tolist()
+        chunk[output_column] = sentiment_agent.analyze_sentiment_many(texts)
+        chunk.to_csv(output_path, mode="w" if chunk_number == 0 else "a",
+                     header=chunk_number == 0, index=False)
+        total += len(chunk)
+        if verbose:
+            rate = total / max(time.perf_counter() - started, 1e-9)
+            print(f"[score_reviews] {total} reviews scored ({rate:,.0f}/s)", file=sys.stderr)
+    return total
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Score a review CSV with the sentiment model.")
+    parser.add_argument("input", help="CSV file containing the reviews")
+    parser.add_argument("output", help="where to write the scored CSV")
+    parser.add_argument("--text-column", default="review", help="column holding the review text")
+    parser.add_argument("--chunksize", type=int, default=5000, help="rows scored per batch")
+    parser.add_argument("--quiet", action="store_true", help="suppress progress output")
+    args = parser.parse_args(argv)
+
+    if not sentiment_agent.is_available():
+        print("Sentiment model files not found; set SENTIMENT_MODEL_PATH / SENTIMENT_VECTORIZER_PATH.",
+              file=sys.stderr)
+        return 1
+
+    score_review_csv(args.input, args.output, text_column=args.text_column,
+                     chunksize=args.chunksize, verbose=not args.quiet)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
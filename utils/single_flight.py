@@ -0,0 +1,109 @@
+"""Single-flight coalescing of identical in-flight calls.
+
+When dozens of guests ask the same thing at the same moment (a conference
+checking in, a delayed shuttle), each request used to run its own
+classification and agent completion.  With :class:`SingleFlight` the first
+caller for a key runs the computation and every caller that arrives while it
+is still running waits for, and shares, that same result or exception.  The
+key is dropped the moment the computation finishes, so nothing is cached: a
+request arriving afterwards starts a fresh call and never sees a stale answer.
+
+Sync (:meth:`SingleFlight.do`) and async (:meth:`SingleFlight.do_async`)
+callers share one table, so a coroutine can join a computation started by a
+worker thread and vice versa.  Configuration comes from the environment:
+
+* ``SINGLE_FLIGHT_ENABLED`` -- set to ``0`` to run every call independently.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import os
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "1") == "1"
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Table of in-flight computations keyed by caller-chosen hashable keys."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._leaders = 0
+        self._followers = 0
+
+    def _join(self, key: Hashable) -> Tuple[Future, bool]:
+        with self._lock:
+            shared = self._calls.get(key)
+            if shared is not None:
+                self._followers += 1
+                return shared, False
+            shared = self._calls[key] = Future()
+            self._leaders += 1
+            return shared, True
+
+    def _run(self, key: Hashable, shared: Future, fn: Callable[[], Any]) -> None:
+        try:
+            result = fn()
+        except BaseException as exc:
+            with self._lock:
+                self._calls.pop(key, None)
+            shared.set_exception(exc)
+        else:
+            with self._lock:
+                self._calls.pop(key, None)
+            shared.set_result(result)
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Return ``fn()``, sharing one run among concurrent callers with the same ``key``."""
+
+        if not self.enabled:
+            return fn()
+        shared, leader = self._join(key)
+        if leader:
+            self._run(key, shared, fn)
+        return shared.result()
+
+    async def do_async(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Async :meth:`do`: the leader runs the blocking ``fn`` in the loop's default executor.
+
+        The shared computation is shielded, so cancelling one awaiting caller
+        never cancels it for the others.
+        """
+
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        if not self.enabled:
+            return await loop.run_in_executor(None, contextvars.copy_context().run, fn)
+        shared, leader = self._join(key)
+        if leader:
+            loop.run_in_executor(None, contextvars.copy_context().run, self._run, key, shared, fn)
+        return await asyncio.shield(asyncio.wrap_future(shared))
+
+    def stats(self) -> Dict[str, int]:
+        """Calls that ran (leaders), calls that shared a result (followers) and calls in flight."""
+
+        with self._lock:
+            return {"leaders": self._leaders, "followers": self._followers, "in_flight": len(self._calls)}
+
+
+_single_flight: Optional[SingleFlight] = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    """Return the process-wide coalescing table, creating it on first use."""
+
+    global _single_flight
+    if _single_flight is None:
+        with _single_flight_lock:
+            if _single_flight is None:
+                _single_flight = SingleFlight(enabled=SINGLE_FLIGHT_ENABLED)
+    return _single_flight
@@ -1,15 +1,15 @@
 # hotel_voice_integration/stt_tts_utils.py
 
-import os
-from dotenv import load_dotenv
-from openai import OpenAI
+from agents.degraded import llm_available, local_answer
+from agents.llm_gateway import LLMUnavailable, chat_completion
+from utils import call_log
+from utils.response_cache import cached_answer
 from utils.review_utils import clean_text
+from utils.tracing import traced
+from utils.usage import attribute
 
 
-# Load API keys from .env
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
+@traced("turn")
 def process_speech_and_generate_audio(user_input):
     """
     This function takes the user's speech (text from Twilio),
@@ -17,18 +17,29 @@ def process_speech_and_generate_audio(user_input):
     Twilio will speak this text back to the caller.
     """
 
+    call_log.record_turn("concierge", user_input)
+
     if not user_input or user_input.strip() == "":
         user_input = "Hello"
 
-    cleaned_input = clean_text(user_input)
+    cached = cached_answer("concierge", user_input)
+    if cached is not None:
+        return cached
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": "You are a helpful hotel concierge. Keep your answers short and friendly."},
-            {"role": "user", "content": cleaned_input}
-        ]
-    )
-
-    ai_text = response.choices[0].message.content
+    cleaned_input = clean_text(user_input)
+    if not llm_available("gpt-4o-mini"):
+        return local_answer(user_input)
+
+    try:
+        with attribute(agent="concierge"):
+            ai_text = chat_completion(
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": "You are a helpful hotel concierge. Keep your answers short and friendly."},
+                    {"role": "user", "content": cleaned_input}
+                ],
+                temperature=1,
+            )
+    except LLMUnavailable:
+        return local_answer(user_input)
     return ai_text
@@ -0,0 +1,179 @@
+"""Fast text normalization used on the review and voice hot paths.
+
+Produces the same output as the original NLTK pipeline in
+``utils.review_utils`` (lowercase, letters only, English stopwords removed,
+WordNet noun lemmas) without paying for it at import time:
+
+* nothing is downloaded or loaded on import -- the stopword list is bundled
+  and the WordNet lemmatizer is created on first use;
+* regular expressions are compiled once;
+* lemmas are memoized in a bounded LRU cache, since guest vocabulary is small
+  and highly repetitive.
+
+If the WordNet corpus is not installed, a small suffix-rule lemmatizer is used
+instead (set ``NLTK_AUTO_DOWNLOAD=1`` to fetch the corpus on first use), with a
+``RuntimeWarning``.  Its lemmas differ from WordNet's ("houses" -> "hous"), so
+they are not the features the sentiment model was trained on: that path calls
+:func:`require_wordnet`, which fails unless ``ALLOW_FALLBACK_LEMMATIZER=1``.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+import warnings
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional
+
+LEMMA_CACHE_SIZE = int(os.getenv("LEMMA_CACHE_SIZE", "50000"))
+ALLOW_FALLBACK_LEMMATIZER = os.getenv("ALLOW_FALLBACK_LEMMATIZER") == "1"
+
+# NLTK's English stopword list, bundled so importing this module costs nothing.
+ENGLISH_STOPWORDS: FrozenSet[str] = frozenset("""
+i me my myself we our ours ourselves you you're you've you'll you'd your yours yourself
+yourselves he him his himself she she's her hers herself it it's its itself they them their
+theirs themselves what which who whom this that that'll these those am is are was were be
+been being have has had having do does did doing a an the and but if or because as until
+while of at by for with about against between into through during before after above below
+to from up down in out on off over under again further then once here there when where why
+how all any both each few more most other some such no nor not only own same so than too
+very s t can will just don don't should should've now d ll m o re ve y ain aren aren't
+couldn couldn't didn didn't doesn doesn't hadn hadn't hasn hasn't haven haven't isn isn't ma
+mightn mightn't mustn mustn't needn needn't shan shan't shouldn shouldn't wasn wasn't weren
+weren't won won't wouldn wouldn't
+""".split())
+
+_NON_ALPHA_RE = re.compile(r"[^a-z\s]")
+_QUERY_NOISE_RE = re.compile(r"[^a-z0-9']+")
+
+# WordNet-style noun detachment rules for the fallback lemmatizer.
+_SUFFIX_RULES = (("ies", "y"), ("ches", "ch"), ("shes", "sh"), ("xes", "x"), ("zes", "z"), ("ses", "s"), ("men", "man"))
+
+_lemmatizer_lock = threading.Lock()
+_lemmatizer: Optional[Callable[[str], str]] = None
+# Why the suffix-rule fallback is in use, or None while WordNet is.
+_fallback_reason: Optional[str] = None
+stop_words: FrozenSet[str] = ENGLISH_STOPWORDS
+
+
+class WordNetUnavailable(RuntimeError):
+    """WordNet is missing, so lemmas would not match the sentiment model's training features."""
+
+
+def _fallback_lemmatize(word: str) -> str:
+    """Approximate WordNet noun lemmas when the corpus is unavailable."""
+
+    if len(word) <= 3:
+        return word
+    for suffix, replacement in _SUFFIX_RULES:
+        if word.endswith(suffix) and len(word) > len(suffix) + 1:
+            return word[: -len(suffix)] + replacement
+    if word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def _fall_back(reason: str) -> Callable[[str], str]:
+    global _fallback_reason
+    _fallback_reason = reason
+    warnings.warn(
+        f"WordNet lemmatizer unavailable ({reason}); using suffix rules, whose lemmas differ "
+        "(\"houses\" -> \"hous\"). Run `python -m nltk.downloader wordnet` or set NLTK_AUTO_DOWNLOAD=1.",
+        RuntimeWarning,
+        stacklevel=4,
+    )
+    return _fallback_lemmatize
+
+
+def _load_lemmatizer() -> Callable[[str], str]:
+    """Create the WordNet lemmatizer on first use, or fall back to suffix rules."""
+
+    try:
+        from nltk.stem import WordNetLemmatizer
+    except ImportError:
+        return _fall_back("nltk is not installed")
+
+    lemmatizer = WordNetLemmatizer()
+    try:
+        lemmatizer.lemmatize("tests")
+    except LookupError:
+        if os.getenv("NLTK_AUTO_DOWNLOAD") != "1":
+            return _fall_back("the wordnet corpus is not installed")
+        import nltk
+
+        nltk.download("wordnet", quiet=True)
+        try:
+            lemmatizer.lemmatize("tests")
+        except LookupError:
+            return _fall_back("downloading the wordnet corpus failed")
+    return lemmatizer.lemmatize
+
+
+def get_lemmatizer() -> Callable[[str], str]:
+    """Return the process-wide lemmatize function, loading it once."""
+
+    global _lemmatizer
+    if _lemmatizer is None:
+        with _lemmatizer_lock:
+            if _lemmatizer is None:
+                _lemmatizer = _load_lemmatizer()
+    return _lemmatizer
+
+
+def require_wordnet() -> None:
+    """Raise :class:`WordNetUnavailable` if lemmas come from the suffix-rule fallback.
+
+    Called where the cleaned text must match the model's training features;
+    ``ALLOW_FALLBACK_LEMMATIZER=1`` accepts the fallback anyway.
+    """
+
+    get_lemmatizer()
+    if _fallback_reason is not None and not ALLOW_FALLBACK_LEMMATIZER:
+        raise WordNetUnavailable(
+            f"WordNet lemmatizer unavailable ({_fallback_reason}); sentiment features would not match "
+            "the trained model. Install the corpus or set ALLOW_FALLBACK_LEMMATIZER=1."
+        )
+
+
+@lru_cache(maxsize=LEMMA_CACHE_SIZE)
+def lemmatize(word: str) -> str:
+    """Memoized noun lemma of ``word``."""
+
+    return get_lemmatizer()(word)
+
+
+def clean_text(text: object) -> str:
+    """Lowercase, keep letters only, drop stopwords and lemmatize the rest."""
+
+    words = _NON_ALPHA_RE.sub("", str(text).lower()).split()
+    return " ".join([lemmatize(word) for word in words if word not in stop_words])
+
+
+def clean_text_batch(texts: Iterable[object]) -> List[str]:
+    """Clean many texts at once; repeated inputs are only processed once."""
+
+    seen: Dict[str, str] = {}
+    sub = _NON_ALPHA_RE.sub
+    stops = stop_words
+    lemma = lemmatize
+    results: List[str] = []
+    for text in texts:
+        raw = str(text)
+        cleaned = seen.get(raw)
+        if cleaned is None:
+            words = sub("", raw.lower()).split()
+            cleaned = " ".join([lemma(word) for word in words if word not in stops])
+            seen[raw] = cleaned
+        results.append(cleaned)
+    return results
+
+
+def normalize_query(text: object) -> str:
+    """Lowercase, drop punctuation and collapse whitespace -- but keep every word.
+
+    Unlike :func:`clean_text` this keeps stopwords ("not", "no", "before"),
+    so two queries only normalize alike when they ask the same thing.
+    """
+
+    return " ".join(_QUERY_NOISE_RE.sub(" ", str(text).lower()).split())
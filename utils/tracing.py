@@ -0,0 +1,197 @@
+"""Lightweight per-stage latency tracing with Prometheus text exposition.
+
+Wrap a stage in :func:`span` (or decorate a function with :func:`traced`)::
+
+    with span("llm", model=model):
+        completion = client.chat.completions.create(...)
+
+Each finished span is recorded in an in-process histogram named
+``hotel_stage_duration_seconds`` and labelled with the stage, any extra labels
+and ``status`` (``ok``/``error``).  :func:`render_metrics` returns every
+histogram in the Prometheus text format for the servers' ``/metrics``
+endpoints.
+
+Tracing is off unless ``TRACING_ENABLED=1`` (or :func:`enable` is called).
+When off, :func:`span` returns a shared no-op context manager and
+:func:`traced` functions go straight to the wrapped call, so instrumented
+code pays one flag check per stage.
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+METRIC_NAME = "hotel_stage_duration_seconds"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+F = TypeVar("F", bound=Callable[..., Any])
+LabelKey = Tuple[Tuple[str, str], ...]
+
+_enabled = os.getenv("TRACING_ENABLED", "0") == "1"
+
+
+def enable() -> None:
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram (Prometheus semantics)."""
+
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Bucket upper bound below which a fraction ``q`` of observations fall."""
+
+        if not self.count:
+            return 0.0
+        target, running = q * self.count, 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            running += bucket_count
+            if running >= target:
+                return bound
+        return float("inf")
+
+
+class MetricsRegistry:
+    """Thread-safe collection of histograms keyed by their label set."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._histograms: Dict[LabelKey, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, labels: Dict[str, str]) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def snapshot(self) -> Dict[LabelKey, Histogram]:
+        with self._lock:
+            copies = {}
+            for key, histogram in self._histograms.items():
+                copy = Histogram(histogram.buckets)
+                copy.counts, copy.total, copy.count = list(histogram.counts), histogram.total, histogram.count
+                copies[key] = copy
+            return copies
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {METRIC_NAME} Latency of request-processing stages in seconds.",
+            f"# TYPE {METRIC_NAME} histogram",
+        ]
+        for key, histogram in sorted(self.snapshot().items()):
+            labels = ",".join(f'{name}="{_escape(value)}"' for name, value in key)
+            prefix = f"{labels}," if labels else ""
+            running = 0
+            for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+                running += bucket_count
+                lines.append(f'{METRIC_NAME}_bucket{{{prefix}le="{bound:g}"}} {running}')
+            lines.append(f'{METRIC_NAME}_bucket{{{prefix}le="+Inf"}} {histogram.count}')
+            lines.append(f"{METRIC_NAME}_sum{{{labels}}} {histogram.total:.6f}")
+            lines.append(f"{METRIC_NAME}_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+REGISTRY = MetricsRegistry()
+
+
+class Span:
+    """Times one stage and records it in :data:`REGISTRY` on exit."""
+
+    __slots__ = ("labels", "started")
+
+    def __init__(self, stage: str, labels: Dict[str, Any]):
+        self.labels = {"stage": stage, **{name: str(value) for name, value in labels.items()}}
+        self.started = 0.0
+
+    def __enter__(self) -> "Span":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        elapsed = time.perf_counter() - self.started
+        self.labels["status"] = "error" if exc_type is not None else "ok"
+        REGISTRY.observe(elapsed, self.labels)
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(stage: str, **labels: Any):
+    """Context manager timing ``stage``; a shared no-op when tracing is disabled."""
+
+    if not _enabled:
+        return _NOOP_SPAN
+    return Span(stage, labels)
+
+
+def traced(stage: Optional[str] = None, **labels: Any) -> Callable[[F], F]:
+    """Decorator form of :func:`span`; ``stage`` defaults to the function name."""
+
+    def decorator(fn: F) -> F:
+        name = stage or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with Span(name, labels):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def render_metrics() -> str:
+    """All recorded histograms in the Prometheus text exposition format."""
+
+    return REGISTRY.render()
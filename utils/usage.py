@@ -0,0 +1,231 @@
+"""Token and cost accounting per agent, intent, session and model.
+
+Every chat completion made through :func:`agents.llm_gateway.chat_completion`
+or the voice intent classifier is recorded with its model and prompt /
+completion token counts.  Which agent, intent and session a call belongs to
+is taken from context variables, set with :func:`attribute` by the registry
+(agent), the routers (intent) and the servers (session), so agents do not
+need to pass anything around::
+
+    with attribute(session=call_sid):
+        reply = handle_message(call_sid, text)
+
+Query the aggregates with :func:`summary` / :func:`top`, e.g.
+``summary("agent")`` -> ``{"faq": {"calls": 12, "prompt_tokens": ..., ...}}``.
+
+Set ``USAGE_LOG_PATH`` to append every record as a JSON line; records are
+buffered and flushed every ``USAGE_DUMP_INTERVAL`` seconds (default 60) by a
+background thread and at interpreter exit.  Prices (USD per million tokens)
+default to :data:`MODEL_PRICES`; ``USAGE_PRICES_PATH`` may point to a JSON file
+of ``{"model": [prompt_price, completion_price]}`` overrides.
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+DIMENSIONS = ("agent", "intent", "session", "model")
+UNATTRIBUTED = "unattributed"
+
+# USD per 1M (prompt, completion) tokens.
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+}
+
+_agent: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("usage_agent", default=None)
+_intent: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("usage_intent", default=None)
+_session: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("usage_session", default=None)
+_VARS = {"agent": _agent, "intent": _intent, "session": _session}
+
+
+@contextmanager
+def attribute(**labels: Optional[str]) -> Iterator[None]:
+    """Attribute completions made inside the block to an agent, intent and/or session."""
+
+    tokens = [(_VARS[name], _VARS[name].set(value)) for name, value in labels.items() if value]
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+@dataclass
+class UsageTotals:
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def add(self, prompt_tokens: int, completion_tokens: int, cost_usd: float) -> None:
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.cost_usd += cost_usd
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["total_tokens"] = self.total_tokens
+        data["cost_usd"] = round(self.cost_usd, 6)
+        return data
+
+
+def _load_prices() -> Dict[str, Tuple[float, float]]:
+    prices = dict(MODEL_PRICES)
+    path = os.getenv("USAGE_PRICES_PATH")
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as handle:
+            prices.update({model: (float(p), float(c)) for model, (p, c) in json.load(handle).items()})
+    return prices
+
+
+class UsageLedger:
+    """Thread-safe aggregates plus a buffer of raw records awaiting a dump."""
+
+    def __init__(self, log_path: Optional[str] = None, dump_interval: float = 60.0,
+                 max_sessions: int = 10000):
+        self.prices = _load_prices()
+        self.log_path = log_path
+        self.dump_interval = dump_interval
+        self.max_sessions = max_sessions
+        self._totals: Dict[str, Dict[str, UsageTotals]] = {name: {} for name in DIMENSIONS}
+        self._pending: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._dump_lock = threading.Lock()
+        self._dumper: Optional[threading.Thread] = None
+
+    def cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        prompt_price, completion_price = self.prices.get(model, (0.0, 0.0))
+        return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+    def record(self, model: str, prompt_tokens: int, completion_tokens: int) -> Dict[str, Any]:
+        """Record one completion under the current agent/intent/session context."""
+
+        cost = self.cost(model, prompt_tokens, completion_tokens)
+        labels = {
+            "agent": _agent.get() or UNATTRIBUTED,
+            "intent": _intent.get() or UNATTRIBUTED,
+            "session": _session.get() or UNATTRIBUTED,
+            "model": model,
+        }
+        with self._lock:
+            for name, value in labels.items():
+                self._totals[name].setdefault(value, UsageTotals()).add(prompt_tokens, completion_tokens, cost)
+            sessions = self._totals["session"]
+            # Re-insert so sessions stay in least-recently-used order.
+            sessions[labels["session"]] = sessions.pop(labels["session"])
+            if len(sessions) > self.max_sessions:
+                # Least recently active sessions go first; their records are still in the JSONL log.
+                del sessions[next(iter(sessions))]
+            if self.log_path:
+                self._pending.append({
+                    "ts": round(time.time(), 3), **labels,
+                    "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                    "cost_usd": round(cost, 8),
+                })
+                self._ensure_dumper()
+        return labels
+
+    def summary(self, by: str = "agent") -> Dict[str, Dict[str, Any]]:
+        """Totals per value of ``by`` (one of :data:`DIMENSIONS`)."""
+
+        if by not in self._totals:
+            raise ValueError(f"unknown usage dimension {by!r}; expected one of {DIMENSIONS}")
+        with self._lock:
+            return {value: totals.as_dict() for value, totals in self._totals[by].items()}
+
+    def top(self, by: str = "agent", n: int = 5, metric: str = "cost_usd") -> List[Tuple[str, Dict[str, Any]]]:
+        """The ``n`` biggest consumers along ``by``, ranked by ``metric``."""
+
+        rows = self.summary(by)
+        return sorted(rows.items(), key=lambda item: item[1][metric], reverse=True)[:n]
+
+    def totals(self) -> Dict[str, Any]:
+        with self._lock:
+            overall = UsageTotals()
+            for totals in self._totals["model"].values():
+                overall.calls += totals.calls
+                overall.prompt_tokens += totals.prompt_tokens
+                overall.completion_tokens += totals.completion_tokens
+                overall.cost_usd += totals.cost_usd
+            return overall.as_dict()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._totals = {name: {} for name in DIMENSIONS}
+            self._pending = []
+
+    def dump(self) -> int:
+        """Append buffered records to ``log_path``; return how many were written."""
+
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending or not self.log_path:
+            return 0
+        directory = os.path.dirname(self.log_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._dump_lock, open(self.log_path, "a", encoding="utf-8") as handle:
+            handle.writelines(json.dumps(record) + "\n" for record in pending)
+        return len(pending)
+
+    def _ensure_dumper(self) -> None:
+        if self._dumper is not None:
+            return
+
+        def run() -> None:
+            while True:
+                time.sleep(self.dump_interval)
+                try:
+                    self.dump()
+                except OSError as exc:
+                    print(f"[Usage] dump to {self.log_path} failed: {exc}")
+
+        self._dumper = threading.Thread(target=run, name="usage-dump", daemon=True)
+        self._dumper.start()
+        atexit.register(self.dump)
+
+
+LEDGER = UsageLedger(
+    log_path=os.getenv("USAGE_LOG_PATH") or None,
+    dump_interval=float(os.getenv("USAGE_DUMP_INTERVAL", "60")),
+    max_sessions=int(os.getenv("USAGE_MAX_SESSIONS", "10000")),
+)
+
+
+def record_completion(model: str, completion: Any) -> None:
+    """Record the ``usage`` block of an OpenAI chat completion under the requested model."""
+
+    usage = getattr(completion, "usage", None)
+    LEDGER.record(
+        model,
+        int(getattr(usage, "prompt_tokens", 0) or 0),
+        int(getattr(usage, "completion_tokens", 0) or 0),
+    )
+
+
+def summary(by: str = "agent") -> Dict[str, Dict[str, Any]]:
+    return LEDGER.summary(by)
+
+
+def top(by: str = "agent", n: int = 5, metric: str = "cost_usd") -> List[Tuple[str, Dict[str, Any]]]:
+    return LEDGER.top(by, n, metric)
+
+
+def totals() -> Dict[str, Any]:
+    return LEDGER.totals()
@@ -2,11 +2,40 @@
 
 from __future__ import annotations
 
+import contextvars
+import os
+import queue
+import re
+import shutil
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional
 
 from hotel_voice_integration import stt_tts_utils
 
+PIPELINE_WORKERS = int(os.getenv("VOICE_PIPELINE_WORKERS", "3"))
+# Sentences shorter than this are merged with the next one so a reply such as
+# "Sure. ..." does not cost a separate TTS request.
+MIN_SENTENCE_CHARS = int(os.getenv("VOICE_PIPELINE_MIN_CHARS", "20"))
+
+# End punctuation, optional closing quote/bracket, whitespace, then the start of
+# a new sentence; requiring a capital keeps "9 a.m. daily" in one piece.
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])[\"')\]]*\s+(?=[\"'(A-Z0-9])")
+
+# respond(user_message, on_delta) -> whole reply, streaming the agent's text to on_delta.
+Responder = Callable[[str, Optional[Callable[[str], None]]], str]
+
+
+@dataclass(frozen=True)
+class AudioChunk:
+    """One synthesized sentence of a reply, in playback order."""
+
+    index: int
+    text: str
+    audio_file: Path
+
 
 def process_text_message(user_message: str) -> str:
     """Process a plain text chat/voice message and return the agent's reply."""
@@ -35,11 +64,25 @@ def process_twilio_payload(payload: Dict[str, Any], *, playback: bool = False,
     return response
 
 
+def _transcribe(audio_path: str | Path, streaming_stt: bool) -> str:
+    """Transcribe in one request, or segment-by-segment in parallel for WAV input."""
+
+    if streaming_stt and Path(audio_path).suffix.lower() == ".wav":
+        from hotel_voice_integration.streaming_stt import transcribe_wav_streaming
+
+        return transcribe_wav_streaming(audio_path)
+    return stt_tts_utils.transcribe_audio_file(audio_path)
+
+
 def process_audio_file(audio_path: str | Path, *, playback: bool = False,
-                       audio_output: Optional[str] = None) -> Dict[str, str]:
-    """Transcribe a saved audio file, route the intent, and optionally produce TTS."""
+                       audio_output: Optional[str] = None, streaming_stt: bool = False) -> Dict[str, str]:
+    """Transcribe a saved audio file, route the intent, and optionally produce TTS.
+
+    ``streaming_stt`` splits 16-bit WAV recordings at pauses and transcribes
+    the segments in parallel (see :mod:`hotel_voice_integration.streaming_stt`).
+    """
 
-    transcript = stt_tts_utils.transcribe_audio_file(audio_path)
+    transcript = _transcribe(audio_path, streaming_stt)
     response_text = stt_tts_utils.generate_agent_response(transcript)
 
     response: Dict[str, str] = {
@@ -50,4 +93,113 @@ def process_audio_file(audio_path: str | Path, *, playback: bool = False,
         output_path = audio_output or "call_response.mp3"
         audio_file = stt_tts_utils.synthesize_speech(response_text, output_path)
         response["audio_file"] = str(audio_file)
-    return response
\ No newline at end of file
+    return response
+
+
+def split_sentences(fragments: Iterable[str], min_chars: int = MIN_SENTENCE_CHARS) -> Iterator[str]:
+    """Yield complete sentences as soon as they appear in a stream of text fragments."""
+
+    buffer = ""
+    pending = ""
+    for fragment in fragments:
+        buffer += fragment
+        parts = _SENTENCE_BOUNDARY.split(buffer)
+        buffer = parts.pop()
+        for sentence in parts:
+            pending = f"{pending} {sentence}".strip() if pending else sentence.strip()
+            if len(pending) >= min_chars:
+                yield pending
+                pending = ""
+    tail = f"{pending} {buffer}".strip()
+    if tail:
+        yield tail
+
+
+def synthesize_pipelined(fragments: Iterable[str], *, output_dir: Optional[str | Path] = None,
+                         max_workers: int = PIPELINE_WORKERS,
+                         synthesize: Optional[Callable[[str], Path]] = None) -> Iterator[AudioChunk]:
+    """Synthesize each sentence while later ones are still arriving; yield chunks in order.
+
+    At most ``max_workers`` sentences are in flight, so a long reply never
+    floods the TTS API.  The first chunk is ready after roughly one
+    sentence's synthesis instead of the whole reply's.  Audio comes from the
+    TTS cache; with ``output_dir`` each chunk is also copied to
+    ``chunk_000.mp3``, ``chunk_001.mp3``, ...
+    """
+
+    synthesize = synthesize or stt_tts_utils.cached_speech
+    if output_dir is not None:
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+    def render(index: int, sentence: str) -> AudioChunk:
+        audio_file = synthesize(sentence)
+        if output_dir is not None:
+            target = output_dir / f"chunk_{index:03d}.mp3"
+            shutil.copyfile(audio_file, target)
+            audio_file = target
+        return AudioChunk(index, sentence, Path(audio_file))
+
+    in_flight: Deque[Future] = deque()
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tts-pipeline") as executor:
+        for index, sentence in enumerate(split_sentences(fragments)):
+            in_flight.append(executor.submit(render, index, sentence))
+            while in_flight and (len(in_flight) >= max_workers or in_flight[0].done()):
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+def reply_fragments(user_message: str, respond: Optional[Responder] = None) -> Iterator[str]:
+    """Text of the agent reply as the model generates it.
+
+    ``respond`` (default :func:`stt_tts_utils.generate_agent_response`) runs
+    on a worker thread and streams the agent's completion here, so the first
+    sentence can be synthesized before the reply is finished.  Replies that
+    are not generated by the model (cache hits, local answers, booking) come
+    through in one piece.  If the final reply does not continue the streamed
+    text -- an agent replaced the model's answer -- the final reply follows
+    what was already streamed.
+    """
+
+    respond = respond or stt_tts_utils.generate_agent_response
+    deltas: "queue.Queue[Optional[str]]" = queue.Queue()
+
+    def run() -> str:
+        try:
+            return respond(user_message, deltas.put)
+        finally:
+            deltas.put(None)
+
+    streamed: List[str] = []
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="voice-reply") as executor:
+        reply_future = executor.submit(contextvars.copy_context().run, run)
+        for delta in iter(deltas.get, None):
+            streamed.append(delta)
+            yield delta
+        reply = reply_future.result().strip()
+
+    spoken = "".join(streamed).strip()
+    if reply.startswith(spoken):
+        rest = reply[len(spoken):]
+    else:
+        print("[Voice] Reply differs from the streamed text; speaking the final reply after it")
+        rest = f" {reply}"
+    if rest.strip():
+        yield rest
+
+
+def stream_text_reply(user_message: str, *, output_dir: Optional[str | Path] = None) -> Iterator[AudioChunk]:
+    """Route a text message and stream the reply as ordered audio chunks."""
+
+    return synthesize_pipelined(reply_fragments(user_message), output_dir=output_dir)
+
+
+def stream_audio_reply(audio_path: str | Path, *, output_dir: Optional[str | Path] = None,
+                       streaming_stt: bool = False) -> Iterator[AudioChunk]:
+    """Pipelined variant of :func:`process_audio_file`: transcribe, route, and
+    yield the spoken reply sentence by sentence as soon as each is synthesized.
+    """
+
+    transcript = _transcribe(audio_path, streaming_stt)
+    return synthesize_pipelined(reply_fragments(transcript), output_dir=output_dir)
@@ -0,0 +1,191 @@
+"""Process a directory of recorded calls and voicemails in parallel.
+
+Usage::
+
+    python -m utils.voice_batch recordings/ --output results.jsonl --workers 8
+    python -m utils.voice_batch recordings/ --output results.jsonl --executor thread --streaming-stt
+
+Every audio file under the directory is hashed (SHA-256 of its content) and
+sent through :func:`utils.voice_backend.process_audio_file` on a process or
+thread pool.  One JSON record per file is appended to the output as soon as it
+finishes and flushed to disk, so the output doubles as the checkpoint: a
+restarted run skips every content hash already recorded and carries on.
+Identical recordings are transcribed once; their other copies get a
+``duplicate`` record that points at the processed file.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+AUDIO_EXTENSIONS = frozenset({".wav", ".mp3", ".m4a", ".mp4", ".mpeg", ".mpga", ".ogg", ".webm", ".flac"})
+
+
+def iter_audio_files(root: str | Path) -> Iterator[Path]:
+    """Yield audio files under ``root`` in a stable (sorted) order."""
+
+    for directory, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            path = Path(directory) / name
+            if path.suffix.lower() in AUDIO_EXTENSIONS:
+                yield path
+
+
+def file_sha256(path: str | Path, block_size: int = 1 << 20) -> str:
+    """Content hash used to dedupe recordings and to checkpoint progress."""
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_checkpoint(output_path: str | Path, retry_errors: bool = True) -> Set[str]:
+    """Content hashes already recorded in ``output_path`` (failures excluded when retrying)."""
+
+    done: Set[str] = set()
+    path = Path(output_path)
+    if not path.exists():
+        return done
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a line cut short by a crash; that file is simply redone
+            # Duplicate records say nothing about whether the content itself
+            # was processed, so only the original's outcome counts.
+            status = record.get("status")
+            if record.get("sha256") and (status == "ok" or (status == "error" and not retry_errors)):
+                done.add(record["sha256"])
+    return done
+
+
+def _process_one(path: str, sha256: str, streaming_stt: bool) -> Dict[str, Any]:
+    """Worker entry point; module-level so process pools can pickle it."""
+
+    from utils.voice_backend import process_audio_file
+
+    started = time.perf_counter()
+    record: Dict[str, Any] = {"path": path, "sha256": sha256}
+    try:
+        record.update(process_audio_file(path, streaming_stt=streaming_stt))
+        record["status"] = "ok"
+    except Exception as exc:
+        record["status"] = "error"
+        record["error"] = f"{type(exc).__name__}: {exc}"
+    record["seconds"] = round(time.perf_counter() - started, 3)
+    return record
+
+
+def _plan(root: str | Path, done: Set[str]) -> Tuple[List[Tuple[str, str]], List[Dict[str, Any]], int]:
+    """Split files into unique work items, duplicate records and an already-done count."""
+
+    work: List[Tuple[str, str]] = []
+    duplicates: List[Dict[str, Any]] = []
+    first_seen: Dict[str, str] = {}
+    skipped = 0
+    for path in iter_audio_files(root):
+        sha256 = file_sha256(path)
+        if sha256 in done:
+            skipped += 1
+            continue
+        if sha256 in first_seen:
+            duplicates.append({"path": str(path), "sha256": sha256,
+                               "status": "duplicate", "duplicate_of": first_seen[sha256]})
+            continue
+        first_seen[sha256] = str(path)
+        work.append((str(path), sha256))
+    return work, duplicates, skipped
+
+
+def run_batch(root: str | Path, output_path: str | Path, *, workers: int = os.cpu_count() or 4,
+              executor: str = "process", streaming_stt: bool = False, retry_errors: bool = True,
+              verbose: bool = True) -> Dict[str, int]:
+    """Process every new recording under ``root``; return counts per status."""
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    work, duplicates, skipped = _plan(root, load_checkpoint(output_path, retry_errors))
+    counts = {"ok": 0, "error": 0, "duplicate": 0, "skipped": skipped}
+    started = time.perf_counter()
+
+    pool_cls = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+    with open(output_path, "a", encoding="utf-8") as out, pool_cls(max_workers=workers) as pool:
+
+        def write(record: Dict[str, Any]) -> None:
+            record["finished_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            os.fsync(out.fileno())
+            counts[record["status"]] += 1
+            if verbose:
+                processed = counts["ok"] + counts["error"]
+                rate = processed / max(time.perf_counter() - started, 1e-9)
+                print(f"[voice_batch] {processed}/{len(work)} {record['status']:9s} "
+                      f"{record['path']} ({rate:.2f} files/s)", file=sys.stderr)
+
+        # Keep a bounded window of submissions so huge backlogs do not queue
+        # thousands of futures (and their arguments) at once.
+        pending: Set[Future] = set()
+        window = max(1, workers) * 4
+        for path, sha256 in work:
+            pending.add(pool.submit(_process_one, path, sha256, streaming_stt))
+            if len(pending) >= window:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    write(future.result())
+        for future in _as_finished(pending):
+            write(future.result())
+
+        # Duplicates are only recorded once their original is, so a crash
+        # never leaves a duplicate pointing at an unprocessed file.
+        for record in duplicates:
+            write(record)
+    return counts
+
+
+def _as_finished(pending: Set[Future]) -> Iterator[Future]:
+    while pending:
+        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+        yield from finished
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Transcribe and answer a directory of recorded calls.")
+    parser.add_argument("directory", help="folder to scan (recursively) for audio files")
+    parser.add_argument("--output", default="voice_batch_results.jsonl",
+                        help="JSONL results file, also used as the resume checkpoint")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="pool size")
+    parser.add_argument("--executor", choices=("process", "thread"), default="process",
+                        help="process pool (default) or thread pool for I/O-bound API calls")
+    parser.add_argument("--streaming-stt", action="store_true",
+                        help="segment WAV recordings and transcribe the segments in parallel")
+    parser.add_argument("--no-retry-errors", action="store_true",
+                        help="on resume, do not retry files whose previous attempt failed")
+    parser.add_argument("--quiet", action="store_true", help="suppress progress output")
+    args = parser.parse_args(argv)
+
+    if not Path(args.directory).is_dir():
+        print(f"Not a directory: {args.directory}", file=sys.stderr)
+        return 2
+    counts = run_batch(args.directory, args.output, workers=args.workers, executor=args.executor,
+                       streaming_stt=args.streaming_stt, retry_errors=not args.no_retry_errors,
+                       verbose=not args.quiet)
+    print(json.dumps(counts))
+    return 1 if counts["error"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())